@@ -0,0 +1,150 @@
+"""Vectorized what-if planning: plan_engine.plan_event over whole parameter grids in one pass.
+
+Every column is computed with the same float64 operations, in the same
+order, as the scalar engine, so each row equals the scalar plan exactly.
+Two operations are not reproducible in numpy and are done with Python
+once per distinct value instead: round() (round-half-even on the exact
+decimal value, unlike numpy.round) for the exit width, per (exit units,
+exits) pair, and radius ** 2, which goes through libm pow() and is not
+always equal to radius * radius.
+"""
+import itertools
+
+import numpy as np
+
+from plan_engine import (AVG_POSSIBLE_CROWD, AVG_HUMAN_SPACE, EFFECTIVE_AREA_SHARE,
+                         TOILET_AREA_PER_UNIT, FOOD_STALL_AREA_PER_UNIT,
+                         MIN_DIMENSION, MAX_DIMENSION, MAX_SLOTS)
+
+INT_COLUMNS = ("slots", "crowd_in_each_slot", "exit_units", "num_exits", "toilets", "food_stalls", "entry_per_exit")
+
+
+def product_grid(**axes):
+    """Cartesian product of parameter lists, as flat columns: product_grid(radius=[10, 20], event_factor=[1, 1.5])."""
+    names = list(axes)
+    rows = list(itertools.product(*(axes[name] for name in names)))
+    return {name: np.array([row[i] for row in rows]) for i, name in enumerate(names)}
+
+
+def _round_half_even_like_python(exit_units, num_exits):
+    # round(total_width / E, 2) exactly as the scalar engine does it, once per distinct pair
+    pairs, inverse = np.unique(np.stack([exit_units, num_exits]), axis=1, return_inverse=True)
+    widths = np.array([round(u * 0.75 / e, 2) if e else np.nan for u, e in pairs.T.tolist()])
+    return widths[inverse.ravel()]
+
+
+def _python_square(values):
+    distinct, inverse = np.unique(values, return_inverse=True)
+    return np.array([value ** 2 for value in distinct.tolist()])[inverse.ravel()]
+
+
+def _ceil_at(values, threshold):
+    # math.ceil(x) if x % 1 >= threshold else math.floor(x)
+    return np.where(np.mod(values, 1) >= threshold, np.ceil(values), np.floor(values))
+
+
+def plan_batch(shape, event_factor, start_hour, end_hour, length=None, width=None, radius=None, stage_area=0.0):
+    """Plan every row of the (broadcast) inputs; returns a dict of equal-length columns.
+
+    Rows plan_event would reject (unknown shape, dimensions out of range,
+    bad event factor, stage area or hours, no room left for the crowd,
+    too many slots) get
+    valid=False, NaN in the float columns and 0 in the integer columns.
+    """
+    shape = np.char.lower(np.asarray(shape, dtype=str))
+    nan = np.nan
+    shape, event_factor, start_hour, end_hour, length, width, radius, stage_area = np.broadcast_arrays(
+        shape,
+        np.asarray(event_factor, dtype=float),
+        np.asarray(start_hour, dtype=float),
+        np.asarray(end_hour, dtype=float),
+        np.asarray(nan if length is None else length, dtype=float),
+        np.asarray(nan if width is None else width, dtype=float),
+        np.asarray(nan if radius is None else radius, dtype=float),
+        np.asarray(stage_area, dtype=float),
+    )
+    shape, event_factor, start_hour, end_hour, length, width, radius, stage_area = (
+        column.ravel() for column in (shape, event_factor, start_hour, end_hour, length, width, radius, stage_area))
+
+    is_circle = shape == "circle"
+    is_rectangle = shape == "rectangle"
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        def dimension(values):
+            return (values >= MIN_DIMENSION) & (values <= MAX_DIMENSION)
+
+        valid = np.where(is_circle, dimension(radius), is_rectangle & dimension(length) & dimension(width))
+        valid &= np.isfinite(stage_area) & (stage_area >= 0)
+        valid &= np.isfinite(event_factor) & (event_factor > 0)
+        for hour in (start_hour, end_hour):
+            valid &= (hour >= 0) & (hour <= 24)
+        aoe = np.where(is_circle, np.pi * _python_square(np.where(dimension(radius), radius, 1.0)), length * width)
+
+        possible_crowd = AVG_POSSIBLE_CROWD * event_factor
+        effective_area = (EFFECTIVE_AREA_SHARE * aoe) - stage_area
+        valid &= effective_area > 0
+        buffer_area = 0.2 * aoe
+        at_a_time = effective_area / AVG_HUMAN_SPACE
+        valid &= possible_crowd / at_a_time <= MAX_SLOTS
+        slots = np.ceil(possible_crowd / at_a_time)
+        crowd_in_each_slot = np.ceil(possible_crowd / slots)
+
+        exit_units = _ceil_at(crowd_in_each_slot / (50 * 2), 0.3)
+        num_exits = _ceil_at((exit_units / 6) + 1, 0.75)
+        valid &= np.isfinite(slots) & np.isfinite(num_exits)
+        exit_width = np.full(len(valid), np.nan)
+        if valid.any():
+            exit_width[valid] = _round_half_even_like_python(exit_units[valid], num_exits[valid])
+
+        gate_height = np.where(is_circle, radius - np.sqrt(effective_area / np.pi),
+                               length - np.sqrt(effective_area / (width / length)))
+        emergency_gate_area = num_exits * exit_width * gate_height
+        remaining_buffer_area = 0.95 * (buffer_area - emergency_gate_area)
+
+        toilets = np.maximum(2, np.ceil((0.15 * crowd_in_each_slot) / 60))
+        food_stalls = np.maximum(2, np.ceil((0.25 * crowd_in_each_slot) / 40))
+        total_facility_area = toilets * TOILET_AREA_PER_UNIT + food_stalls * FOOD_STALL_AREA_PER_UNIT
+        scale_factor = buffer_area / total_facility_area
+        crowded = total_facility_area > buffer_area
+        toilets = np.where(crowded, np.maximum(1, np.floor(toilets * scale_factor)), toilets)
+        food_stalls = np.where(crowded, np.maximum(1, np.floor(food_stalls * scale_factor)), food_stalls)
+
+        time_per_slot = np.where(slots > 0, (end_hour - start_hour) / slots, 0)
+        entry_per_exit = np.trunc(crowd_in_each_slot / num_exits)
+
+    table = {
+        "valid": valid,
+        "shape": shape,
+        "event_factor": event_factor,
+        "start_hour": start_hour,
+        "end_hour": end_hour,
+        "area": aoe,
+        "possible_crowd": possible_crowd,
+        "effective_area": effective_area,
+        "buffer_area": buffer_area,
+        "crowd_at_a_time": at_a_time,
+        "slots": slots,
+        "crowd_in_each_slot": crowd_in_each_slot,
+        "exit_units": exit_units,
+        "num_exits": num_exits,
+        "exit_width": exit_width,
+        "gate_height": gate_height,
+        "emergency_gate_area": emergency_gate_area,
+        "remaining_buffer_area": remaining_buffer_area,
+        "toilets": toilets,
+        "food_stalls": food_stalls,
+        "time_per_slot": time_per_slot,
+        "entry_per_exit": entry_per_exit,
+    }
+    for name in ("area", "possible_crowd", "effective_area", "buffer_area", "crowd_at_a_time", "exit_width",
+                 "gate_height", "emergency_gate_area", "remaining_buffer_area", "time_per_slot"):
+        table[name] = np.where(valid, table[name], np.nan)
+    for name in INT_COLUMNS:
+        table[name] = np.where(valid, table[name], 0).astype(np.int64)
+    return table
+
+
+def table_rows(table):
+    """Iterate a plan_batch table as one dict per row (e.g. for csv.DictWriter)."""
+    names = list(table)
+    for values in zip(*(table[name].tolist() for name in names)):
+        yield dict(zip(names, values))
@@ -0,0 +1,238 @@
+"""Concurrency benchmark for /book_ticket against a scratch MySQL-compatible database.
+
+Drives flask_api.app in-process with many concurrent clients and reports
+latency percentiles, throughput, deadlocks and oversell checks per scenario.
+The scratch database is dropped and rebuilt from migrations/ on every run;
+ticket emails only land in email_outbox because no outbox worker is started.
+
+    DB_HOST=127.0.0.1 DB_USER=root DB_PASSWORD=... python -m bench.bench_booking --clients 32
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+SCENARIOS = ("hot_slot", "spread", "same_aadhaar")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def sql_statements(path):
+    with open(path, encoding="utf-8") as f:
+        lines = [line for line in f if not line.lstrip().startswith("--")]
+    return [statement.strip() for statement in "".join(lines).split(";") if statement.strip()]
+
+
+def create_schema(db_pool):
+    """Drop and recreate the scratch database, then apply every migration in order."""
+    import mysql.connector
+
+    config = dict(db_pool.DB_CONFIG)
+    database = config.pop("database")
+    conn = mysql.connector.connect(**config)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+    cursor.execute(f"CREATE DATABASE `{database}`")
+    cursor.execute(f"USE `{database}`")
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, "*.sql"))):
+        for statement in sql_statements(path):
+            cursor.execute(statement)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def reset_tables(db_pool, slot_ledger, availability_cache):
+    db = db_pool.get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute("SHOW TABLES")
+        for (table,) in cursor.fetchall():
+            cursor.execute(f"DELETE FROM `{table}`")
+        db.commit()
+        slot_ledger.load_mirror(cursor)  # empty tables -> empty mirror
+        cursor.close()
+    finally:
+        db.close()
+    availability_cache.clear()
+
+
+def build_requests(scenario, total, slots):
+    """Return the booking payloads for one scenario."""
+    hot_slot = slots[len(slots) // 2]
+    payloads = []
+    for i in range(total):
+        if scenario == "hot_slot":
+            # Far more demand than the slot's capacity, all on one counter row
+            aadhaar, slot = f"{100000000000 + i}", hot_slot
+        elif scenario == "spread":
+            aadhaar, slot = f"{200000000000 + i}", random.choice(slots)
+        else:
+            # A handful of users hammering the same slot with retries
+            aadhaar, slot = f"{300000000000 + i % 20}", hot_slot
+        count = random.randint(1, 4)
+        payloads.append({
+            "username": f"bench{i}",
+            "email": f"bench{i}@example.com",
+            "aadhaar_number": aadhaar,
+            "date_time": slot.strftime("%Y-%m-%d %H"),
+            "ticket_count": count,
+            "passenger_names": [f"passenger{i}-{n}" for n in range(count)],
+        })
+    return payloads
+
+
+def run_scenario(app, payloads, clients):
+    results = []
+    results_lock = threading.Lock()
+    work = iter(payloads)
+    work_lock = threading.Lock()
+
+    def client_loop():
+        client = app.test_client()
+        local = []
+        while True:
+            with work_lock:
+                payload = next(work, None)
+            if payload is None:
+                break
+            started = time.perf_counter()
+            response = client.post("/book_ticket", json=payload)
+            elapsed = time.perf_counter() - started
+            body = response.get_json(silent=True) or {}
+            local.append((elapsed, response.status_code, body.get("error", "")))
+        with results_lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=client_loop) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def check_invariants(db_pool, slot_ledger):
+    db = db_pool.get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM (SELECT slot_time FROM bookings GROUP BY slot_time HAVING SUM(ticket_count) > %s) t",
+            (slot_ledger.SLOT_CAPACITY,))
+        oversold_slots = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT COUNT(*) FROM (SELECT aadhaar_number FROM bookings GROUP BY aadhaar_number, slot_time "
+            "HAVING SUM(ticket_count) > %s) t",
+            (slot_ledger.MAX_TICKETS_PER_AADHAAR,))
+        over_limit_users = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT COUNT(*) FROM slot_counters c LEFT JOIN "
+            "(SELECT slot_time, SUM(ticket_count) AS total FROM bookings GROUP BY slot_time) b "
+            "ON b.slot_time = c.slot_time WHERE c.booked <> COALESCE(b.total, 0)")
+        counter_drift = cursor.fetchone()[0]
+        cursor.execute("SELECT COALESCE(SUM(ticket_count), 0) FROM bookings")
+        tickets_booked = int(cursor.fetchone()[0])
+        cursor.close()
+    finally:
+        db.close()
+    return {
+        "oversold_slots": oversold_slots,
+        "over_limit_aadhaars": over_limit_users,
+        "counter_drift_slots": counter_drift,
+        "tickets_booked": tickets_booked,
+    }
+
+
+def summarize(scenario, results, elapsed, invariants):
+    latencies = sorted(r[0] for r in results)
+    statuses = Counter(r[1] for r in results)
+    errors = [r[2] for r in results if r[1] >= 500]
+    rejections = Counter(r[2] for r in results if 400 <= r[1] < 500)
+    return {
+        "scenario": scenario,
+        "requests": len(results),
+        "booked": statuses.get(200, 0),
+        "rejected": dict(rejections),
+        "server_errors": len(errors),
+        "deadlocks": sum(1 for e in errors if "Deadlock" in e or "1213" in e),
+        "lock_wait_timeouts": sum(1 for e in errors if "Lock wait timeout" in e or "1205" in e),
+        "throughput_rps": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        **invariants,
+    }
+
+
+def print_report(summary):
+    print(f"\n== {summary['scenario']} ==")
+    print(f"  requests {summary['requests']}  booked {summary['booked']}  tickets {summary['tickets_booked']}")
+    print(f"  throughput {summary['throughput_rps']} req/s  p50 {summary['p50_ms']} ms  p99 {summary['p99_ms']} ms  max {summary['max_ms']} ms")
+    print(f"  server errors {summary['server_errors']}  deadlocks {summary['deadlocks']}  lock wait timeouts {summary['lock_wait_timeouts']}")
+    for reason, count in sorted(summary["rejected"].items(), key=lambda item: -item[1]):
+        print(f"  rejected {count:6d}  {reason}")
+    verdict = "OK" if not (summary["oversold_slots"] or summary["over_limit_aadhaars"] or summary["counter_drift_slots"]) else "FAILED"
+    print(f"  invariants {verdict}: oversold slots {summary['oversold_slots']}, "
+          f"over-limit Aadhaars {summary['over_limit_aadhaars']}, counter drift {summary['counter_drift_slots']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=16)
+    parser.add_argument("--database", default=os.environ.get("BENCH_DB_NAME", "TicketBooking_bench"))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the summaries to this file")
+    args = parser.parse_args()
+
+    if args.database == "TicketBooking":
+        sys.exit("Refusing to benchmark against the live TicketBooking database")
+    # utils.db_pool reads its settings at import time
+    os.environ["DB_NAME"] = args.database
+    os.environ["DB_POOL_SIZE"] = str(args.pool_size)
+    random.seed(args.seed)
+
+    from utils import db_pool, slot_ledger
+    from utils.availability_cache import availability_cache
+    from utils.booking_rules import bookable_slots
+    import flask_api
+
+    create_schema(db_pool)
+    # Start a day out so slots stay bookable for the whole run
+    slots = list(bookable_slots(start=datetime.now() + timedelta(days=1)))
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+
+    summaries = []
+    for scenario in scenarios:
+        reset_tables(db_pool, slot_ledger, availability_cache)
+        payloads = build_requests(scenario, args.requests, slots)
+        results, elapsed = run_scenario(flask_api.app, payloads, args.clients)
+        summary = summarize(scenario, results, elapsed, check_invariants(db_pool, slot_ledger))
+        summary["pool"] = db_pool.pool_stats()
+        print_report(summary)
+        summaries.append(summary)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+    if any(s["oversold_slots"] or s["over_limit_aadhaars"] or s["counter_drift_slots"] for s in summaries):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Throughput of ticket PDF rendering: one process versus a process pool.
+
+    python -m bench.bench_render --tickets 500 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+from utils.bulk_render import render_tickets, CHUNK_SIZE
+
+
+def synthetic_tickets(count):
+    start = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return [(f"BK-{i:08X}", start + timedelta(hours=i % 14), 1 + i % 4, f"Bench User {i}") for i in range(count)]
+
+
+def measure(tickets, workers, chunksize):
+    started = time.perf_counter()
+    rendered = sum(1 for _ in render_tickets(tickets, workers, chunksize))
+    elapsed = time.perf_counter() - started
+    return rendered, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 4])
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    tickets = synthetic_tickets(args.tickets)
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'tickets/s':>10} {'speedup':>8}")
+    for workers in sorted(set(args.workers)):
+        rendered, elapsed = measure(tickets, workers, args.chunksize)
+        rate = rendered / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8} {elapsed:>9.2f} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,102 +1,471 @@
-from flask import Flask, request, jsonify
-from database.db_config import get_db_connection
-from utils.email_sender import send_email  # Import email sender function
+from flask import Flask, request, jsonify, Response, stream_with_context
+from utils.db_pool import get_db_connection, pool_stats, PoolTimeout
+from utils import slot_ledger, outbox, booking_import, waitlist, metrics, idempotency
+from utils.availability_cache import availability_cache
+from utils.latest_booking import record_booking, latest_booking_cache
+from utils.booking_rules import bookable_slots
+from utils.validators import is_valid_email, is_valid_aadhaar, is_valid_date, normalize_aadhaar
+import json
 import uuid
-import re
-from datetime import datetime, timedelta
+from datetime import datetime
 
 app = Flask(__name__)
+metrics.expose_stats("db_pool", pool_stats)
 
 @app.route("/", methods=["GET"])
 def home():
     return jsonify({"message": "Welcome to the Ticket Booking API!"}), 200
 
-def is_valid_email(email):
-    pattern = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-    return re.match(pattern, email) is not None
+@app.route("/pool_stats", methods=["GET"])
+def get_pool_stats():
+    return jsonify(pool_stats()), 200
 
-def is_valid_aadhaar(aadhaar_number):
-    return aadhaar_number.isdigit() and len(aadhaar_number) == 12
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    return Response(metrics.render(), content_type=metrics.PROMETHEUS_CONTENT_TYPE)
 
-def is_valid_date(date_time):
-    max_date = datetime.now() + timedelta(days=60)
-    return datetime.now() <= date_time <= max_date
+@app.route("/email_status/<booking_id>", methods=["GET"])
+def email_status(booking_id):
+    deliveries = outbox.get_delivery_status(booking_id)
+    if not deliveries:
+        return jsonify({"error": "No emails queued for this booking"}), 404
+    return jsonify({"booking_id": booking_id, "emails": deliveries}), 200
 
-@app.route("/book_ticket", methods=["POST"])
-def book_ticket():
-    data = request.json
-    username = data.get("username")
+AVAILABILITY_MAX_AGE = 5  # seconds clients may reuse an /availability response without revalidating
+
+def parse_slot_arg(value):
+    """Parse a ?from= / ?to= value given as 'YYYY-MM-DD' or 'YYYY-MM-DD HH'."""
+    for fmt in ("%Y-%m-%d %H", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError(value)
+
+@app.route("/availability", methods=["GET"])
+def availability():
+    try:
+        start = parse_slot_arg(request.args["from"]) if "from" in request.args else None
+        end = parse_slot_arg(request.args["to"]) if "to" in request.args else None
+    except ValueError:
+        return jsonify({"error": "Invalid date format! Use YYYY-MM-DD or YYYY-MM-DD HH"}), 400
+    if end is not None and len(request.args["to"]) == 10:
+        end = end.replace(hour=23)  # a bare 'to' date includes that whole day
+
+    slots = list(bookable_slots(start, end))
+    booked = {}
+    if slots:
+        db = None
+        try:
+            db = get_db_connection()
+            cursor = db.cursor()
+            # One range scan over the counter table's primary key instead of a query per slot
+            cursor.execute("SELECT slot_time, booked FROM slot_counters WHERE slot_time BETWEEN %s AND %s", (slots[0], slots[-1]))
+            booked = dict(cursor.fetchall())
+            cursor.close()
+        except PoolTimeout:
+            return jsonify({"error": "Server is busy, please try again shortly"}), 503
+        finally:
+            if db is not None:
+                db.close()
+
+    response = jsonify({
+        "capacity": slot_ledger.SLOT_CAPACITY,
+        "slots": [{"slot_time": slot.strftime("%Y-%m-%d %H"), "remaining": slot_ledger.SLOT_CAPACITY - booked.get(slot, 0)} for slot in slots],
+    })
+    response.add_etag()
+    response.cache_control.max_age = AVAILABILITY_MAX_AGE
+    # Answers 304 Not Modified when If-None-Match carries the current ETag
+    return response.make_conditional(request)
+
+MAX_BULK_BOOKINGS = 500  # Items accepted by one /book_tickets/bulk request
+MAX_NAME_LENGTH = 100  # bookings.username and passengers.passenger_name are VARCHAR(100)
+
+def parse_booking(data):
+    """Validate one booking payload. Returns (booking, None) or (None, error message).
+
+    Every field is type-checked here: one bad item must not fail the batched
+    inserts of a bulk order or an import.
+    """
     email = data.get("email")
-    aadhaar_number = data.get("aadhaar_number")
-    date_str = data.get("date_time")
-    ticket_count = int(data.get("ticket_count", 0))
+    aadhaar_number = normalize_aadhaar(data.get("aadhaar_number"))
+    if not isinstance(email, str) or not is_valid_email(email):
+        return None, "Invalid email format"
+    if not isinstance(aadhaar_number, str) or not is_valid_aadhaar(aadhaar_number):
+        return None, "Invalid Aadhaar number"
+    try:
+        ticket_count = int(data.get("ticket_count", 0))
+    except (TypeError, ValueError):
+        return None, "Invalid ticket count"
+    if ticket_count < 1:
+        return None, "Invalid ticket count"
+    date_time = data.get("date_time")
+    try:
+        date_time = datetime.strptime(date_time if isinstance(date_time, str) else "", "%Y-%m-%d %H")
+    except ValueError:
+        return None, "Invalid date format! Use YYYY-MM-DD HH"
+    if not is_valid_date(date_time):
+        return None, "Invalid booking date or time! Bookings are only allowed between 7 AM and 9 PM."
+    username = data.get("username")
+    if username is not None and (not isinstance(username, str) or len(username) > MAX_NAME_LENGTH):
+        return None, "Invalid username"
     passenger_names = data.get("passenger_names", [])
-    print(f"Received email: '{email}'")  # Check what Flask API is receiving
+    if (not isinstance(passenger_names, list) or len(passenger_names) > ticket_count
+            or not all(isinstance(name, str) and name.strip() and len(name) <= MAX_NAME_LENGTH for name in passenger_names)):
+        return None, "Invalid passenger names"
+    return {
+        "username": username,
+        "email": email,
+        "aadhaar_number": aadhaar_number,
+        "slot_time": date_time.replace(minute=0, second=0, microsecond=0),
+        "ticket_count": ticket_count,
+        "passenger_names": passenger_names,
+    }, None
 
-    if not is_valid_email(email):
-        return jsonify({"error": "Invalid email format"}), 400
-    if not is_valid_aadhaar(aadhaar_number):
-        return jsonify({"error": "Invalid Aadhaar number"}), 400
-    
+def new_booking_id():
+    return "BK-" + uuid.uuid4().hex[:8].upper()
+
+def insert_bookings(cursor, bookings):
+    """Insert admitted bookings, their passengers and ticket emails with one batched statement per table."""
+    cursor.executemany(
+        "INSERT INTO bookings (booking_id, username, email, aadhaar_number, slot_time, ticket_count) VALUES (%s, %s, %s, %s, %s, %s)",
+        [(b["booking_id"], b["username"], b["email"], b["aadhaar_number"], b["slot_time"], b["ticket_count"]) for b in bookings])
+    passenger_rows = [(b["booking_id"], passenger) for b in bookings for passenger in b["passenger_names"]]
+    if passenger_rows:
+        cursor.executemany("INSERT INTO passengers (booking_id, passenger_name) VALUES (%s, %s)", passenger_rows)
+    # Queue the ticket emails in the same transaction; utils.outbox workers render and send them
+    outbox.enqueue_many(cursor, [(b["booking_id"], "confirmation", {
+        "email": b["email"],
+        "username": b["username"],
+        "date_time": b["slot_time"].strftime("%Y-%m-%d %H"),
+        "ticket_count": b["ticket_count"],
+    }) for b in bookings])
+
+def admit_bookings(cursor, bookings):
+    """Admit a batch of parsed bookings inside the caller's transaction.
+
+    Takes one round of locks for every slot and Aadhaar involved, then inserts
+    the admitted bookings in batches. Returns an error message (or None) per
+    booking; admitted bookings get their "booking_id" set.
+    """
+    with metrics.timed("booking_phase_seconds", phase="lock_and_admit"):
+        errors = slot_ledger.reserve_many(
+            cursor, [(b["slot_time"], b["aadhaar_number"], b["ticket_count"]) for b in bookings])
+    admitted = []
+    for booking, error in zip(bookings, errors):
+        if not error:
+            booking["booking_id"] = new_booking_id()
+            admitted.append(booking)
+    if admitted:
+        with metrics.timed("booking_phase_seconds", phase="insert"):
+            insert_bookings(cursor, admitted)
+    return errors
+
+def waitlist_or_reject(data, booking, capacity_error):
+    """A full slot puts bookings sent with "join_waitlist" on the waitlist (202); missing counter rows are a
+    retryable 503 and every other rejection is a 400."""
+    if capacity_error == slot_ledger.COUNTERS_UNAVAILABLE_ERROR:
+        return {"error": capacity_error}, 503
+    if capacity_error != slot_ledger.SLOT_FULL_ERROR or not data.get("join_waitlist"):
+        return {"error": capacity_error}, 400
+    with metrics.timed("booking_phase_seconds", phase="waitlist_join"):
+        waitlist_id, position = waitlist.join(booking)
+    return {"message": "Slot is full, you have been added to the waitlist",
+            "waitlist_id": waitlist_id, "position": position}, 202
+
+# Fixed rejection messages mapped to metric label values
+REJECTION_REASONS = {
+    slot_ledger.SLOT_FULL_ERROR: "slot_full",
+    slot_ledger.AADHAAR_LIMIT_ERROR: "aadhaar_limit",
+    "Invalid email format": "invalid_email",
+    "Invalid Aadhaar number": "invalid_aadhaar",
+    "Invalid ticket count": "invalid_ticket_count",
+    "Invalid date format! Use YYYY-MM-DD HH": "invalid_date",
+    "Invalid booking date or time! Bookings are only allowed between 7 AM and 9 PM.": "outside_booking_window",
+    "Invalid username": "invalid_username",
+    "Invalid passenger names": "invalid_passenger_names",
+}
+
+def count_outcome(endpoint, payload, status):
+    metrics.inc("booking_requests_total", endpoint=endpoint, status=status)
+    if status == 202:
+        metrics.inc("booking_rejections_total", reason="waitlisted")
+    elif status == 503:
+        counters = payload.get("error") == slot_ledger.COUNTERS_UNAVAILABLE_ERROR
+        metrics.inc("booking_rejections_total", reason="counters_unavailable" if counters else "pool_timeout")
+    elif status >= 500:
+        metrics.inc("booking_rejections_total", reason="server_error")
+    elif status >= 400:
+        metrics.inc("booking_rejections_total", reason=REJECTION_REASONS.get(payload.get("error"), "other"))
+
+def create_booking(data, idempotency_key=None):
+    """Validate, admit and store one booking. Returns (response payload, HTTP status).
+
+    Used by /book_ticket and called directly by the webhook's booking executor.
+    With an idempotency_key (argument or "idempotency_key" field), a repeat of
+    a successful booking gets the stored response back without running the
+    booking again.
+    """
+    idempotency_key = idempotency_key or data.get("idempotency_key")
+    with metrics.timed("booking_phase_seconds", phase="total"):
+        payload, status = _create_booking(data, idempotency_key)
+    count_outcome("book_ticket", payload, status)
+    return payload, status
+
+def _create_booking(data, idempotency_key):
+    print(f"Received email: '{data.get('email')}'")  # Check what Flask API is receiving
+    request_fingerprint = None
+    db = None
     try:
-        date_time = datetime.strptime(date_str, "%Y-%m-%d %H")
-        if not is_valid_date(date_time):
-            return jsonify({"error": "Invalid booking date or time! Bookings are only allowed between 7 AM and 9 PM."}), 400
-        
-        slot_time = date_time.replace(minute=0, second=0, microsecond=0)
-        db = get_db_connection()
+        if idempotency_key:
+            # Before any capacity check: a replayed booking must not be told its slot is now full
+            request_fingerprint = idempotency.fingerprint(data)
+            with metrics.timed("booking_phase_seconds", phase="idempotency_lookup"):
+                stored = idempotency.lookup(idempotency_key)
+            if stored:
+                metrics.inc("booking_idempotent_replays_total")
+                return idempotency.replay(stored, request_fingerprint)
+
+        with metrics.timed("booking_phase_seconds", phase="validate"):
+            booking, error = parse_booking(data)
+        if error:
+            return {"error": error}, 400
+        slot_time = booking["slot_time"]
+        aadhaar_number = booking["aadhaar_number"]
+        ticket_count = booking["ticket_count"]
+    
+        # A slot already known to be full is rejected without touching the database.
+        # Joining the waitlist is only decided by the database: the mirror may not
+        # have seen another process's cancellations yet.
+        use_mirror = not data.get("join_waitlist")
+        if use_mirror:
+            with metrics.timed("booking_phase_seconds", phase="cached_capacity_check"):
+                capacity_error = slot_ledger.check_cached(slot_time, aadhaar_number, ticket_count)
+            if capacity_error:
+                return waitlist_or_reject(data, booking, capacity_error)
+
+        with metrics.timed("booking_phase_seconds", phase="pool_checkout"):
+            db = get_db_connection()
         cursor = db.cursor()
         
         db.start_transaction()
         
-        # Lock Aadhaar number for the slot
-        cursor.execute("SELECT * FROM booking_locks WHERE aadhaar_number = %s AND slot_time = %s FOR UPDATE", (aadhaar_number, slot_time))
-        if cursor.fetchone():
-            db.rollback()
-            return jsonify({"error": "Booking is already in progress for this Aadhaar number and slot"}), 400
-        
-        # Insert a lock record
-        cursor.execute("INSERT INTO booking_locks (aadhaar_number, slot_time) VALUES (%s, %s)", (aadhaar_number, slot_time))
-        
-        cursor.execute("SELECT COALESCE(SUM(ticket_count), 0) FROM bookings WHERE slot_time = %s FOR UPDATE", (slot_time,))
-        booked_tickets = cursor.fetchone()[0] or 0
-        if booked_tickets + ticket_count > 500:
-            db.rollback()
-            return jsonify({"error": "Slot is full"}), 400
+        booking["booking_id"] = new_booking_id()
+        payload = {"message": "Booking successful", "booking_id": booking["booking_id"]}
+        if idempotency_key:
+            # First write of the transaction: a concurrent duplicate waits here, not on the slot's counters
+            stored = idempotency.claim(cursor, idempotency_key, request_fingerprint, payload, 200)
+            if stored:
+                db.rollback()
+                metrics.inc("booking_idempotent_replays_total")
+                return idempotency.replay(stored, request_fingerprint)
+        with metrics.timed("booking_phase_seconds", phase="insert"):
+            insert_bookings(cursor, [booking])
         
-        cursor.execute("SELECT COALESCE(SUM(ticket_count), 0) FROM bookings WHERE aadhaar_number = %s AND slot_time = %s FOR UPDATE", (aadhaar_number, slot_time))
-        user_tickets = cursor.fetchone()[0] or 0
-        if user_tickets + ticket_count > 4:
+        # Admit last: one conditional update on the per-slot / per-Aadhaar counters,
+        # so the slot's counter row is locked only until the commit below.
+        # This phase is the row lock wait plus the capacity check.
+        with metrics.timed("booking_phase_seconds", phase="lock_and_admit"):
+            capacity_error = slot_ledger.reserve(cursor, slot_time, aadhaar_number, ticket_count, use_mirror)
+        if capacity_error:
             db.rollback()
-            return jsonify({"error": "You can book only 4 tickets per slot"}), 400
+            db.close()
+            db = None
+            return waitlist_or_reject(data, booking, capacity_error)
         
-        booking_id = "BK-" + uuid.uuid4().hex[:8].upper()
+        with metrics.timed("booking_phase_seconds", phase="commit"):
+            db.commit()
+        slot_ledger.record(slot_time, aadhaar_number, ticket_count)
+        availability_cache.invalidate(slot_time)
+        record_booking(booking)
+        if idempotency_key:
+            idempotency.committed(idempotency_key, request_fingerprint, payload, 200)
         
-        sql_booking = "INSERT INTO bookings (booking_id, username, email, aadhaar_number, slot_time, ticket_count) VALUES (%s, %s, %s, %s, %s, %s)"
-        values_booking = (booking_id, username, email, aadhaar_number, slot_time, ticket_count)
-        cursor.execute(sql_booking, values_booking)
-        
-        for passenger in passenger_names:
-            sql_passenger = "INSERT INTO passengers (booking_id, passenger_name) VALUES (%s, %s)"
-            cursor.execute(sql_passenger, (booking_id, passenger))
-        
-        db.commit()
-        send_email(email, booking_id, slot_time, ticket_count, username)
-        
-        cursor.close()
-        db.close()
-        return jsonify({"message": "Booking successful", "booking_id": booking_id}), 200
+        return payload, 200
 
-    except ValueError:
-        return jsonify({"error": "Invalid date format! Use YYYY-MM-DD HH"}), 400
+    except PoolTimeout:
+        return {"error": "Server is busy, please try again shortly"}, 503
     except Exception as e:
         try:
           db.rollback()
-          db.close()
         except:
           pass  # in case db wasn't initialized
         print("Booking failed due to:", str(e))
-        return jsonify({"error": str(e)}), 500
+        return {"error": str(e)}, 500
+    finally:
+        # Always hand the connection back to the pool, including on early rejections
+        if db is not None:
+            db.close()
+
+@app.route("/book_ticket", methods=["POST"])
+def book_ticket():
+    data = request.json or {}
+    idempotency_key = request.headers.get("Idempotency-Key") or data.get("idempotency_key")
+    if idempotency_key is not None and (not isinstance(idempotency_key, str) or len(idempotency_key) > idempotency.MAX_KEY_LENGTH):
+        return jsonify({"error": f"Idempotency key must be a string of at most {idempotency.MAX_KEY_LENGTH} characters"}), 400
+    payload, status = create_booking(data, idempotency_key)
+    return jsonify(payload), status
+
+@app.route("/book_tickets/bulk", methods=["POST"])
+def book_tickets_bulk():
+    items = (request.json or {}).get("bookings")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Provide a non-empty 'bookings' list"}), 400
+    if len(items) > MAX_BULK_BOOKINGS:
+        return jsonify({"error": f"At most {MAX_BULK_BOOKINGS} bookings per request"}), 400
+
+    results = [None] * len(items)
+    parsed = []
+    for index, item in enumerate(items):
+        with metrics.timed("booking_phase_seconds", phase="validate"):
+            booking, error = parse_booking(item) if isinstance(item, dict) else (None, "Invalid booking")
+        if error:
+            results[index] = {"index": index, "error": error}
+        else:
+            parsed.append((index, booking))
+
+    if parsed:
+        bookings = [booking for _, booking in parsed]
+        db = None
+        try:
+            db = get_db_connection()
+            cursor = db.cursor()
+            db.start_transaction()
+            errors = admit_bookings(cursor, bookings)
+            with metrics.timed("booking_phase_seconds", phase="commit"):
+                db.commit()
+        except PoolTimeout:
+            count_outcome("bulk", {}, 503)
+            return jsonify({"error": "Server is busy, please try again shortly"}), 503
+        except Exception as e:
+            try:
+              db.rollback()
+            except:
+              pass  # in case db wasn't initialized
+            print("Bulk booking failed due to:", str(e))
+            count_outcome("bulk", {}, 500)
+            return jsonify({"error": str(e)}), 500
+        finally:
+            if db is not None:
+                db.close()
+
+        for (index, booking), error in zip(parsed, errors):
+            if error:
+                results[index] = {"index": index, "error": error}
+            else:
+                slot_ledger.record(booking["slot_time"], booking["aadhaar_number"], booking["ticket_count"])
+                availability_cache.invalidate(booking["slot_time"])
+                record_booking(booking)
+                results[index] = {"index": index, "message": "Booking successful", "booking_id": booking["booking_id"]}
+
+    booked = sum(1 for result in results if "booking_id" in result)
+    metrics.inc("booking_requests_total", endpoint="bulk", status=200)
+    for result in results:
+        if "error" in result:
+            metrics.inc("booking_rejections_total", reason=REJECTION_REASONS.get(result["error"], "other"))
+    return jsonify({"booked": booked, "rejected": len(results) - booked, "results": results}), 200
+
+@app.route("/book_tickets/import", methods=["POST"])
+def book_tickets_import():
+    """Stream-import a CSV or NDJSON upload ("file" field or raw body); streams back one NDJSON result per row."""
+    upload = request.files.get("file")
+    fmt = request.args.get("format")
+    if not fmt:
+        if upload is not None:
+            fmt = booking_import.detect_format(upload.filename or "")
+        else:
+            fmt = "csv" if "csv" in (request.mimetype or "") else "ndjson"
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    stream = upload.stream if upload is not None else request.stream
+
+    def generate():
+        booked = rejected = 0
+        for result in booking_import.import_bookings(booking_import.read_rows(booking_import.open_lines(stream), fmt)):
+            if "booking_id" in result:
+                booked += 1
+            else:
+                rejected += 1
+            yield json.dumps(result) + "\n"
+        yield json.dumps({"booked": booked, "rejected": rejected}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def cancel_booking(booking_id, aadhaar_number):
+    """Cancel a booking, give its tickets back and promote the slot's waitlist. Returns (payload, status)."""
+    db = None
+    try:
+        db = get_db_connection()
+        cursor = db.cursor()
+        db.start_transaction()
+        cursor.execute(
+            "SELECT email, slot_time, ticket_count FROM bookings WHERE booking_id = %s AND aadhaar_number = %s FOR UPDATE",
+            (booking_id, aadhaar_number))
+        row = cursor.fetchone()
+        if row is None:
+            db.rollback()
+            return {"error": "No booking found for the given booking ID and Aadhaar"}, 404
+        email, slot_time, ticket_count = row
+        slot_ledger.release(cursor, slot_time, aadhaar_number, ticket_count)
+        cursor.execute("DELETE FROM passengers WHERE booking_id = %s", (booking_id,))
+        cursor.execute("DELETE FROM bookings WHERE booking_id = %s", (booking_id,))
+        outbox.cancel(cursor, booking_id)
+        idempotency.forget(cursor, booking_id)
+        db.commit()
+    except PoolTimeout:
+        return {"error": "Server is busy, please try again shortly"}, 503
+    except Exception as e:
+        try:
+          db.rollback()
+        except:
+          pass  # in case db wasn't initialized
+        print("Cancellation failed due to:", str(e))
+        return {"error": str(e)}, 500
+    finally:
+        if db is not None:
+            db.close()
+
+    slot_ledger.record(slot_time, aadhaar_number, -ticket_count)
+    availability_cache.invalidate(slot_time)
+    latest_booking_cache.forget(aadhaar_number, email)
+    idempotency.forgotten(booking_id)
+    try:
+        promoted = waitlist.promote_waitlist(slot_time)
+    except Exception as e:
+        # The cancellation stands; the waitlist can be promoted again from /waitlist/<slot>/promote
+        print("Waitlist promotion failed due to:", str(e))
+        promoted = []
+    return {"message": "Booking cancelled", "booking_id": booking_id, "waitlist_promoted": len(promoted)}, 200
+
+@app.route("/cancel_booking", methods=["POST"])
+def cancel_booking_route():
+    data = request.json or {}
+    booking_id = data.get("booking_id")
+    aadhaar_number = data.get("aadhaar_number")
+    if not isinstance(booking_id, str) or not booking_id:
+        return jsonify({"error": "Provide a booking_id"}), 400
+    if not isinstance(aadhaar_number, str) or not is_valid_aadhaar(aadhaar_number):
+        return jsonify({"error": "Invalid Aadhaar number"}), 400
+    payload, status = cancel_booking(booking_id, aadhaar_number)
+    return jsonify(payload), status
+
+@app.route("/waitlist/<int:waitlist_id>", methods=["GET"])
+def waitlist_status(waitlist_id):
+    entry = waitlist.get_entry(waitlist_id)
+    if entry is None:
+        return jsonify({"error": "No such waitlist entry"}), 404
+    return jsonify(entry), 200
+
+@app.route("/waitlist/<slot>/promote", methods=["POST"])
+def promote_waitlist(slot):
+    """Admin hook for capacity changes: admit waiting entries for the slot ('YYYY-MM-DD HH') while seats remain."""
+    try:
+        slot_time = datetime.strptime(slot, "%Y-%m-%d %H")
+    except ValueError:
+        return jsonify({"error": "Invalid slot! Use YYYY-MM-DD HH"}), 400
+    promoted = waitlist.promote_waitlist(slot_time)
+    return jsonify({"slot_time": slot, "promoted": [
+        {"booking_id": booking["booking_id"], "aadhaar_number": booking["aadhaar_number"]} for booking in promoted]}), 200
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,51 @@
+from flask import Flask, request, jsonify
+from utils.gate import GateIndex, ADMITTED, UNKNOWN
+from datetime import datetime
+
+app = Flask(__name__)
+
+# One index per venue: every scanner posts here, so a ticket can only check in once
+gate_index = GateIndex()
+gate_index.start()
+
+def parse_slot(value):
+    return datetime.strptime(value or "", "%Y-%m-%d %H")
+
+@app.route("/gate/load", methods=["POST"])
+def load_slot():
+    """Preload a slot before the doors open (repeat to pick up late bookings at once)."""
+    try:
+        slot_time = parse_slot((request.json or {}).get("slot"))
+    except ValueError:
+        return jsonify({"error": "Invalid slot! Use YYYY-MM-DD HH"}), 400
+    return jsonify({"slot": slot_time.strftime("%Y-%m-%d %H"), "bookings": gate_index.load(slot_time)}), 200
+
+@app.route("/gate/scan", methods=["POST"])
+def scan():
+    data = request.json or {}
+    code = data.get("code")
+    if not isinstance(code, str) or not code.strip():
+        return jsonify({"error": "Provide the scanned code"}), 400
+    slot_time = None
+    if data.get("slot"):
+        try:
+            slot_time = parse_slot(data["slot"])
+        except ValueError:
+            return jsonify({"error": "Invalid slot! Use YYYY-MM-DD HH"}), 400
+    result, ticket_count = gate_index.scan(code, slot_time)
+    response = {"result": result, "admit": ticket_count if result == ADMITTED else 0, "ticket_count": ticket_count}
+    if result == ADMITTED:
+        return jsonify(response), 200
+    # Already checked in or wrong slot: the ticket exists but must not enter
+    return jsonify(response), 404 if result == UNKNOWN else 409
+
+@app.route("/gate/stats", methods=["GET"])
+def stats():
+    return jsonify(gate_index.stats()), 200
+
+@app.route("/gate/flush", methods=["POST"])
+def flush():
+    return jsonify({"flushed": gate_index.flush()}), 200
+
+if __name__ == "__main__":
+    app.run(port=5002, use_reloader=False)
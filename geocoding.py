@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+GEOCODE_DB = os.environ.get("GEOCODE_DB", "geocode_cache.db")
+GEOCODE_TTL = int(os.environ.get("GEOCODE_TTL", 30 * 24 * 3600))  # venues rarely move; refresh monthly
+NOT_FOUND_TTL = int(os.environ.get("GEOCODE_NOT_FOUND_TTL", 24 * 3600))  # a typo'd address is retried after a day
+# GEOCODE_OFFLINE=1 never calls the API: answers come from the SQLite store (even
+# if expired) and then the fixture, a JSON object of {"address": [lat, lon]}
+GEOCODE_OFFLINE = os.environ.get("GEOCODE_OFFLINE", "0") == "1"
+GEOCODE_FIXTURE = os.environ.get("GEOCODE_FIXTURE", "geocode_fixture.json")
+REQUEST_TIMEOUT = 5  # seconds
+MAX_MEMORY_ENTRIES = 1024
+
+_SPACES = re.compile(r"\s+")
+_COMMAS = re.compile(r"\s*,\s*")
+
+
+def normalize_address(address):
+    """Cache key for an address: case, spacing and comma placement do not change where a venue is."""
+    address = _SPACES.sub(" ", address.strip().casefold())
+    return _COMMAS.sub(", ", address).strip(" ,.")
+
+
+class Geocoder:
+    """Address -> (lat, lon), through an in-memory LRU, a SQLite store and the Geocoding API.
+
+    "Not found" answers are cached too, for NOT_FOUND_TTL. API errors and
+    timeouts are not cached; the lookup falls back to an expired stored
+    answer or the fixture.
+    """
+
+    def __init__(self, api_key, path=GEOCODE_DB, ttl=GEOCODE_TTL, offline=GEOCODE_OFFLINE,
+                 fixture_path=GEOCODE_FIXTURE, max_entries=MAX_MEMORY_ENTRIES):
+        self.api_key = api_key
+        self.path = path
+        self.ttl = ttl
+        self.offline = offline
+        self.max_entries = max_entries
+        self.fixture = self._load_fixture(fixture_path)
+        self._memory = OrderedDict()  # key -> ((lat, lon) or None, expires_at)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {"memory_hits": 0, "store_hits": 0, "fixture_hits": 0, "api_calls": 0, "api_errors": 0}
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS geocodes ("
+            "address_key TEXT PRIMARY KEY, lat REAL, lon REAL, fetched_at REAL NOT NULL, expires_at REAL NOT NULL)")
+
+    @staticmethod
+    def _load_fixture(fixture_path):
+        if not fixture_path or not os.path.exists(fixture_path):
+            return {}
+        with open(fixture_path, encoding="utf-8") as f:
+            return {normalize_address(address): tuple(coords) for address, coords in json.load(f).items()}
+
+    def _conn(self):
+        # Streamlit serves each session from its own thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key, coords, expires_at):
+        with self._lock:
+            self._memory[key] = (coords, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def lookup(self, address):
+        """Return (lat, lon), or None if the address cannot be found."""
+        key = normalize_address(address)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached and cached[1] > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return cached[0]
+
+        row = self._conn().execute(
+            "SELECT lat, lon, expires_at FROM geocodes WHERE address_key = ?", (key,)).fetchone()
+        stored = (row[0], row[1]) if row and row[0] is not None else None
+        # Offline, a recorded miss must not hide an address the fixture knows
+        fixture_wins = self.offline and stored is None and key in self.fixture
+        if row and (row[2] > now or self.offline) and not fixture_wins:
+            self._count("store_hits")
+            self._remember(key, stored, max(row[2], now + 60))
+            return stored
+
+        if not self.offline:
+            try:
+                coords = self._fetch(address)
+            except Exception as e:
+                print(f"Geocoding '{address}' failed: {e}")
+                self._count("api_errors")
+            else:
+                expires_at = now + (self.ttl if coords else NOT_FOUND_TTL)
+                self._conn().execute(
+                    "INSERT OR REPLACE INTO geocodes (address_key, lat, lon, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, coords[0] if coords else None, coords[1] if coords else None, now, expires_at))
+                self._remember(key, coords, expires_at)
+                return coords
+
+        # Offline, or the API is unreachable: a stale answer beats none
+        if stored is not None:
+            self._count("store_hits")
+            return stored
+        if key in self.fixture:
+            self._count("fixture_hits")
+            return self.fixture[key]
+        return None
+
+    def _fetch(self, address):
+        self._count("api_calls")
+        response = requests.get(GEOCODE_URL, params={"address": address, "key": self.api_key}, timeout=REQUEST_TIMEOUT)
+        data = response.json()
+        if data["status"] == "OK":
+            location = data["results"][0]["geometry"]["location"]
+            return location["lat"], location["lng"]
+        if data["status"] == "ZERO_RESULTS":
+            return None
+        raise RuntimeError(f"{data['status']}: {data.get('error_message', '')}")
+
+    def export_fixture(self, fixture_path):
+        """Write every found address in the store as a fixture for offline use."""
+        rows = self._conn().execute("SELECT address_key, lat, lon FROM geocodes WHERE lat IS NOT NULL").fetchall()
+        with open(fixture_path, "w", encoding="utf-8") as f:
+            json.dump({key: [lat, lon] for key, lat, lon in rows}, f, indent=2, sort_keys=True)
+        return len(rows)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        return stats
+
+
+_geocoders = {}
+_geocoders_lock = threading.Lock()
+
+
+def get_geocoder(api_key):
+    """Process-wide geocoder, so its memory cache survives Streamlit's script reruns."""
+    with _geocoders_lock:
+        if api_key not in _geocoders:
+            _geocoders[api_key] = Geocoder(api_key)
+        return _geocoders[api_key]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Look up addresses or export the geocode store as an offline fixture")
+    parser.add_argument("addresses", nargs="*")
+    parser.add_argument("--export-fixture", metavar="PATH")
+    args = parser.parse_args()
+
+    geocoder = Geocoder(os.environ.get("GOOGLE_API_KEY", ""))
+    for address in args.addresses:
+        print(f"{address}: {geocoder.lookup(address)}")
+    if args.export_fixture:
+        print(f"Wrote {geocoder.export_fixture(args.export_fixture)} addresses to {args.export_fixture}")
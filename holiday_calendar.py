@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import quote
+
+import requests
+
+DEFAULT_CALENDAR_ID = "en.indian#holiday@group.v.calendar.google.com"
+# Offline source, checked before the API: {"2025": ["2025-01-26", ...], ...}
+HOLIDAY_FILE = os.environ.get("HOLIDAY_FILE", "holidays.json")
+REQUEST_TIMEOUT = 10  # seconds
+FAILURE_TTL = 60  # seconds a failed year is served as holiday-free before the API is tried again
+
+HOLIDAY_WEEKEND_FACTOR = 2  # Festival/holiday + weekend
+HOLIDAY_FACTOR = 1.5  # Festival/holiday
+WEEKEND_FACTOR = 1.2  # Weekend
+NORMAL_FACTOR = 1.0
+
+
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def factor_for(day, holidays):
+    """Crowd factor for a day given a set of holiday dates; pure, no I/O."""
+    weekend = day.weekday() >= 5
+    if day in holidays:
+        return HOLIDAY_WEEKEND_FACTOR if weekend else HOLIDAY_FACTOR
+    return WEEKEND_FACTOR if weekend else NORMAL_FACTOR
+
+
+class HolidayCalendar:
+    """A year of holidays loaded at once (file or one paged API call) into a set of dates."""
+
+    def __init__(self, api_key, calendar_id=DEFAULT_CALENDAR_ID, holiday_file=HOLIDAY_FILE):
+        self.api_key = api_key
+        self.calendar_id = calendar_id
+        self.holiday_file = holiday_file
+        self._years = {}  # year -> frozenset of dates
+        self._failed = {}  # year -> monotonic time of the next fetch attempt
+        self._loading = {}  # year -> Event set when the in-flight load finishes
+        self._lock = threading.Lock()
+
+    def _from_file(self, year):
+        if not self.holiday_file or not os.path.exists(self.holiday_file):
+            return None
+        with open(self.holiday_file, encoding="utf-8") as f:
+            days = json.load(f).get(str(year))
+        return frozenset(to_date(day) for day in days) if days is not None else None
+
+    def _fetch(self, year):
+        calendar_encoded = quote(self.calendar_id, safe='')
+        base_url = f"https://www.googleapis.com/calendar/v3/calendars/{calendar_encoded}/events"
+        params = {"key": self.api_key, "timeMin": f"{year}-01-01T00:00:00Z", "timeMax": f"{year + 1}-01-01T00:00:00Z",
+                  "singleEvents": True, "maxResults": 2500}
+        days = set()
+        while True:
+            data = requests.get(base_url, params=params, timeout=REQUEST_TIMEOUT).json()
+            if "error" in data:
+                raise RuntimeError(data["error"].get("message", data["error"]))
+            for event in data.get("items", []):
+                start = to_date(event["start"].get("date") or event["start"]["dateTime"][:10])
+                end = to_date(event["end"].get("date") or event["end"]["dateTime"][:10])
+                # All-day events end on the following day (exclusive); count every day covered
+                days.add(start)
+                day = start + timedelta(days=1)
+                while day < end:
+                    days.add(day)
+                    day += timedelta(days=1)
+            if not data.get("nextPageToken"):
+                break
+            params["pageToken"] = data["nextPageToken"]
+        return frozenset(day for day in days if day.year == year)
+
+    def holidays(self, year):
+        """The year's holiday dates, loaded on first use.
+
+        The load runs outside the lock, one per year however many callers
+        ask; lookups for loaded years never wait on it. After a failed fetch
+        the year counts as holiday-free for FAILURE_TTL seconds, then the
+        API is tried again.
+        """
+        while True:
+            with self._lock:
+                if year in self._years:
+                    return self._years[year]
+                if self._failed.get(year, 0) > time.monotonic():
+                    return frozenset()
+                pending = self._loading.get(year)
+                if pending is None:
+                    pending = self._loading[year] = threading.Event()
+                    break
+            pending.wait()
+
+        try:
+            days = self._from_file(year)
+            if days is None:
+                try:
+                    days = self._fetch(year)
+                except Exception as e:
+                    print(f"Could not load holidays for {year}: {e}")
+                    with self._lock:
+                        self._failed[year] = time.monotonic() + FAILURE_TTL
+                    return frozenset()
+            with self._lock:
+                self._years[year] = days
+                self._failed.pop(year, None)
+            return days
+        finally:
+            with self._lock:
+                self._loading.pop(year, None)
+            pending.set()
+
+    def event_factor(self, day):
+        day = to_date(day)
+        return factor_for(day, self.holidays(day.year))
+
+    def event_factors(self, start, end):
+        """Factor for every day from start to end (inclusive), loading each year once up front."""
+        start, end = to_date(start), to_date(end)
+        holidays = frozenset().union(*(self.holidays(year) for year in range(start.year, end.year + 1)))
+        return {start + timedelta(days=offset): factor_for(start + timedelta(days=offset), holidays)
+                for offset in range((end - start).days + 1)}
+
+    def save(self, years, holiday_file=None):
+        """Fetch the given years from the API and write them to the offline file, keeping any other years in it.
+
+        A failed fetch raises and nothing is written: a year in the file is
+        never fetched again, so an empty list would mean "no holidays" for good.
+        """
+        holiday_file = holiday_file or self.holiday_file
+        fetched = {year: self._fetch(year) for year in years}
+        with self._lock:
+            self._years.update(fetched)
+        data = {}
+        if os.path.exists(holiday_file):
+            with open(holiday_file, encoding="utf-8") as f:
+                data = json.load(f)
+        for year, days in fetched.items():
+            data[str(year)] = sorted(day.isoformat() for day in days)
+        with open(holiday_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+
+_calendars = {}
+_calendars_lock = threading.Lock()
+
+
+def get_calendar(api_key, calendar_id=DEFAULT_CALENDAR_ID):
+    """Process-wide calendar per (key, calendar), so loaded years survive Streamlit's script reruns."""
+    with _calendars_lock:
+        if (api_key, calendar_id) not in _calendars:
+            _calendars[(api_key, calendar_id)] = HolidayCalendar(api_key, calendar_id)
+        return _calendars[(api_key, calendar_id)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch a year of holidays into the offline holiday file")
+    parser.add_argument("years", nargs="+", type=int)
+    parser.add_argument("--calendar", default=DEFAULT_CALENDAR_ID)
+    parser.add_argument("--out", default=HOLIDAY_FILE)
+    args = parser.parse_args()
+
+    calendar = HolidayCalendar(os.environ.get("GOOGLE_API_KEY", ""), args.calendar, holiday_file=args.out)
+    try:
+        calendar.save(args.years)
+    except Exception as e:
+        print(f"Could not fetch holidays, {args.out} left unchanged: {e}")
+        sys.exit(1)
+    print(f"Saved holidays for {', '.join(map(str, args.years))} to {args.out}")
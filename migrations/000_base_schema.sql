@@ -0,0 +1,26 @@
+-- Tables the booking API and webhook expect on a fresh database
+-- (used to set up scratch databases such as the benchmark's).
+
+CREATE TABLE IF NOT EXISTS bookings (
+    booking_id VARCHAR(16) NOT NULL,
+    username VARCHAR(100) NULL,
+    email VARCHAR(255) NOT NULL,
+    aadhaar_number CHAR(12) NOT NULL,
+    slot_time DATETIME NOT NULL,
+    ticket_count INT NOT NULL,
+    PRIMARY KEY (booking_id)
+);
+
+CREATE TABLE IF NOT EXISTS passengers (
+    id BIGINT NOT NULL AUTO_INCREMENT,
+    booking_id VARCHAR(16) NOT NULL,
+    passenger_name VARCHAR(100) NOT NULL,
+    PRIMARY KEY (id),
+    KEY idx_passengers_booking (booking_id)
+);
+
+CREATE TABLE IF NOT EXISTS booking_locks (
+    aadhaar_number CHAR(12) NOT NULL,
+    slot_time DATETIME NOT NULL,
+    PRIMARY KEY (aadhaar_number, slot_time)
+);
@@ -0,0 +1,24 @@
+-- Maintained ticket counters so /book_ticket can admit a booking with two
+-- primary-key lookups instead of SUM() scans over bookings.
+-- Populate with: python -m utils.slot_ledger
+
+CREATE TABLE IF NOT EXISTS slot_counters (
+    slot_time DATETIME NOT NULL,
+    booked INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (slot_time)
+);
+
+CREATE TABLE IF NOT EXISTS aadhaar_slot_counters (
+    aadhaar_number CHAR(12) NOT NULL,
+    slot_time DATETIME NOT NULL,
+    booked INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (aadhaar_number, slot_time)
+);
+
+INSERT INTO slot_counters (slot_time, booked)
+SELECT slot_time, SUM(ticket_count) FROM bookings GROUP BY slot_time
+ON DUPLICATE KEY UPDATE booked = VALUES(booked);
+
+INSERT INTO aadhaar_slot_counters (aadhaar_number, slot_time, booked)
+SELECT aadhaar_number, slot_time, SUM(ticket_count) FROM bookings GROUP BY aadhaar_number, slot_time
+ON DUPLICATE KEY UPDATE booked = VALUES(booked);
@@ -0,0 +1,19 @@
+-- Ticket emails queued by /book_ticket in the booking transaction and
+-- delivered by the utils.outbox workers (python -m utils.outbox).
+-- next_attempt_at doubles as the claim lease while a row is 'sending'.
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id BIGINT NOT NULL AUTO_INCREMENT,
+    booking_id VARCHAR(16) NOT NULL,
+    kind VARCHAR(32) NOT NULL,
+    payload JSON NOT NULL,
+    status ENUM('pending', 'sending', 'sent', 'failed') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error VARCHAR(500) NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sent_at DATETIME NULL,
+    PRIMARY KEY (id),
+    KEY idx_outbox_due (status, next_attempt_at),
+    KEY idx_outbox_booking (booking_id)
+);
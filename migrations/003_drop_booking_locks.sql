@@ -0,0 +1,6 @@
+-- Admission is now a single conditional update on slot_counters and
+-- aadhaar_slot_counters (utils/slot_ledger.py ADMIT_SQL). booking_locks rows
+-- were never deleted and only serialized bookings, so the table goes away.
+-- Apply after 001_slot_counters.sql and after deploying the new booking code.
+
+DROP TABLE IF EXISTS booking_locks;
@@ -0,0 +1,15 @@
+-- The chatbot's ticket download looks up a user's latest booking with
+--   WHERE aadhaar_number = ? AND email = ? ORDER BY slot_time DESC LIMIT 1
+-- (utils/latest_booking.py). Without this index that is a scan plus filesort
+-- of bookings; with it MySQL reads one index entry backwards and stops.
+-- Check with GET /latest_booking_stats?explain=1 on the webhook.
+
+-- Guarded so the migration can be re-run: MySQL has no CREATE INDEX IF NOT EXISTS
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+               WHERE table_schema = DATABASE() AND table_name = 'bookings'
+                 AND index_name = 'idx_bookings_aadhaar_email_slot') = 0,
+              'CREATE INDEX idx_bookings_aadhaar_email_slot ON bookings (aadhaar_number, email, slot_time)',
+              'DO 0');
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
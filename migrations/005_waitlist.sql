@@ -0,0 +1,20 @@
+-- Per-slot FIFO waitlist (utils/waitlist.py). A booking that finds its slot
+-- full can opt in with join_waitlist; cancellations and
+-- POST /waitlist/<slot>/promote admit waiting entries oldest first.
+
+CREATE TABLE IF NOT EXISTS waitlist (
+    id BIGINT NOT NULL AUTO_INCREMENT,
+    slot_time DATETIME NOT NULL,
+    username VARCHAR(100) NULL,
+    email VARCHAR(255) NOT NULL,
+    aadhaar_number CHAR(12) NOT NULL,
+    ticket_count INT NOT NULL,
+    passenger_names TEXT NULL,
+    status ENUM('waiting', 'promoted', 'rejected') NOT NULL DEFAULT 'waiting',
+    booking_id VARCHAR(16) NULL,
+    last_error VARCHAR(255) NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    promoted_at DATETIME NULL,
+    PRIMARY KEY (id),
+    KEY idx_waitlist_slot_status (slot_time, status, id)
+);
@@ -0,0 +1,15 @@
+-- Results of /book_ticket requests sent with an Idempotency-Key (or derived
+-- from a chat session), written in the booking's own transaction so a retry
+-- replays the stored response (utils/idempotency.py). Expired rows are swept
+-- in small batches by the booking API.
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    idem_key VARCHAR(128) NOT NULL,
+    fingerprint CHAR(64) NOT NULL,
+    response TEXT NOT NULL,
+    status_code SMALLINT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (idem_key),
+    KEY idx_idempotency_expires (expires_at)
+);
@@ -0,0 +1,23 @@
+-- Gate check-ins (utils/gate.py). The gate service preloads a slot's
+-- bookings by slot_time and writes check-ins here in batches; the primary
+-- key keeps a booking to one check-in even across gate processes.
+
+CREATE TABLE IF NOT EXISTS checkins (
+    booking_id VARCHAR(16) NOT NULL,
+    slot_time DATETIME NOT NULL,
+    ticket_count INT NOT NULL,
+    gate VARCHAR(32) NULL,
+    checked_in_at DATETIME(3) NOT NULL,
+    PRIMARY KEY (booking_id),
+    KEY idx_checkins_slot (slot_time)
+);
+
+-- Same re-run guard as 004_bookings_latest_lookup_index.sql
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+               WHERE table_schema = DATABASE() AND table_name = 'bookings'
+                 AND index_name = 'idx_bookings_slot_time') = 0,
+              'CREATE INDEX idx_bookings_slot_time ON bookings (slot_time)',
+              'DO 0');
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,25 @@
+-- Cancellations (POST /cancel_booking) stop the booking's queued emails:
+-- utils.outbox.cancel marks them 'cancelled' so no worker claims them.
+
+ALTER TABLE email_outbox
+    MODIFY status ENUM('pending', 'sending', 'sent', 'failed', 'cancelled') NOT NULL DEFAULT 'pending';
+
+-- One waiting entry per Aadhaar and slot. waiting_aadhaar is NULL once an
+-- entry is promoted or rejected, so finished entries never collide and the
+-- same person can queue again later. Existing duplicates keep the oldest.
+UPDATE waitlist w
+JOIN waitlist earlier
+  ON earlier.slot_time = w.slot_time AND earlier.aadhaar_number = w.aadhaar_number
+ AND earlier.status = 'waiting' AND earlier.id < w.id
+SET w.status = 'rejected', w.last_error = 'Duplicate waitlist entry'
+WHERE w.status = 'waiting';
+
+-- MySQL has no ADD COLUMN IF NOT EXISTS; skip when a previous run added it
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.columns
+               WHERE table_schema = DATABASE() AND table_name = 'waitlist'
+                 AND column_name = 'waiting_aadhaar') = 0,
+              'ALTER TABLE waitlist ADD COLUMN waiting_aadhaar CHAR(12) AS (IF(status = ''waiting'', aadhaar_number, NULL)) STORED, ADD UNIQUE KEY uq_waitlist_waiting (slot_time, waiting_aadhaar)',
+              'DO 0');
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,5 @@
+-- Waiting entries for a slot that has already started are closed as
+-- 'expired' by utils.waitlist.promote_waitlist instead of being admitted.
+
+ALTER TABLE waitlist
+    MODIFY status ENUM('waiting', 'promoted', 'rejected', 'expired') NOT NULL DEFAULT 'waiting';
@@ -0,0 +1,17 @@
+-- Cancelling a booking (flask_api.cancel_booking) deletes the idempotency
+-- keys that would replay it, found through this column. Existing rows are
+-- backfilled from their stored response.
+
+-- MySQL has no ADD COLUMN IF NOT EXISTS; skip when a previous run added it
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.columns
+               WHERE table_schema = DATABASE() AND table_name = 'idempotency_keys'
+                 AND column_name = 'booking_id') = 0,
+              'ALTER TABLE idempotency_keys ADD COLUMN booking_id VARCHAR(16) NULL AFTER status_code, ADD KEY idx_idempotency_booking (booking_id)',
+              'DO 0');
+PREPARE stmt FROM @ddl;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+UPDATE idempotency_keys
+SET booking_id = JSON_UNQUOTE(JSON_EXTRACT(response, '$.booking_id'))
+WHERE booking_id IS NULL AND JSON_VALID(response);
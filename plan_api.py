@@ -0,0 +1,46 @@
+import os
+from flask import Flask, request, jsonify
+from plan_engine import plan_cache
+
+app = Flask(__name__)
+
+GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
+
+def number(data, name, default=None):
+    value = data.get(name, default)
+    return None if value is None else float(value)
+
+@app.route("/plan", methods=["POST"])
+def plan():
+    """Plan an event from JSON: shape, length/width or radius, stage_area, start_hour, end_hour,
+    and either event_factor or date ('YYYY-MM-DD', looked up in the holiday calendar)."""
+    data = request.json or {}
+    try:
+        event_factor = number(data, "event_factor")
+        if event_factor is None:
+            if not data.get("date"):
+                return jsonify({"error": "Provide event_factor or date"}), 400
+            # Imported on first use: plans with an explicit factor never load requests
+            from holiday_calendar import get_calendar
+            event_factor = get_calendar(GOOGLE_API_KEY).event_factor(data["date"])
+        result = plan_cache.plan(
+            shape=str(data.get("shape", "")),
+            event_factor=event_factor,
+            start_hour=number(data, "start_hour", 0),
+            end_hour=number(data, "end_hour", 0),
+            length=number(data, "length"),
+            width=number(data, "width"),
+            radius=number(data, "radius"),
+            stage_area=number(data, "stage_area", 0.0),
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result.to_dict()), 200
+
+@app.route("/plan_cache_stats", methods=["GET"])
+def plan_cache_stats():
+    return jsonify(plan_cache.stats()), 200
+
+if __name__ == "__main__":
+    # Plans are pure CPU work; threaded lets requests overlap their I/O
+    app.run(port=5003, threaded=True)
@@ -0,0 +1,224 @@
+"""Event space planning math, free of Streamlit and any I/O.
+
+plan_event() takes the venue, the event factor and the time window and
+returns an EventPlan; geocoding and the holiday calendar stay with the
+callers (streamalgo.py, plan_api.py).
+"""
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional, Tuple
+
+AVG_POSSIBLE_CROWD = 6000
+AVG_HUMAN_SPACE = 1.5  # sq m per person
+EFFECTIVE_AREA_SHARE = 0.8  # of the venue; the rest is buffer for exits and facilities
+TOILET_AREA_PER_UNIT = 1.9
+FOOD_STALL_AREA_PER_UNIT = 4.7
+SHAPES = ("circle", "rectangle")
+MIN_DIMENSION = 1.0  # m, as the planner form enforces
+MAX_DIMENSION = 100000.0  # m
+MAX_SLOTS = 24 * 60  # one slot a minute over a whole day; more means the venue is far too small for the crowd
+PLAN_CACHE_SIZE = 4096
+PLAN_CACHE_MAX_SLOTS = 200000  # schedule rows held across all cached plans, which is what their memory grows with
+
+
+@dataclass(frozen=True)
+class EventPlan:
+    area: float
+    event_factor: float
+    possible_crowd: float
+    effective_area: float
+    buffer_area: float
+    crowd_at_a_time: float
+    slots: int
+    crowd_in_each_slot: int
+    exit_units: int
+    num_exits: int
+    exit_width: float
+    gate_height: float
+    emergency_gate_area: float
+    remaining_buffer_area: float
+    toilets: int
+    food_stalls: int
+    time_per_slot: float
+    slot_schedule: Tuple[str, ...]
+    entry_per_exit: int
+
+    def to_dict(self):
+        plan = asdict(self)
+        plan["slot_schedule"] = list(self.slot_schedule)
+        return plan
+
+
+def calculate_emergency_exits(crowd_at_a_time):
+    T = 2
+    U = crowd_at_a_time / (50 * T)
+    U = math.ceil(U) if U % 1 >= 0.3 else math.floor(U)
+    E = (U / 6) + 1
+    E = math.ceil(E) if E % 1 >= 0.75 else math.floor(E)
+    total_width = U * 0.75
+    suggested_exit_width = round(total_width / E, 2)
+    return {
+        "Total Exit Units Required": U,
+        "Number of Emergency Exits Required": E,
+        "Suggested Exit Width (meters) per Exit": suggested_exit_width
+    }
+
+
+def format_time(hour_float):
+    hour = int(hour_float)
+    minutes = int((hour_float - hour) * 60)
+    return f"{hour:02d}:{minutes:02d}"
+
+
+def _is_dimension(value):
+    return value is not None and math.isfinite(value) and MIN_DIMENSION <= value <= MAX_DIMENSION
+
+
+def plan_event(shape: str, event_factor: float, start_hour: float, end_hour: float,
+               length: Optional[float] = None, width: Optional[float] = None,
+               radius: Optional[float] = None, stage_area: float = 0.0) -> EventPlan:
+    """Plan a circular (radius) or rectangular (length x width) venue. Raises ValueError on unusable input."""
+    shape = shape.lower()
+    if shape not in SHAPES:
+        raise ValueError(f"shape must be one of {', '.join(SHAPES)}")
+    if shape == "rectangle":
+        if not _is_dimension(length) or not _is_dimension(width):
+            raise ValueError(f"a rectangle needs a length and width between {MIN_DIMENSION:g} and {MAX_DIMENSION:g} m")
+        aoe = length * width
+    else:
+        if not _is_dimension(radius):
+            raise ValueError(f"a circle needs a radius between {MIN_DIMENSION:g} and {MAX_DIMENSION:g} m")
+        aoe = math.pi * (radius ** 2)
+    if not math.isfinite(stage_area) or stage_area < 0:
+        raise ValueError("stage area cannot be negative")
+    if not math.isfinite(event_factor) or event_factor <= 0:
+        raise ValueError("event factor must be a positive number")
+    if not all(math.isfinite(hour) and 0 <= hour <= 24 for hour in (start_hour, end_hour)):
+        raise ValueError("start and end hours must be between 0 and 24")
+
+    possible_crowd = AVG_POSSIBLE_CROWD * event_factor
+    effective_area = (EFFECTIVE_AREA_SHARE * aoe) - stage_area
+    if effective_area <= 0:
+        raise ValueError("the stage leaves no room for the crowd")
+    buffer_area = 0.2 * aoe
+    at_a_time = effective_area / AVG_HUMAN_SPACE
+    if possible_crowd / at_a_time > MAX_SLOTS:
+        raise ValueError(f"the venue is too small for this crowd: it would need more than {MAX_SLOTS} slots")
+    slots = math.ceil(possible_crowd / at_a_time)
+    crowd_in_each_slot = math.ceil(possible_crowd / slots)
+    exit_info = calculate_emergency_exits(crowd_in_each_slot)
+
+    num_exits = exit_info["Number of Emergency Exits Required"]
+    exit_width = exit_info["Suggested Exit Width (meters) per Exit"]
+    gate_height = (radius - math.sqrt(effective_area / math.pi)) if shape == "circle" else (length - math.sqrt(effective_area / (width / length)))
+    emergency_gate_area = num_exits * exit_width * gate_height
+    remaining_buffer_area = 0.95 * (buffer_area - emergency_gate_area)
+
+    toilets = max(2, math.ceil((0.15 * crowd_in_each_slot) / 60))
+    food_stalls = max(2, math.ceil((0.25 * crowd_in_each_slot) / 40))
+    total_facility_area = toilets * TOILET_AREA_PER_UNIT + food_stalls * FOOD_STALL_AREA_PER_UNIT
+
+    if total_facility_area > buffer_area:
+        scale_factor = buffer_area / total_facility_area
+        toilets = max(1, math.floor(toilets * scale_factor))
+        food_stalls = max(1, math.floor(food_stalls * scale_factor))
+
+    total_event_time = end_hour - start_hour
+    time_per_slot = total_event_time / slots if slots > 0 else 0
+    slot_schedule = []
+    slot_start = start_hour
+
+    for i in range(slots):
+        slot_end = slot_start + time_per_slot
+        slot_schedule.append(f"Slot {i + 1}: {format_time(slot_start)} - {format_time(slot_end)}")
+        slot_start = slot_end
+
+    return EventPlan(
+        area=aoe,
+        event_factor=event_factor,
+        possible_crowd=possible_crowd,
+        effective_area=effective_area,
+        buffer_area=buffer_area,
+        crowd_at_a_time=at_a_time,
+        slots=slots,
+        crowd_in_each_slot=crowd_in_each_slot,
+        exit_units=exit_info["Total Exit Units Required"],
+        num_exits=num_exits,
+        exit_width=exit_width,
+        gate_height=gate_height,
+        emergency_gate_area=emergency_gate_area,
+        remaining_buffer_area=remaining_buffer_area,
+        toilets=toilets,
+        food_stalls=food_stalls,
+        time_per_slot=time_per_slot,
+        slot_schedule=tuple(slot_schedule),
+        entry_per_exit=int(crowd_in_each_slot / num_exits),
+    )
+
+
+class PlanCache:
+    """Bounded LRU of plans keyed by their inputs, shared by every user of the process.
+
+    plan_event is pure, so entries never go stale. Concurrent requests for
+    the same inputs wait for the one computation in flight instead of
+    repeating it; rejected inputs (ValueError) are not cached. Both the
+    number of plans and their total slot count are bounded.
+    """
+
+    def __init__(self, max_entries=PLAN_CACHE_SIZE, max_slots=PLAN_CACHE_MAX_SLOTS):
+        self.max_entries = max_entries
+        self.max_slots = max_slots
+        self._slots = 0
+        self._entries = OrderedDict()  # key -> EventPlan
+        self._computing = {}  # key -> Event set when the computation in flight finishes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    @staticmethod
+    def key(shape, event_factor, start_hour, end_hour, length=None, width=None, radius=None, stage_area=0.0):
+        def number(value):
+            return None if value is None else float(value)
+        return (shape.lower(), float(event_factor), float(start_hour), float(end_hour),
+                number(length), number(width), number(radius), float(stage_area))
+
+    def plan(self, shape, event_factor, start_hour, end_hour, length=None, width=None, radius=None, stage_area=0.0):
+        key = self.key(shape, event_factor, start_hour, end_hour, length, width, radius, stage_area)
+        while True:
+            with self._lock:
+                plan = self._entries.get(key)
+                if plan is not None:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return plan
+                pending = self._computing.get(key)
+                if pending is None:
+                    pending = self._computing[key] = threading.Event()
+                    self._stats["misses"] += 1
+                    break
+                self._stats["coalesced"] += 1
+            pending.wait()
+
+        try:
+            plan = plan_event(shape, event_factor, start_hour, end_hour, length, width, radius, stage_area)
+            with self._lock:
+                self._entries[key] = plan
+                self._slots += plan.slots
+                while len(self._entries) > self.max_entries or self._slots > self.max_slots:
+                    self._slots -= self._entries.popitem(last=False)[1].slots
+            return plan
+        finally:
+            with self._lock:
+                self._computing.pop(key, None)
+            pending.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["slots"] = self._slots
+        return stats
+
+
+plan_cache = PlanCache()
@@ -0,0 +1,82 @@
+import threading
+import time
+from datetime import datetime
+
+from utils.availability_cache import AvailabilityCache
+
+SLOT = datetime(2030, 1, 1, 10)
+
+
+def test_hits_within_ttl():
+    cache = AvailabilityCache(ttl=60)
+    loads = []
+    loader = lambda slot: loads.append(slot) or 120
+    assert cache.get(SLOT, loader) == 120
+    assert cache.get(SLOT, loader) == 120
+    assert loads == [SLOT]
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entries_reload():
+    cache = AvailabilityCache(ttl=0.01)
+    counts = iter([120, 100])
+    assert cache.get(SLOT, lambda slot: next(counts)) == 120
+    time.sleep(0.02)
+    assert cache.get(SLOT, lambda slot: next(counts)) == 100
+
+
+def test_concurrent_misses_share_one_load():
+    cache = AvailabilityCache(ttl=60)
+    loads = []
+
+    def slow_loader(slot):
+        loads.append(slot)
+        time.sleep(0.05)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(SLOT, slow_loader))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [42] * 10
+    assert len(loads) == 1
+
+
+def test_invalidate_drops_the_entry():
+    cache = AvailabilityCache(ttl=60)
+    cache.set(SLOT, 120)
+    cache.invalidate(SLOT)
+    assert cache.get(SLOT, lambda slot: 118) == 118
+
+
+def test_a_load_that_raced_a_booking_is_not_cached():
+    cache = AvailabilityCache(ttl=60)
+
+    def loader(slot):
+        cache.invalidate(slot)  # a booking commits while the count is being read
+        return 120
+
+    assert cache.get(SLOT, loader) == 120
+    assert cache.stats()["entries"] == 0
+
+
+def test_failed_load_releases_waiters():
+    cache = AvailabilityCache(ttl=60)
+
+    def failing(slot):
+        raise RuntimeError("database down")
+
+    try:
+        cache.get(SLOT, failing)
+    except RuntimeError:
+        pass
+    assert cache.get(SLOT, lambda slot: 7) == 7
+
+
+def test_entries_are_bounded():
+    cache = AvailabilityCache(ttl=60, max_entries=2)
+    for hour in (8, 9, 10):
+        cache.set(datetime(2030, 1, 1, hour), 1)
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,64 @@
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch_planner import plan_batch, product_grid, table_rows, INT_COLUMNS
+from plan_engine import plan_event
+
+FLOAT_COLUMNS = ("area", "possible_crowd", "effective_area", "buffer_area", "crowd_at_a_time", "exit_width",
+                 "gate_height", "emergency_gate_area", "remaining_buffer_area", "time_per_slot")
+
+
+def scalar(row):
+    try:
+        return plan_event(row["shape"], row["event_factor"], row["start_hour"], row["end_hour"],
+                          length=row["length"], width=row["width"], radius=row["radius"],
+                          stage_area=row["stage_area"])
+    except ValueError:
+        return None
+
+
+def assert_rows_match(columns, n):
+    table = plan_batch(**columns)
+    for i in range(n):
+        row = {name: columns[name][i].item() if hasattr(columns[name][i], "item") else columns[name][i]
+               for name in columns}
+        for name in ("length", "width", "radius"):
+            row[name] = None if math.isnan(row[name]) else row[name]
+        plan = scalar(row)
+        assert bool(table["valid"][i]) == (plan is not None), row
+        if plan is None:
+            continue
+        for name in FLOAT_COLUMNS + INT_COLUMNS:
+            assert table[name][i] == getattr(plan, name), (name, row)
+
+
+def test_random_rows_match_plan_event():
+    rng = random.Random(7)
+    n = 3000
+    nan = float("nan")
+    shapes = [rng.choice(["circle", "rectangle", "Circle"]) for _ in range(n)]
+    columns = {
+        "shape": np.array(shapes),
+        "event_factor": np.array([rng.choice([0, 1.0, 1.2, 1.5, 2.0, rng.uniform(0.1, 5)]) for _ in range(n)]),
+        "start_hour": np.array([float(rng.randint(0, 12)) for _ in range(n)]),
+        "end_hour": np.array([float(rng.randint(12, 25)) for _ in range(n)]),
+        "length": np.array([rng.choice([rng.uniform(0.5, 300), nan]) for _ in range(n)]),
+        "width": np.array([rng.choice([rng.uniform(0.5, 300), nan]) for _ in range(n)]),
+        "radius": np.array([rng.choice([rng.uniform(0.5, 200), rng.uniform(1, 20), nan]) for _ in range(n)]),
+        "stage_area": np.array([rng.choice([0.0, rng.uniform(0, 5000)]) for _ in range(n)]),
+    }
+    assert_rows_match(columns, n)
+
+
+def test_grid_and_rows():
+    grid = product_grid(radius=[10.0, 50.0, 0.5], event_factor=[1.0, 2.0])
+    table = plan_batch("circle", grid["event_factor"], 10, 18, radius=grid["radius"])
+    rows = list(table_rows(table))
+    assert len(rows) == 6
+    assert [row["valid"] for row in rows] == [True, True, True, True, False, False]
+    assert rows[4]["slots"] == 0 and math.isnan(rows[4]["area"])
+    assert rows[2]["slots"] == plan_event("circle", 1.0, 10, 18, radius=50.0).slots
@@ -0,0 +1,69 @@
+"""Concurrent admission against a real scratch database; skipped unless one is configured.
+
+The database named by BOOKING_TEST_DB is dropped and rebuilt from migrations/:
+
+    DB_NAME=TicketBooking_test BOOKING_TEST_DB=TicketBooking_test DB_HOST=127.0.0.1 python -m pytest tests
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+TEST_DB = os.environ.get("BOOKING_TEST_DB")
+pytestmark = pytest.mark.skipif(not TEST_DB, reason="set BOOKING_TEST_DB (and DB_NAME to the same name) to run")
+
+
+@pytest.fixture(scope="module")
+def booking_db():
+    pytest.importorskip("flask")
+    pytest.importorskip("mysql.connector")
+    from utils import db_pool
+    if TEST_DB == "TicketBooking" or db_pool.DB_CONFIG["database"] != TEST_DB:
+        pytest.skip("DB_NAME must name the scratch database given in BOOKING_TEST_DB")
+
+    from bench import bench_booking
+    bench_booking.create_schema(db_pool)
+    return db_pool, bench_booking
+
+
+def test_hot_slot_never_oversells(booking_db):
+    db_pool, bench_booking = booking_db
+    from utils import slot_ledger
+    from utils.availability_cache import availability_cache
+    from utils.booking_rules import bookable_slots
+    import flask_api
+
+    random.seed(3)
+    bench_booking.reset_tables(db_pool, slot_ledger, availability_cache)
+    slots = list(bookable_slots(start=datetime.now() + timedelta(days=1)))
+    payloads = bench_booking.build_requests("hot_slot", 600, slots)
+
+    results, _ = bench_booking.run_scenario(flask_api.app, payloads, clients=16)
+    invariants = bench_booking.check_invariants(db_pool, slot_ledger)
+
+    assert [r for r in results if r[1] >= 500] == []
+    assert invariants["oversold_slots"] == 0
+    assert invariants["counter_drift_slots"] == 0
+    # Demand is about three times the capacity, so the slot fills up
+    assert slot_ledger.SLOT_CAPACITY - slot_ledger.MAX_TICKETS_PER_AADHAAR < invariants["tickets_booked"] <= slot_ledger.SLOT_CAPACITY
+
+
+def test_one_aadhaar_stays_within_its_limit(booking_db):
+    db_pool, bench_booking = booking_db
+    from utils import slot_ledger
+    from utils.availability_cache import availability_cache
+    from utils.booking_rules import bookable_slots
+    import flask_api
+
+    random.seed(4)
+    bench_booking.reset_tables(db_pool, slot_ledger, availability_cache)
+    slots = list(bookable_slots(start=datetime.now() + timedelta(days=1)))
+    payloads = bench_booking.build_requests("same_aadhaar", 400, slots)
+
+    results, _ = bench_booking.run_scenario(flask_api.app, payloads, clients=16)
+    invariants = bench_booking.check_invariants(db_pool, slot_ledger)
+
+    assert [r for r in results if r[1] >= 500] == []
+    assert invariants["over_limit_aadhaars"] == 0
+    assert invariants["counter_drift_slots"] == 0
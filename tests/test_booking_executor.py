@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from utils.booking_executor import BookingExecutor
+
+BOOKING = {"email": "asha@example.com", "ticket_count": 1}
+
+
+class StubBook:
+    """Booking function that holds every call until release() and records what it was given."""
+
+    def __init__(self, response=({"message": "Booking successful", "booking_id": "BK-00000001"}, 200)):
+        self.response = response
+        self.calls = []
+        self._gate = threading.Event()
+
+    def release(self):
+        self._gate.set()
+
+    def __call__(self, booking_data):
+        self.calls.append(booking_data)
+        self._gate.wait(5)
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+@pytest.fixture
+def book():
+    book = StubBook()
+    yield book
+    book.release()  # never leave a pool thread blocked
+
+
+def test_full_queue_rejects_new_bookings(book):
+    executor = BookingExecutor(book, workers=1, max_pending=2)
+    assert executor.submit("s1", BOOKING)
+    assert executor.submit("s2", BOOKING)
+    assert not executor.submit("s3", BOOKING)
+    assert executor.result("s3") is None
+    assert executor.stats()["rejected"] == 1
+
+    book.release()
+    assert executor.wait("s2", 5)["state"] == "done"
+    # Finished bookings free their places in the queue
+    assert executor.submit("s3", BOOKING)
+
+
+def test_duplicate_submit_while_in_flight_books_once(book):
+    executor = BookingExecutor(book, workers=2, max_pending=4)
+    assert executor.submit("s1", BOOKING)
+    assert executor.submit("s1", BOOKING)
+    book.release()
+    executor.wait("s1", 5)
+    assert len(book.calls) == 1
+    assert executor.stats()["submitted"] == 1
+
+
+def test_wait_times_out_while_the_booking_runs(book):
+    executor = BookingExecutor(book, workers=1, max_pending=2)
+    executor.submit("s1", BOOKING)
+    assert executor.wait("s1", 0.05) is None
+    assert executor.result("s1")["state"] == "pending"
+    assert executor.stats()["in_flight"] == 1
+
+
+def test_wait_returns_the_finished_outcome(book):
+    executor = BookingExecutor(book, workers=1, max_pending=2)
+    executor.submit("s1", BOOKING)
+    book.release()
+    outcome = executor.wait("s1", 5)
+    assert (outcome["state"], outcome["status"]) == ("done", 200)
+    assert outcome["response"]["booking_id"] == "BK-00000001"
+    # Once finished, wait and result answer without blocking
+    assert executor.wait("s1", 0) == executor.result("s1")
+    assert executor.stats() == {"submitted": 1, "rejected": 0, "succeeded": 1, "failed": 0, "in_flight": 0}
+
+
+def test_exception_in_booking_is_a_failed_outcome():
+    book = StubBook(RuntimeError("database is down"))
+    book.release()
+    executor = BookingExecutor(book, workers=1, max_pending=1)
+    executor.submit("s1", BOOKING)
+    outcome = executor.wait("s1", 5)
+    assert (outcome["status"], outcome["response"]) == (500, {"error": "database is down"})
+    assert executor.stats()["failed"] == 1
+    assert executor.submit("s2", BOOKING)  # the failed booking gave its place back
+
+
+def test_unknown_session_has_no_outcome():
+    executor = BookingExecutor(StubBook(), workers=1, max_pending=1)
+    assert executor.wait("nobody", 0) is None
@@ -0,0 +1,62 @@
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("mysql.connector")
+
+from utils import booking_import
+
+
+@pytest.fixture
+def admitted(monkeypatch):
+    admitted = []
+
+    def fake_admit_batch(bookings):
+        for booking in bookings:
+            booking["booking_id"] = f"BK-{len(admitted):08d}"
+            admitted.append(booking)
+        return [None] * len(bookings)
+
+    monkeypatch.setattr(booking_import, "_admit_batch", fake_admit_batch)
+    return admitted
+
+
+def row(n, **overrides):
+    slot = (datetime.now() + timedelta(days=2)).replace(hour=10 + n % 3).strftime("%Y-%m-%d %H")
+    data = {"username": f"user{n}", "email": f"user{n}@example.com", "aadhaar_number": f"{200000000000 + n}",
+            "ticket_count": 1, "date_time": slot}
+    data.update(overrides)
+    return data
+
+
+def ndjson(rows):
+    return io.BytesIO("".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in rows).encode())
+
+
+def test_every_row_gets_a_result_in_order(admitted):
+    lines = [row(1), row(2, date_time=12), "{not json", row(3, passenger_names=[None]), [1, 2], row(4)]
+    results = list(booking_import.import_bookings(
+        booking_import.read_rows(booking_import.open_lines(ndjson(lines)), "ndjson")))
+
+    assert [result["row"] for result in results] == [1, 2, 3, 4, 5, 6]
+    assert "booking_id" in results[0] and "booking_id" in results[5]
+    assert results[1]["error"] == "Invalid date format! Use YYYY-MM-DD HH"
+    assert results[2]["error"] == "Invalid row"
+    assert results[3]["error"] == "Invalid passenger names"
+    assert results[4]["error"] == "Invalid row"
+    assert len(admitted) == 2
+
+
+def test_csv_rows(admitted):
+    data = row(1)
+    text = ("username,email,aadhaar_number,ticket_count,date_time,passenger_names\n"
+            f"{data['username']},{data['email']},{data['aadhaar_number']},2,{data['date_time']},Asha; Ravi\n"
+            f"x,bad-email,{data['aadhaar_number']},1,{data['date_time']},\n")
+    results = list(booking_import.import_bookings(
+        booking_import.read_rows(booking_import.open_lines(io.BytesIO(text.encode())), "csv")))
+    assert "booking_id" in results[0]
+    assert results[1]["error"] == "Invalid email format"
+    assert admitted[0]["passenger_names"] == ["Asha", "Ravi"]
@@ -0,0 +1,127 @@
+from datetime import datetime
+
+import pytest
+
+from utils import gate
+from utils.gate import ADMITTED, ALREADY_CHECKED_IN, UNKNOWN, WRONG_SLOT, GateIndex
+
+SLOT = datetime(2030, 1, 1, 10)
+OTHER_SLOT = datetime(2030, 1, 1, 11)
+
+
+class FakeGateDB:
+    """bookings and checkins tables in memory; set fail to make the next writes raise."""
+
+    def __init__(self):
+        self.bookings = {}  # booking_id -> (slot_time, ticket_count)
+        self.checkins = {}  # booking_id -> row tuple as flushed
+        self.fail = False
+
+    def connection(self):
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    def execute(self, sql, params):
+        (slot_time,) = params
+        if sql.startswith("SELECT booking_id, ticket_count FROM bookings"):
+            self.result = [(booking_id, count) for booking_id, (slot, count) in self.db.bookings.items()
+                           if slot == slot_time]
+        else:
+            self.result = [(booking_id, row[4]) for booking_id, row in self.db.checkins.items()
+                           if row[1] == slot_time]
+
+    def executemany(self, sql, rows):
+        if self.db.fail:
+            raise ConnectionError("MySQL server has gone away")
+        for row in rows:
+            self.db.checkins.setdefault(row[0], row)
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeGateDB()
+    db.bookings = {"AAA111": (SLOT, 2), "BBB222": (SLOT, 1), "CCC333": (OTHER_SLOT, 3)}
+    monkeypatch.setattr(gate, "get_db_connection", db.connection)
+    return db
+
+
+@pytest.fixture
+def index(db):
+    index = GateIndex("north")
+    assert index.load(SLOT) == 2
+    return index
+
+
+def test_booking_checks_in_once(index):
+    assert index.scan(" aaa111\n", SLOT) == (ADMITTED, 2)
+    assert index.scan("AAA111", SLOT) == (ALREADY_CHECKED_IN, 2)
+    stats = index.stats()
+    assert (stats["admitted"], stats["duplicates"], stats["pending"]) == (1, 1, 1)
+
+
+def test_unknown_and_wrong_slot(index):
+    assert index.scan("ZZZ999", SLOT) == (UNKNOWN, None)
+    index.load(OTHER_SLOT)
+    assert index.scan("CCC333", SLOT) == (WRONG_SLOT, 3)
+    # Refused at the wrong gate, the booking can still check in for its own slot
+    assert index.scan("CCC333", OTHER_SLOT) == (ADMITTED, 3)
+
+
+def test_failed_flush_keeps_check_ins_queued(db, index):
+    index.scan("AAA111", SLOT)
+    db.fail = True
+    assert index.flush() == 0
+    index.scan("BBB222", SLOT)
+    assert index.stats()["pending"] == 2
+    assert index.stats()["flush_errors"] == 1
+    assert db.checkins == {}
+
+    db.fail = False
+    assert index.flush() == 2
+    assert [row[:4] for row in db.checkins.values()] == [("AAA111", SLOT, 2, "north"), ("BBB222", SLOT, 1, "north")]
+    assert index.stats()["pending"] == 0
+
+
+def test_reload_drops_cancelled_bookings_but_keeps_check_ins(db, index):
+    index.scan("AAA111", SLOT)
+    del db.bookings["AAA111"]  # cancelled after checking in, before the flush
+    del db.bookings["BBB222"]  # cancelled, never scanned
+    db.bookings["DDD444"] = (SLOT, 4)  # booked late
+
+    assert index.load(SLOT) == 1
+
+    assert index.scan("BBB222", SLOT) == (UNKNOWN, None)
+    assert index.scan("DDD444", SLOT) == (ADMITTED, 4)
+    assert index.scan("AAA111", SLOT) == (ALREADY_CHECKED_IN, 2)
+    assert index.flush() == 2
+
+
+def test_reload_picks_up_check_ins_from_other_processes(db, index):
+    db.checkins["BBB222"] = ("BBB222", SLOT, 1, "south", datetime(2030, 1, 1, 9, 55))
+    index.load(SLOT)
+    assert index.scan("BBB222", SLOT) == (ALREADY_CHECKED_IN, 1)
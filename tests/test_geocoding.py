@@ -0,0 +1,77 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from geocoding import Geocoder, normalize_address
+
+VENUE = (28.6129, 77.2295)
+
+
+@pytest.fixture
+def fixture_path(tmp_path):
+    path = tmp_path / "fixture.json"
+    path.write_text(json.dumps({"India Gate, New Delhi": list(VENUE)}), encoding="utf-8")
+    return str(path)
+
+
+def make_geocoder(tmp_path, fixture_path, offline, fetch=None):
+    geocoder = Geocoder("key", path=str(tmp_path / "geocode.db"), offline=offline, fixture_path=fixture_path)
+    geocoder.fetches = []
+
+    def fake_fetch(address):
+        geocoder.fetches.append(address)
+        if fetch is None:
+            raise AssertionError("the API must not be called")
+        return fetch(address)
+
+    geocoder._fetch = fake_fetch
+    return geocoder
+
+
+def store(geocoder, address, coords, expires_at):
+    geocoder._conn().execute(
+        "INSERT OR REPLACE INTO geocodes (address_key, lat, lon, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+        (normalize_address(address), coords[0] if coords else None, coords[1] if coords else None,
+         time.time(), expires_at))
+
+
+def test_normalize_address():
+    assert normalize_address("  India Gate ,New   Delhi. ") == "india gate, new delhi"
+
+
+def test_answers_are_cached(tmp_path, fixture_path):
+    geocoder = make_geocoder(tmp_path, fixture_path, offline=False, fetch=lambda address: VENUE)
+    assert geocoder.lookup("Connaught Place") == VENUE
+    assert geocoder.lookup("connaught place ") == VENUE
+    assert len(geocoder.fetches) == 1
+    # A fresh process reads the SQLite store instead of the API
+    again = make_geocoder(tmp_path, fixture_path, offline=False)
+    assert again.lookup("Connaught Place") == VENUE
+    assert again.stats()["store_hits"] == 1
+
+
+def test_offline_fixture_beats_a_stored_miss(tmp_path, fixture_path):
+    geocoder = make_geocoder(tmp_path, fixture_path, offline=True)
+    store(geocoder, "India Gate, New Delhi", None, time.time() + 3600)
+    assert geocoder.lookup("india gate, new delhi") == VENUE
+    assert geocoder.stats()["fixture_hits"] == 1
+
+
+def test_offline_uses_expired_answers(tmp_path, fixture_path):
+    geocoder = make_geocoder(tmp_path, fixture_path, offline=True)
+    store(geocoder, "Red Fort", (28.6562, 77.2410), time.time() - 10)
+    assert geocoder.lookup("Red Fort") == (28.6562, 77.2410)
+    assert geocoder.lookup("Nowhere") is None
+
+
+def test_api_errors_fall_back_to_the_fixture(tmp_path, fixture_path):
+    def failing(address):
+        raise RuntimeError("OVER_QUERY_LIMIT")
+
+    geocoder = make_geocoder(tmp_path, fixture_path, offline=False, fetch=failing)
+    store(geocoder, "India Gate, New Delhi", None, time.time() - 10)
+    assert geocoder.lookup("India Gate, New Delhi") == VENUE
+    assert geocoder.stats()["api_errors"] == 1
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from datetime import date
+
+import pytest
+
+pytest.importorskip("requests")
+
+import holiday_calendar
+from holiday_calendar import HolidayCalendar, factor_for
+
+REPUBLIC_DAY = date(2025, 1, 26)  # a Sunday
+HOLI = date(2025, 3, 14)  # a Friday
+
+
+@pytest.fixture
+def calendar(tmp_path):
+    calendar = HolidayCalendar("key", holiday_file=str(tmp_path / "holidays.json"))
+    calendar.fetches = []
+
+    def fake_fetch(year):
+        calendar.fetches.append(year)
+        return frozenset({REPUBLIC_DAY, HOLI}) if year == 2025 else frozenset()
+
+    calendar._fetch = fake_fetch
+    return calendar
+
+
+def test_factor_for():
+    holidays = {REPUBLIC_DAY, HOLI}
+    assert factor_for(REPUBLIC_DAY, holidays) == 2
+    assert factor_for(HOLI, holidays) == 1.5
+    assert factor_for(date(2025, 3, 15), holidays) == 1.2
+    assert factor_for(date(2025, 3, 17), holidays) == 1.0
+
+
+def test_a_year_is_fetched_once(calendar):
+    assert calendar.event_factor("2025-03-14") == 1.5
+    assert calendar.event_factor(date(2025, 1, 26)) == 2
+    factors = calendar.event_factors("2025-03-13", "2025-03-16")
+    assert list(factors.values()) == [1.0, 1.5, 1.2, 1.2]
+    assert calendar.fetches == [2025]
+
+
+def test_file_is_read_before_the_api(calendar):
+    with open(calendar.holiday_file, "w", encoding="utf-8") as f:
+        json.dump({"2025": ["2025-03-17"]}, f)
+    assert calendar.event_factor("2025-03-17") == 1.5
+    assert calendar.fetches == []
+
+
+def test_failed_fetch_is_retried_after_a_pause(calendar, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(holiday_calendar.time, "monotonic", lambda: now[0])
+    attempts = []
+
+    def failing_fetch(year):
+        attempts.append(year)
+        raise RuntimeError("quota exceeded")
+
+    calendar._fetch = failing_fetch
+    assert calendar.holidays(2025) == frozenset()
+    assert calendar.event_factor("2025-03-14") == 1.0
+    assert attempts == [2025]  # an outage is not refetched on every lookup
+
+    now[0] += holiday_calendar.FAILURE_TTL
+    calendar._fetch = lambda year: frozenset({HOLI})
+    assert calendar.holidays(2025) == frozenset({HOLI})
+
+
+def test_concurrent_lookups_share_one_fetch(calendar):
+    release = threading.Event()
+    fetches = []
+
+    def slow_fetch(year):
+        fetches.append(year)
+        release.wait(5)
+        return frozenset({HOLI})
+
+    calendar._fetch = slow_fetch
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(calendar.holidays(2025))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    # A year already loaded is served while 2025 is still being fetched
+    calendar._years[2024] = frozenset()
+    assert calendar.event_factor("2024-03-15") == 1.0
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert fetches == [2025]
+    assert results == [frozenset({HOLI})] * 8
+
+
+def test_save_keeps_other_years(calendar):
+    with open(calendar.holiday_file, "w", encoding="utf-8") as f:
+        json.dump({"2024": ["2024-01-26"]}, f)
+    calendar.save([2025])
+    with open(calendar.holiday_file, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data == {"2024": ["2024-01-26"], "2025": ["2025-01-26", "2025-03-14"]}
+
+
+def test_failed_save_writes_nothing(calendar):
+    def failing_fetch(year):
+        raise RuntimeError("quota exceeded")
+
+    calendar._fetch = failing_fetch
+    with pytest.raises(RuntimeError):
+        calendar.save([2025])
+    with pytest.raises(FileNotFoundError):
+        open(calendar.holiday_file, encoding="utf-8")
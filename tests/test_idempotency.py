@@ -0,0 +1,157 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError
+
+from utils import idempotency
+
+BOOKING = {"email": "asha@example.com", "aadhaar_number": "123412341234", "ticket_count": 2,
+           "date_time": "2030-01-01 10"}
+PAYLOAD = {"message": "Booking successful", "booking_id": "BK-00000001"}
+
+
+@pytest.fixture(autouse=True)
+def no_database(monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise AssertionError("the database must not be used")
+
+    monkeypatch.setattr(idempotency, "get_db_connection", unavailable)
+    idempotency._cache.clear()
+    yield
+    idempotency._cache.clear()
+
+
+def test_fingerprint_ignores_key_and_field_order():
+    reordered = dict(reversed(list(BOOKING.items())))
+    assert idempotency.fingerprint(BOOKING) == idempotency.fingerprint({**reordered, "idempotency_key": "k1"})
+    assert idempotency.fingerprint(BOOKING) != idempotency.fingerprint({**BOOKING, "ticket_count": 3})
+
+
+def test_session_key_is_stable_per_session_and_details():
+    key = idempotency.session_key("session-a", BOOKING)
+    assert key == idempotency.session_key("session-a", dict(BOOKING))
+    assert key != idempotency.session_key("session-b", BOOKING)
+    assert len(key) <= idempotency.MAX_KEY_LENGTH
+
+
+def test_replay_returns_the_stored_result():
+    fp = idempotency.fingerprint(BOOKING)
+    assert idempotency.replay((fp, PAYLOAD, 200), fp) == (PAYLOAD, 200)
+    assert idempotency.replay((fp, PAYLOAD, 200), "other")[1] == 422
+
+
+def test_committed_results_replay_from_memory():
+    fp = idempotency.fingerprint(BOOKING)
+    idempotency.committed("key-1", fp, PAYLOAD, 200)
+    stored = idempotency.lookup("key-1")
+    assert idempotency.replay(stored, fp) == (PAYLOAD, 200)
+
+
+class ClaimCursor:
+    """The INSERT hits a duplicate key; the locking read then returns `existing`."""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.inserts = 0
+        self.deleted = False
+
+    def execute(self, sql, params=None):
+        if sql.startswith("INSERT"):
+            self.inserts += 1
+            if self.inserts == 1:
+                raise IntegrityError(errno=errorcode.ER_DUP_ENTRY, msg="Duplicate entry")
+        elif sql.startswith("DELETE"):
+            self.deleted = True
+
+    def fetchone(self):
+        return self.existing
+
+
+def test_claim_returns_a_concurrent_duplicate_result():
+    fp = idempotency.fingerprint(BOOKING)
+    cursor = ClaimCursor((fp, '{"message": "Booking successful", "booking_id": "BK-00000001"}', 200, 1900000000, 0))
+    stored = idempotency.claim(cursor, "key-1", fp, PAYLOAD, 200)
+    assert idempotency.replay(stored, fp) == (PAYLOAD, 200)
+    assert cursor.inserts == 1
+
+
+def test_claim_reuses_an_expired_key():
+    fp = idempotency.fingerprint(BOOKING)
+    cursor = ClaimCursor(("old", "{}", 200, 0, 1))
+    assert idempotency.claim(cursor, "key-1", fp, PAYLOAD, 200) is None
+    assert cursor.deleted and cursor.inserts == 2
+
+
+def test_create_booking_replays_without_booking_again():
+    pytest.importorskip("flask")
+    import flask_api
+
+    fp = idempotency.fingerprint(BOOKING)
+    idempotency.committed("key-2", fp, PAYLOAD, 200)
+    assert flask_api.create_booking(dict(BOOKING), "key-2") == (PAYLOAD, 200)
+    assert flask_api.create_booking({**BOOKING, "ticket_count": 4}, "key-2")[1] == 422
+
+
+def test_lookup_pool_timeout_is_a_busy_response(monkeypatch):
+    pytest.importorskip("flask")
+    import flask_api
+    from utils.db_pool import PoolTimeout
+
+    def exhausted():
+        raise PoolTimeout("No database connection available within 5s")
+
+    monkeypatch.setattr(idempotency, "get_db_connection", exhausted)
+    payload, status = flask_api.create_booking(dict(BOOKING), "key-3")
+    assert status == 503 and "busy" in payload["error"]
+
+
+class CancelConnection:
+    """Finds one booking for the cancellation and records every statement."""
+
+    def __init__(self):
+        self.statements = []
+        self.committed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+
+    def fetchone(self):
+        return "asha@example.com", datetime(2030, 1, 1, 10), 2
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_cancelling_a_booking_forgets_its_idempotency_keys(monkeypatch):
+    pytest.importorskip("flask")
+    import flask_api
+
+    fp = idempotency.fingerprint(BOOKING)
+    idempotency.committed("key-4", fp, PAYLOAD, 200)
+    idempotency.committed("key-5", fp, {**PAYLOAD, "booking_id": "BK-00000002"}, 200)
+    db = CancelConnection()
+    monkeypatch.setattr(flask_api, "get_db_connection", lambda: db)
+    monkeypatch.setattr(flask_api.waitlist, "promote_waitlist", lambda slot_time: [])
+
+    assert flask_api.cancel_booking("BK-00000001", BOOKING["aadhaar_number"])[1] == 200
+
+    assert db.committed
+    assert ("DELETE FROM idempotency_keys WHERE booking_id = %s", ("BK-00000001",)) in db.statements
+    assert "key-4" not in idempotency._cache
+    assert idempotency.lookup("key-5")[1]["booking_id"] == "BK-00000002"
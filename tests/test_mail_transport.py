@@ -0,0 +1,108 @@
+import smtplib
+from email.mime.text import MIMEText
+
+import pytest
+
+from utils import mail_transport
+from utils.mail_transport import SMTPTransport
+
+
+class FakeSMTP:
+    """Stands in for smtplib.SMTP; refuses recipients listed in `refused`, drops after `drop_after` sends."""
+
+    refused = set()
+    drop_after = None
+    opened = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.closed = False
+        FakeSMTP.opened.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def noop(self):
+        return (250, b"OK")
+
+    def sendmail(self, sender, recipients, body):
+        if self.closed:
+            raise smtplib.SMTPServerDisconnected("please run connect() first")
+        if FakeSMTP.drop_after is not None and len(self.sent) >= FakeSMTP.drop_after:
+            self.closed = True
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        if recipients[0] in FakeSMTP.refused:
+            raise smtplib.SMTPRecipientsRefused({recipients[0]: (550, b"No such user")})
+        self.sent.append(recipients[0])
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_smtp(monkeypatch):
+    FakeSMTP.refused = set()
+    FakeSMTP.drop_after = None
+    FakeSMTP.opened = []
+    monkeypatch.setattr(mail_transport.smtplib, "SMTP", FakeSMTP)
+
+
+def message(to):
+    msg = MIMEText("ticket")
+    msg["From"] = "noreply@example.com"
+    msg["To"] = to
+    return msg
+
+
+def test_refused_recipient_keeps_the_session():
+    FakeSMTP.refused = {"bad1@example.com", "bad2@example.com", "bad3@example.com"}
+    transport = SMTPTransport(user="")
+    addresses = ["a@example.com", "bad1@example.com", "bad2@example.com", "b@example.com", "bad3@example.com"]
+
+    results = transport.send_many([message(to) for to in addresses])
+
+    assert results == [True, False, False, True, False]
+    assert len(FakeSMTP.opened) == 1
+    assert FakeSMTP.opened[0].sent == ["a@example.com", "b@example.com"]
+    stats = transport.stats()
+    assert stats["reconnects"] == 0
+    assert stats["sessions_opened"] == 1
+    assert (stats["sent"], stats["failed"]) == (2, 3)
+
+
+def test_dropped_session_reconnects_and_resends():
+    FakeSMTP.drop_after = 2
+    transport = SMTPTransport(user="")
+
+    results = transport.send_many([message(f"user{i}@example.com") for i in range(3)])
+
+    assert results == [True, True, True]
+    assert len(FakeSMTP.opened) == 2
+    assert FakeSMTP.opened[1].sent == ["user2@example.com"]
+    assert transport.stats()["reconnects"] == 1
+
+
+def test_sessions_are_reused_across_calls():
+    transport = SMTPTransport(user="", pool_size=1)
+
+    assert transport.send(message("a@example.com"))
+    assert transport.send(message("b@example.com"))
+
+    assert len(FakeSMTP.opened) == 1
+    assert transport.stats()["idle_sessions"] == 1
+
+
+def test_session_is_rotated_after_max_messages():
+    transport = SMTPTransport(user="", max_per_session=2)
+
+    results = transport.send_many([message(f"user{i}@example.com") for i in range(5)])
+
+    assert results == [True] * 5
+    assert [len(server.sent) for server in FakeSMTP.opened] == [2, 2, 1]
+    assert transport.stats()["reconnects"] == 0
@@ -0,0 +1,91 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from utils import outbox, mail_transport
+
+
+class FakeDB:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+def row(attempts, kind="confirmation"):
+    payload = {"email": "asha@example.com", "date_time": "2030-01-01 10", "ticket_count": 2, "username": "asha"}
+    return (7, "BK-00000001", kind, payload, attempts)
+
+
+def test_backoff_doubles_up_to_the_cap():
+    delays = [outbox._backoff(attempts) for attempts in range(1, 10)]
+    assert delays[:4] == [30, 60, 120, 240]
+    assert max(delays) == outbox.MAX_BACKOFF
+    assert delays == sorted(delays)
+
+
+def test_delivered_row_is_marked_sent():
+    db = FakeDB()
+    outbox.mark(db, row(1), None)
+    sql, params = db.statements[0]
+    assert "status = 'sent'" in sql and params == (7,)
+    assert db.commits == 1
+
+
+def test_failed_row_is_retried_with_backoff():
+    db = FakeDB()
+    outbox.mark(db, row(2), "SMTP send failed")
+    sql, params = db.statements[0]
+    assert "status = 'pending'" in sql and "status = 'sending'" in sql
+    assert params == ("SMTP send failed", 60, 7)
+
+
+def test_row_gives_up_after_max_attempts():
+    db = FakeDB()
+    outbox.mark(db, row(outbox.MAX_ATTEMPTS), "x" * 600)
+    sql, params = db.statements[0]
+    assert "status = 'failed'" in sql
+    assert params == ("x" * 500, 7)
+
+
+def test_deliver_reports_errors_per_row(monkeypatch):
+    class FakeTransport:
+        def send_many(self, messages):
+            return [message != "bad" for message in messages]
+
+    monkeypatch.setattr(mail_transport, "get_transport", lambda: FakeTransport())
+
+    def build(email, booking_id, date_time, ticket_count, username):
+        if username == "broken":
+            raise ValueError("template error")
+        return "bad" if username == "refused" else "ok"
+
+    rows = [row(1), row(1, kind="unknown"), row(1), row(1), row(1)]
+    rows[2][3]["username"] = "broken"
+    rows[3][3]["username"] = "refused"
+
+    errors = outbox.deliver(rows, {"confirmation": build})
+    assert errors[0] is None
+    assert errors[1] == "Unknown email kind: unknown"
+    assert errors[2] == "template error"
+    assert errors[3] == "SMTP send failed"
+    assert errors[4] is None
+
+
+def test_cancel_targets_unsent_rows_of_the_booking():
+    db = FakeDB()
+    outbox.cancel(db, "BK-00000001")
+    sql, params = db.statements[0]
+    assert "status = 'cancelled'" in sql and "('pending', 'sending')" in sql
+    assert params == ("BK-00000001",)
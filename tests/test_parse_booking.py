@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("mysql.connector")
+
+from flask_api import parse_booking
+
+
+def slot():
+    day = datetime.now() + timedelta(days=2)
+    return day.replace(hour=10).strftime("%Y-%m-%d %H")
+
+
+def payload(**overrides):
+    data = {"username": "asha", "email": "asha@example.com", "aadhaar_number": "123412341234",
+            "ticket_count": 2, "date_time": slot(), "passenger_names": ["Asha", "Ravi"]}
+    data.update(overrides)
+    return data
+
+
+def test_valid_booking():
+    booking, error = parse_booking(payload())
+    assert error is None
+    assert booking["slot_time"] == datetime.strptime(slot(), "%Y-%m-%d %H")
+    assert booking["ticket_count"] == 2
+
+
+def test_numeric_aadhaar_is_accepted_as_a_string():
+    booking, error = parse_booking(payload(aadhaar_number=123412341234))
+    assert error is None
+    assert booking["aadhaar_number"] == "123412341234"
+
+
+@pytest.mark.parametrize("overrides, error", [
+    ({"email": "not-an-email"}, "Invalid email format"),
+    ({"email": None}, "Invalid email format"),
+    ({"aadhaar_number": "1234"}, "Invalid Aadhaar number"),
+    ({"aadhaar_number": ["123412341234"]}, "Invalid Aadhaar number"),
+    ({"ticket_count": 0}, "Invalid ticket count"),
+    ({"ticket_count": "two"}, "Invalid ticket count"),
+    ({"date_time": "tomorrow"}, "Invalid date format! Use YYYY-MM-DD HH"),
+    ({"date_time": 12}, "Invalid date format! Use YYYY-MM-DD HH"),
+    ({"date_time": None}, "Invalid date format! Use YYYY-MM-DD HH"),
+    ({"username": {"first": "Asha"}}, "Invalid username"),
+    ({"passenger_names": "Asha"}, "Invalid passenger names"),
+    ({"passenger_names": [None]}, "Invalid passenger names"),
+    ({"passenger_names": [{"name": "Asha"}]}, "Invalid passenger names"),
+    ({"passenger_names": ["Asha", " "]}, "Invalid passenger names"),
+    ({"passenger_names": ["Asha", "Ravi", "Meena"]}, "Invalid passenger names"),
+    ({"passenger_names": ["x" * 101]}, "Invalid passenger names"),
+])
+def test_rejections(overrides, error):
+    assert parse_booking(payload(**overrides)) == (None, error)
+
+
+def test_passenger_names_are_optional():
+    booking, error = parse_booking(payload(passenger_names=[]))
+    assert error is None and booking["passenger_names"] == []
+    without_names = payload()
+    del without_names["passenger_names"]
+    assert parse_booking(without_names)[1] is None
+
+
+def test_bad_bulk_item_is_rejected_on_its_own():
+    from flask_api import app
+
+    items = [payload(date_time=12), payload(passenger_names=[None]), {"email": 5}, "not a booking"]
+    response = app.test_client().post("/book_tickets/bulk", json={"bookings": items})
+    assert response.status_code == 200
+    assert response.get_json()["rejected"] == 4
+    assert [result["error"] for result in response.get_json()["results"]] == [
+        "Invalid date format! Use YYYY-MM-DD HH", "Invalid passenger names", "Invalid email format", "Invalid booking"]
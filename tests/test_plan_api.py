@@ -0,0 +1,28 @@
+import pytest
+
+flask = pytest.importorskip("flask")
+
+from plan_api import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_plan(client):
+    response = client.post("/plan", json={"shape": "circle", "radius": 50, "event_factor": 1.5,
+                                          "start_hour": 10, "end_hour": 18})
+    assert response.status_code == 200
+    assert response.get_json()["possible_crowd"] == 9000
+
+
+@pytest.mark.parametrize("body", [
+    {"shape": "circle", "radius": 50, "event_factor": 0},
+    {"shape": "circle", "radius": 50, "event_factor": "inf"},
+    {"shape": "circle", "radius": 0.001, "event_factor": 1},
+    {"shape": "circle", "radius": "abc", "event_factor": 1},
+    {"shape": "circle", "radius": 50},
+])
+def test_bad_input_is_a_400(client, body):
+    assert client.post("/plan", json={"start_hour": 10, "end_hour": 18, **body}).status_code == 400
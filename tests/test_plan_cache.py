@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+import plan_engine
+from plan_engine import PlanCache
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    plan_event = plan_engine.plan_event
+
+    def slow_plan_event(*args, **kwargs):
+        calls.append(args)
+        time.sleep(0.05)
+        return plan_event(*args, **kwargs)
+
+    monkeypatch.setattr(plan_engine, "plan_event", slow_plan_event)
+    return calls
+
+
+def test_concurrent_identical_requests_compute_once(calls):
+    cache = PlanCache()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.plan("circle", 1.5, 10, 18, radius=50)))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 20 and all(result is results[0] for result in results)
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] + stats["coalesced"] >= 19
+
+
+def test_equivalent_inputs_share_an_entry(calls):
+    cache = PlanCache()
+    first = cache.plan("Circle", 1.5, 10, 18, radius=50)
+    assert cache.plan("circle", 1.5, 10.0, 18.0, radius=50.0) is first
+    assert len(calls) == 1
+
+
+def test_lru_eviction_by_count(calls):
+    cache = PlanCache(max_entries=2)
+    for radius in (10, 20, 30):
+        cache.plan("circle", 1.0, 10, 18, radius=radius)
+    cache.plan("circle", 1.0, 10, 18, radius=30)
+    assert cache.stats()["entries"] == 2
+    cache.plan("circle", 1.0, 10, 18, radius=10)
+    assert len(calls) == 4  # radius 10 was evicted and computed again
+
+
+def test_eviction_by_total_slots(calls):
+    big = plan_engine.plan_event("circle", 2.0, 7, 21, radius=5)
+    calls.clear()
+    cache = PlanCache(max_slots=big.slots * 2)
+    for radius in (5, 5.5, 6):
+        cache.plan("circle", 2.0, 7, 21, radius=radius)
+    assert cache.stats()["slots"] <= big.slots * 2
+    assert cache.stats()["entries"] < 3
+
+
+def test_errors_are_not_cached(calls):
+    cache = PlanCache()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.plan("circle", 1.0, 10, 18)
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
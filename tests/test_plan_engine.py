@@ -0,0 +1,67 @@
+import math
+
+import pytest
+
+from plan_engine import plan_event, calculate_emergency_exits, format_time, MAX_SLOTS
+
+
+def test_circle_plan():
+    plan = plan_event("Circle", event_factor=1.5, start_hour=10, end_hour=18, radius=50)
+    assert plan.area == math.pi * 50 ** 2
+    assert plan.possible_crowd == 9000
+    assert plan.slots == math.ceil(9000 / plan.crowd_at_a_time)
+    assert len(plan.slot_schedule) == plan.slots
+    assert plan.slot_schedule[0].startswith("Slot 1: 10:00 - ")
+    assert plan.slot_schedule[-1].endswith("18:00")
+
+
+def test_rectangle_plan_with_stage():
+    plan = plan_event("rectangle", event_factor=1.0, start_hour=9, end_hour=21, length=100, width=50, stage_area=200)
+    assert plan.area == 5000
+    assert plan.effective_area == 0.8 * 5000 - 200
+    assert plan.slots == 3
+    assert plan.time_per_slot == 4
+    assert plan.toilets >= 2 and plan.food_stalls >= 2
+    assert plan.to_dict()["slot_schedule"] == list(plan.slot_schedule)
+
+
+def test_emergency_exits():
+    assert calculate_emergency_exits(1000) == {
+        "Total Exit Units Required": 10,
+        "Number of Emergency Exits Required": 2,
+        "Suggested Exit Width (meters) per Exit": 3.75,
+    }
+
+
+def test_format_time():
+    assert format_time(9.5) == "09:30"
+    assert format_time(0) == "00:00"
+
+
+@pytest.mark.parametrize("kwargs", [
+    dict(shape="triangle", radius=50),
+    dict(shape="circle"),
+    dict(shape="circle", radius=0.03),
+    dict(shape="circle", radius=float("nan")),
+    dict(shape="circle", radius=1e200),
+    dict(shape="rectangle", length=10),
+    dict(shape="rectangle", length=10, width=0.5),
+    dict(shape="circle", radius=50, event_factor=0),
+    dict(shape="circle", radius=50, event_factor=-1),
+    dict(shape="circle", radius=50, event_factor=float("inf")),
+    dict(shape="circle", radius=50, stage_area=-1),
+    dict(shape="circle", radius=50, stage_area=1e9),
+    dict(shape="circle", radius=50, end_hour=float("inf")),
+])
+def test_unusable_input_raises_value_error(kwargs):
+    kwargs = {"event_factor": 1.0, "start_hour": 10, "end_hour": 18, **kwargs}
+    with pytest.raises(ValueError):
+        plan_event(**kwargs)
+
+
+def test_slot_count_is_bounded():
+    # A tiny venue for a big crowd would otherwise build millions of schedule rows
+    with pytest.raises(ValueError):
+        plan_event("circle", event_factor=1e308, start_hour=10, end_hour=18, radius=50)
+    plan = plan_event("circle", event_factor=2.0, start_hour=7, end_hour=21, radius=10)
+    assert plan.slots <= MAX_SLOTS
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from utils import resend_job
+
+SLOT = datetime(2030, 1, 1, 10)
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    rows = [(f"BK-{i:08d}", f"user{i}@example.com", SLOT + timedelta(hours=i // 100), 1, "user") for i in range(500)]
+    monkeypatch.setattr(resend_job, "stream_bookings", lambda start, end, after=None: iter(
+        [row for row in rows if after is None or (row[2], row[0]) > after]))
+    monkeypatch.setattr(resend_job, "PUT_CHECK_INTERVAL", 0.05)
+    return rows
+
+
+def test_checkpoint_only_moves_past_a_contiguous_prefix(tmp_path):
+    checkpoint = resend_job.Checkpoint(str(tmp_path / "cp.json"))
+    for seq in range(3):
+        checkpoint.track(seq, SLOT, f"BK-{seq}")
+    checkpoint.complete(1, True)
+    assert checkpoint.after is None
+    checkpoint.complete(0, True)
+    assert checkpoint.after == (SLOT, "BK-1")
+    checkpoint.complete(2, False)
+    checkpoint.save()
+    assert resend_job.Checkpoint(str(tmp_path / "cp.json")).state == {
+        "after": ["2030-01-01 10:00:00", "BK-2"], "sent": 2, "failed": 1}
+
+
+def test_run_sends_everything(tmp_path, rows, monkeypatch):
+    sent = []
+
+    def fake_send_batches(batches, checkpoint, failures, failures_lock):
+        while True:
+            batch = batches.get()
+            if batch is None:
+                break
+            for seq, row in batch:
+                sent.append(row[0])
+                checkpoint.complete(seq, True)
+
+    monkeypatch.setattr(resend_job, "_send_batches", fake_send_batches)
+    state = resend_job.run(SLOT, SLOT + timedelta(days=1), str(tmp_path / "cp.json"), workers=3, batch_size=7)
+    assert sorted(sent) == [row[0] for row in rows]
+    assert state["sent"] == len(rows) and state["after"][1] == rows[-1][0]
+
+
+def test_dead_workers_stop_the_run_instead_of_hanging(tmp_path, rows, monkeypatch):
+    def broken_send_batches(batches, checkpoint, failures, failures_lock):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(resend_job, "_send_batches", broken_send_batches)
+    with pytest.raises(RuntimeError):
+        resend_job.run(SLOT, SLOT + timedelta(days=1), str(tmp_path / "cp.json"), workers=2, batch_size=5)
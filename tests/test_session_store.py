@@ -0,0 +1,90 @@
+import pytest
+
+from utils import session_store
+from utils.session_store import MemorySessionStore, SQLiteSessionStore, create_session_store
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store.time, "time", clock)
+    return clock
+
+
+def started(store, session_id, email):
+    record = store.get(session_id)
+    record.email = email
+    store.save(session_id, record)
+    return record
+
+
+def test_memory_session_expires_after_ttl(clock):
+    store = MemorySessionStore(ttl=60)
+    started(store, "s1", "asha@example.com")
+    clock.now += 60
+    assert store.get("s1").email == "asha@example.com"  # activity renews the session
+    clock.now += 61
+    assert store.get("s1").email is None
+
+
+def test_memory_store_evicts_least_recently_used(clock):
+    store = MemorySessionStore(max_sessions=2, ttl=60)
+    started(store, "s1", "one@example.com")
+    clock.now += 1
+    started(store, "s2", "two@example.com")
+    clock.now += 1
+    store.get("s1")  # s2 is now the least recently used
+    clock.now += 1
+    started(store, "s3", "three@example.com")
+
+    assert store.stats()["sessions"] == 2
+    assert store.stats()["evicted"] == 1
+    assert store.get("s1").email == "one@example.com"
+    assert store.get("s2").email is None
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path, clock):
+    path = str(tmp_path / "sessions.db")
+    first, second = SQLiteSessionStore(path, ttl=60), SQLiteSessionStore(path, ttl=60)
+    record = started(first, "s1", "asha@example.com")
+    record.ticket_count = 2
+    first.save("s1", record)
+
+    shared = second.get("s1")
+    assert (shared.email, shared.ticket_count) == ("asha@example.com", 2)
+    assert second.pop("s1").email == "asha@example.com"
+    assert first.get("s1").email is None
+
+
+def test_sqlite_session_expires_after_ttl(tmp_path, clock):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=60)
+    started(store, "s1", "asha@example.com")
+    clock.now += 61
+    assert store.get("s1").email is None
+
+
+def test_sqlite_purge_keeps_the_newest_sessions(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(SQLiteSessionStore, "PURGE_EVERY", 4)
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), max_sessions=2, ttl=60)
+    for session_id in ("s1", "s2", "s3", "s4"):
+        clock.now += 1
+        started(store, session_id, session_id + "@example.com")
+
+    assert store.stats()["sessions"] == 2
+    assert store.get("s1").email is None
+    assert store.get("s4").email == "s4@example.com"
+
+
+def test_create_session_store(tmp_path):
+    assert isinstance(create_session_store("memory"), MemorySessionStore)
+    assert isinstance(create_session_store("sqlite:///" + str(tmp_path / "s.db")), SQLiteSessionStore)
+    with pytest.raises(ValueError):
+        create_session_store("redis://localhost")
@@ -0,0 +1,156 @@
+from datetime import datetime
+
+import pytest
+
+from utils import slot_ledger
+from utils.slot_ledger import SLOT_CAPACITY, SLOT_FULL_ERROR, AADHAAR_LIMIT_ERROR
+
+SLOT = datetime(2030, 1, 1, 10)
+AADHAAR = "123412341234"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(slot_ledger.time, "monotonic", clock)
+    slot_ledger._slot_booked.clear()
+    slot_ledger._aadhaar_booked.clear()
+    yield clock
+    slot_ledger._slot_booked.clear()
+    slot_ledger._aadhaar_booked.clear()
+
+
+def test_unknown_slot_asks_the_database():
+    assert slot_ledger.check_cached(SLOT, AADHAAR, 1) is None
+
+
+def test_recently_read_full_slot_is_rejected():
+    slot_ledger._remember({SLOT: SLOT_CAPACITY}, {(AADHAAR, SLOT): 0})
+    assert slot_ledger.check_cached(SLOT, AADHAAR, 1) == SLOT_FULL_ERROR
+
+
+def test_aadhaar_limit_is_rejected():
+    slot_ledger._remember({SLOT: 10}, {(AADHAAR, SLOT): slot_ledger.MAX_TICKETS_PER_AADHAAR})
+    assert slot_ledger.check_cached(SLOT, AADHAAR, 1) == AADHAAR_LIMIT_ERROR
+
+
+def test_stale_entry_is_not_trusted(clock):
+    # Another process may have cancelled since the count was read
+    slot_ledger._remember({SLOT: SLOT_CAPACITY}, {})
+    clock.now += slot_ledger.MIRROR_TTL
+    assert slot_ledger.check_cached(SLOT, AADHAAR, 1) is None
+    assert slot_ledger.cached_slot_booked(SLOT) is None
+
+
+def test_record_applies_bookings_and_releases():
+    slot_ledger._remember({SLOT: SLOT_CAPACITY - 2}, {(AADHAAR, SLOT): 0})
+    slot_ledger.record(SLOT, AADHAAR, 2)
+    assert slot_ledger.check_cached(SLOT, AADHAAR, 1) == SLOT_FULL_ERROR
+    slot_ledger.record(SLOT, AADHAAR, -2)
+    assert slot_ledger.cached_slot_booked(SLOT) == SLOT_CAPACITY - 2
+    assert slot_ledger.check_cached(SLOT, AADHAAR, 1) is None
+
+
+class FakeCursor:
+    """Answers ADMIT_SQL with admit_rowcount and the counter read with counters (None = rows missing)."""
+
+    def __init__(self, admit_rowcount, counters):
+        self.admit_rowcount = admit_rowcount
+        self.counters = counters
+        self.rowcount = 0
+        self.admits = 0
+
+    def execute(self, sql, params=None):
+        self.rowcount = 0
+        if sql == slot_ledger.ADMIT_SQL:
+            self.admits += 1
+            self.rowcount = self.admit_rowcount
+
+    def fetchone(self):
+        return self.counters
+
+
+def test_reserve_admits():
+    cursor = FakeCursor(admit_rowcount=1, counters=None)
+    assert slot_ledger.reserve(cursor, SLOT, AADHAAR, 2) is None
+    assert cursor.admits == 1
+
+
+@pytest.mark.parametrize("counters, error", [
+    ((SLOT_CAPACITY - 1, 0), SLOT_FULL_ERROR),
+    ((10, 3), AADHAAR_LIMIT_ERROR),
+])
+def test_reserve_explains_a_rejection(counters, error):
+    assert slot_ledger.reserve(FakeCursor(admit_rowcount=0, counters=counters), SLOT, AADHAAR, 2) == error
+    assert slot_ledger.cached_slot_booked(SLOT) == counters[0]
+
+
+def test_missing_counter_rows_are_retryable_not_full():
+    cursor = FakeCursor(admit_rowcount=0, counters=None)
+    assert slot_ledger.reserve(cursor, SLOT, AADHAAR, 2) == slot_ledger.COUNTERS_UNAVAILABLE_ERROR
+    assert cursor.admits == 2
+
+
+class RebuildDB:
+    """Records the rebuild's statements and serves the counter tables back for load_mirror."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.statements = []
+        self.committed = self.rolled_back = False
+        self._result = []
+
+    def cursor(self):
+        return self
+
+    def start_transaction(self):
+        pass
+
+    def execute(self, sql, params=None):
+        if self.fail_on and sql.startswith(self.fail_on):
+            raise RuntimeError("lock wait timeout")
+        self.statements.append(sql)
+        if sql.startswith("SELECT slot_time, booked FROM slot_counters"):
+            self._result = [(SLOT, 12)]
+        elif sql.startswith("SELECT aadhaar_number, slot_time, booked FROM aadhaar_slot_counters"):
+            self._result = [(AADHAAR, SLOT, 4)]
+
+    def fetchall(self):
+        return self._result
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+
+def test_rebuild_recomputes_counters_and_reloads_the_mirror():
+    db = RebuildDB()
+    slot_ledger.rebuild_from_bookings(db)
+    assert db.committed
+    assert [sql.split(" (")[0] for sql in db.statements[:4]] == [
+        "DELETE FROM slot_counters", "INSERT INTO slot_counters",
+        "DELETE FROM aadhaar_slot_counters", "INSERT INTO aadhaar_slot_counters"]
+    assert all("FROM bookings" in sql for sql in (db.statements[1], db.statements[3]))
+    assert slot_ledger.cached_slot_booked(SLOT) == 12
+    assert slot_ledger.cached_aadhaar_booked(AADHAAR, SLOT) == 4
+
+
+def test_failed_rebuild_rolls_back():
+    db = RebuildDB(fail_on="INSERT INTO aadhaar_slot_counters")
+    with pytest.raises(RuntimeError):
+        slot_ledger.rebuild_from_bookings(db)
+    assert db.rolled_back and not db.committed
+    assert slot_ledger.cached_slot_booked(SLOT) is None
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.booking_rules import is_bookable, bookable_slots
+from utils.validators import is_valid_email, is_valid_aadhaar, normalize_aadhaar
+
+
+@pytest.mark.parametrize("email, valid", [
+    ("user@example.com", True),
+    ("first.last+tag@mail.example.co.in", True),
+    ("user@", False),
+    ("user example.com", False),
+    ("", False),
+    (None, False),
+])
+def test_is_valid_email(email, valid):
+    assert is_valid_email(email) == valid
+
+
+@pytest.mark.parametrize("aadhaar, valid", [
+    ("123412341234", True),
+    (123412341234, True),
+    (123412341234.0, True),
+    ("12341234123", False),
+    ("1234123412345", False),
+    ("12341234123a", False),
+    ("1234 1234 1234", False),
+    (1234.5, False),
+    (True, False),
+    (None, False),
+])
+def test_is_valid_aadhaar(aadhaar, valid):
+    assert is_valid_aadhaar(aadhaar) == valid
+
+
+def test_normalize_aadhaar():
+    assert normalize_aadhaar(123412341234) == "123412341234"
+    assert normalize_aadhaar(123412341234.0) == "123412341234"
+    assert normalize_aadhaar("123412341234") == "123412341234"
+    assert normalize_aadhaar(None) is None
+
+
+def test_is_bookable():
+    now = datetime(2030, 1, 1, 8, 30)
+    assert is_bookable(datetime(2030, 1, 1, 10), now)
+    assert not is_bookable(datetime(2030, 1, 1, 8), now)  # already started
+    assert not is_bookable(datetime(2030, 1, 2, 6), now)
+    assert not is_bookable(datetime(2030, 1, 2, 21), now)
+    assert not is_bookable(now + timedelta(days=61), now)
+
+
+def test_bookable_slots():
+    now = datetime(2030, 1, 1, 19, 30)
+    slots = list(bookable_slots(end=datetime(2030, 1, 2, 8), now=now))
+    assert slots == [datetime(2030, 1, 1, 20), datetime(2030, 1, 2, 7), datetime(2030, 1, 2, 8)]
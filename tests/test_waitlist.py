@@ -0,0 +1,193 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+import flask_api
+from utils import slot_ledger, waitlist
+
+AADHAARS = ["11112222333%d" % i for i in range(10)]
+
+
+def future_slot():
+    return (datetime.now() + timedelta(days=2)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+
+class FakeWaitlistDB:
+    """An in-memory waitlist table answering the statements utils.waitlist sends."""
+
+    def __init__(self):
+        self.rows = []  # dicts in id order
+
+    def connection(self):
+        return FakeConnection(self)
+
+    def waiting(self, slot_time):
+        return [row for row in self.rows if row["slot_time"] == slot_time and row["status"] == "waiting"]
+
+
+class FakeConnection:
+    def __init__(self, table):
+        self.table = table
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self.table)
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, table):
+        self.table = table
+        self.result = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def execute(self, sql, params=()):
+        sql = re.sub(r"\s+", " ", sql)
+        rows = self.table.rows
+        if sql.startswith("SELECT id FROM waitlist"):
+            slot_time, aadhaar = params
+            self.result = [(row["id"],) for row in self.table.waiting(slot_time) if row["aadhaar_number"] == aadhaar][:1]
+        elif sql.startswith("INSERT INTO waitlist"):
+            slot_time, username, email, aadhaar, ticket_count, passenger_names = params
+            self.lastrowid = len(rows) + 1
+            rows.append({"id": self.lastrowid, "slot_time": slot_time, "username": username, "email": email,
+                         "aadhaar_number": aadhaar, "ticket_count": ticket_count,
+                         "passenger_names": passenger_names, "status": "waiting", "booking_id": None,
+                         "last_error": None})
+        elif sql.startswith("SELECT COUNT(*)"):
+            slot_time, waitlist_id = params
+            self.result = [(len([row for row in self.table.waiting(slot_time) if row["id"] <= waitlist_id]),)]
+        elif sql.startswith("SELECT id, username"):
+            slot_time, limit = params
+            self.result = [(row["id"], row["username"], row["email"], row["aadhaar_number"], row["ticket_count"],
+                            row["passenger_names"]) for row in self.table.waiting(slot_time)[:limit]]
+        elif sql.startswith("UPDATE waitlist SET status = 'expired'"):
+            error, slot_time = params
+            waiting = self.table.waiting(slot_time)
+            for row in waiting:
+                row.update(status="expired", last_error=error)
+            self.rowcount = len(waiting)
+        else:
+            raise AssertionError("unexpected SQL: " + sql)
+
+    def executemany(self, sql, params):
+        for values in params:
+            if "status = 'promoted'" in sql:
+                booking_id, waitlist_id = values
+                changes = {"status": "promoted", "booking_id": booking_id}
+            else:
+                error, waitlist_id = values
+                changes = {"status": "rejected", "last_error": error}
+            self.table.rows[waitlist_id - 1].update(changes)
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+class FakeSeats:
+    """Stands in for flask_api.admit_bookings: admits bookings while seats remain."""
+
+    def __init__(self, seats):
+        self.seats = seats
+        self.calls = 0
+
+    def __call__(self, cursor, bookings):
+        self.calls += 1
+        errors = []
+        for booking in bookings:
+            if booking["ticket_count"] > self.seats:
+                errors.append(slot_ledger.SLOT_FULL_ERROR)
+                continue
+            self.seats -= booking["ticket_count"]
+            booking["booking_id"] = "B%d" % self.seats
+            errors.append(None)
+        return errors
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeWaitlistDB()
+    monkeypatch.setattr(waitlist, "get_db_connection", table.connection)
+    monkeypatch.setattr(waitlist, "record_booking", lambda booking: None)
+    monkeypatch.setattr(waitlist.slot_ledger, "record", lambda *args: None)
+    return table
+
+
+def join(slot_time, aadhaar, ticket_count=1):
+    return waitlist.join({"slot_time": slot_time, "username": "Asha", "email": "asha@example.com",
+                          "aadhaar_number": aadhaar, "ticket_count": ticket_count, "passenger_names": []})
+
+
+def test_join_numbers_positions_in_arrival_order(table):
+    slot = future_slot()
+    assert [join(slot, aadhaar) for aadhaar in AADHAARS[:3]] == [(1, 1), (2, 2), (3, 3)]
+    # Queues are per slot
+    assert join(slot + timedelta(hours=1), AADHAARS[0]) == (4, 1)
+
+
+def test_rejoining_keeps_the_original_place(table):
+    slot = future_slot()
+    join(slot, AADHAARS[0])
+    join(slot, AADHAARS[1])
+    assert join(slot, AADHAARS[0]) == (1, 1)
+    assert len(table.rows) == 2
+
+
+def test_promotion_is_oldest_first_and_stops_at_capacity(table, monkeypatch):
+    slot = future_slot()
+    for aadhaar in AADHAARS[:5]:
+        join(slot, aadhaar)
+    seats = FakeSeats(3)
+    monkeypatch.setattr(flask_api, "admit_bookings", seats)
+
+    promoted = waitlist.promote_waitlist(slot, batch_size=2)
+
+    assert [booking["aadhaar_number"] for booking in promoted] == AADHAARS[:3]
+    assert [row["status"] for row in table.rows] == ["promoted"] * 3 + ["waiting"] * 2
+    assert seats.calls == 2  # the second batch found the slot full, so no third batch
+    # The two entries left behind are now first in line
+    assert join(slot, AADHAARS[5]) == (6, 3)
+
+
+def test_smaller_party_behind_a_large_one_is_admitted(table, monkeypatch):
+    slot = future_slot()
+    join(slot, AADHAARS[0], ticket_count=4)
+    join(slot, AADHAARS[1], ticket_count=1)
+    monkeypatch.setattr(flask_api, "admit_bookings", FakeSeats(2))
+
+    promoted = waitlist.promote_waitlist(slot)
+
+    assert [booking["aadhaar_number"] for booking in promoted] == [AADHAARS[1]]
+    assert [row["status"] for row in table.rows] == ["waiting", "promoted"]
+
+
+def test_started_slot_expires_its_waitlist(table, monkeypatch):
+    slot = future_slot()
+    join(slot, AADHAARS[0])
+    join(slot, AADHAARS[1])
+    past = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+    for row in table.rows:
+        row["slot_time"] = past
+    seats = FakeSeats(10)
+    monkeypatch.setattr(flask_api, "admit_bookings", seats)
+
+    assert waitlist.promote_waitlist(past) == []
+
+    assert seats.calls == 0
+    assert [(row["status"], row["last_error"]) for row in table.rows] == [
+        ("expired", waitlist.SLOT_STARTED_ERROR)] * 2
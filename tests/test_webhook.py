@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("mysql.connector")
+
+import webhook
+
+
+def intent(name, **parameters):
+    return {"session": "projects/p/agent/sessions/s1",
+            "queryResult": {"intent": {"displayName": name}, "parameters": parameters}}
+
+
+def test_ticket_download_looks_up_the_aadhaar_as_a_string(monkeypatch):
+    calls = []
+    monkeypatch.setattr(webhook, "send_latest_booking_email", lambda aadhaar, email: calls.append((aadhaar, email)) or 0)
+    client = webhook.app.test_client()
+
+    response = client.post("/dialogflow-webhook", json=intent("down_aad_email", aadharr=123412341234.0,
+                                                               emaill="asha@example.com"))
+
+    assert response.status_code == 200
+    assert calls == [("123412341234", "asha@example.com")]
+
+
+def test_download_rejects_a_missing_email():
+    client = webhook.app.test_client()
+    response = client.post("/dialogflow-webhook", json=intent("down_aad_email", aadharr="123412341234"))
+    assert "Invalid email" in response.get_json()["fulfillmentText"]
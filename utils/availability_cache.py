@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+AVAILABILITY_TTL = float(os.environ.get("AVAILABILITY_TTL", 5))  # seconds a cached count may be served
+MAX_ENTRIES = 4096  # ~60 days x 14 bookable hours fits with plenty of room
+
+
+class AvailabilityCache:
+    """Remaining tickets per slot, served from memory for a short TTL.
+
+    Concurrent misses for the same slot share one database load, and the
+    booking path calls invalidate() after every commit so this process never
+    serves a count older than its own last booking.
+    """
+
+    def __init__(self, ttl=AVAILABILITY_TTL, max_entries=MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # slot_time -> (remaining, expires_at)
+        self._loading = {}  # slot_time -> Event set when the in-flight load finishes
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by invalidate() so a load that raced a booking is not cached
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+
+    def get(self, slot_time, loader):
+        while True:
+            with self._lock:
+                entry = self._entries.get(slot_time)
+                if entry and entry[1] > time.monotonic():
+                    self._entries.move_to_end(slot_time)
+                    self._stats["hits"] += 1
+                    return entry[0]
+                pending = self._loading.get(slot_time)
+                if pending is None:
+                    pending = self._loading[slot_time] = threading.Event()
+                    generation = self._generation
+                    self._stats["misses"] += 1
+                    break
+                self._stats["coalesced"] += 1
+            # Another request is already loading this slot; wait for its result
+            pending.wait()
+
+        try:
+            remaining = loader(slot_time)
+            with self._lock:
+                fresh = generation == self._generation
+            if fresh:
+                self.set(slot_time, remaining)
+            return remaining
+        finally:
+            with self._lock:
+                self._loading.pop(slot_time, None)
+            pending.set()
+
+    def set(self, slot_time, remaining):
+        with self._lock:
+            self._entries[slot_time] = (remaining, time.monotonic() + self.ttl)
+            self._entries.move_to_end(slot_time)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, slot_time):
+        with self._lock:
+            self._entries.pop(slot_time, None)
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["coalesced"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+availability_cache = AvailabilityCache()
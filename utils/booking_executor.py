@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+BOOKING_WORKERS = int(os.environ.get("BOOKING_WORKERS", 8))
+MAX_PENDING_BOOKINGS = int(os.environ.get("MAX_PENDING_BOOKINGS", 64))  # queued + running
+RESULT_TTL = 900  # seconds a finished outcome stays available for status lookups
+MAX_RESULTS = 10000
+
+
+class BookingExecutor:
+    """Runs booking calls on a fixed pool of threads with a bounded queue.
+
+    submit() refuses new work once max_pending bookings are queued or
+    running, so a rush turns into a "try again" reply instead of unbounded
+    threads. Outcomes are kept per chat session for wait() and result().
+    """
+
+    def __init__(self, book, workers=BOOKING_WORKERS, max_pending=MAX_PENDING_BOOKINGS):
+        self._book = book
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="booking")
+        self._capacity = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._outcomes = OrderedDict()  # session_id -> outcome dict, oldest first
+        self._done = {}  # session_id -> Event for bookings still in flight
+        self._stats = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+
+    def submit(self, session_id, booking_data):
+        """Queue a booking for the session. Returns False when the queue is full."""
+        with self._lock:
+            if session_id in self._done:
+                return True  # a confirmation for this session is already in flight
+        if not self._capacity.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            return False
+        with self._lock:
+            self._done[session_id] = threading.Event()
+            self._outcomes[session_id] = {"state": "pending", "submitted_at": time.time()}
+            self._outcomes.move_to_end(session_id)
+            self._stats["submitted"] += 1
+        try:
+            self._pool.submit(self._run, session_id, booking_data)
+        except Exception:
+            self._capacity.release()
+            raise
+        return True
+
+    def _run(self, session_id, booking_data):
+        try:
+            payload, status = self._book(booking_data)
+        except Exception as e:
+            print(f"Booking failed for session {session_id}: {e}")
+            payload, status = {"error": str(e)}, 500
+        finally:
+            self._capacity.release()
+        outcome = {"state": "done", "status": status, "response": payload, "finished_at": time.time()}
+        with self._lock:
+            self._stats["succeeded" if status == 200 else "failed"] += 1
+            self._outcomes[session_id] = outcome
+            self._outcomes.move_to_end(session_id)
+            self._prune(outcome["finished_at"])
+            done = self._done.pop(session_id, None)
+        if done:
+            done.set()
+
+    def _prune(self, now):
+        # Caller holds _lock
+        while self._outcomes:
+            session_id, outcome = next(iter(self._outcomes.items()))
+            expired = outcome["state"] == "done" and now - outcome["finished_at"] > RESULT_TTL
+            if not expired and len(self._outcomes) <= MAX_RESULTS:
+                break
+            if outcome["state"] != "done":
+                break  # never drop a booking that is still running
+            del self._outcomes[session_id]
+
+    def wait(self, session_id, timeout):
+        """Wait up to timeout seconds for the session's booking; returns its outcome or None if still running."""
+        with self._lock:
+            done = self._done.get(session_id)
+        if done is not None and not done.wait(timeout):
+            return None
+        return self.result(session_id)
+
+    def result(self, session_id):
+        with self._lock:
+            outcome = self._outcomes.get(session_id)
+            return dict(outcome) if outcome else None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._done)
+        return stats
@@ -0,0 +1,137 @@
+import argparse
+import codecs
+import csv
+import json
+from itertools import islice
+
+from utils import slot_ledger
+from utils.availability_cache import availability_cache
+from utils.db_pool import get_db_connection, PoolTimeout
+from utils.latest_booking import record_booking
+
+CHUNK_ROWS = 2000  # rows read and grouped at a time; memory stays flat whatever the file size
+SLOT_BATCH = 200  # bookings for one slot admitted per transaction
+PASSENGER_SEPARATOR = ";"  # a CSV passenger_names cell holds several names separated by this
+
+
+def read_rows(lines, fmt):
+    """Yield one booking dict per row from an iterable of text lines; None for an unparseable NDJSON line."""
+    if fmt == "csv":
+        for row in csv.DictReader(lines):
+            names = row.get("passenger_names")
+            row["passenger_names"] = [name.strip() for name in names.split(PASSENGER_SEPARATOR) if name.strip()] if names else []
+            yield row
+    else:
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def open_lines(stream):
+    """Decode a binary stream (file, upload or request body) line by line."""
+    return codecs.iterdecode(stream, "utf-8-sig")
+
+
+def _admit_batch(bookings):
+    """Admit one slot's bookings in a single transaction. Returns an error (or None) per booking."""
+    from flask_api import admit_bookings
+
+    db = None
+    try:
+        db = get_db_connection()
+        cursor = db.cursor()
+        db.start_transaction()
+        errors = admit_bookings(cursor, bookings)
+        db.commit()
+    except PoolTimeout:
+        return ["Server is busy, please try again shortly"] * len(bookings)
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass  # in case db wasn't initialized
+        print("Import batch failed due to:", str(e))
+        return [str(e)] * len(bookings)
+    finally:
+        if db is not None:
+            db.close()
+
+    for booking, error in zip(bookings, errors):
+        if not error:
+            slot_ledger.record(booking["slot_time"], booking["aadhaar_number"], booking["ticket_count"])
+            record_booking(booking)
+    availability_cache.invalidate(bookings[0]["slot_time"])
+    return errors
+
+
+def import_bookings(rows):
+    """Validate and admit rows; yields {"row", "booking_id"} or {"row", "error"} per row, in input order.
+
+    Rows are taken CHUNK_ROWS at a time. Within a chunk the valid ones are
+    grouped by slot, so each transaction locks one slot counter row once for
+    up to SLOT_BATCH bookings.
+    """
+    from flask_api import parse_booking
+
+    rows = iter(rows)
+    row_number = 0
+    while True:
+        chunk = list(islice(rows, CHUNK_ROWS))
+        if not chunk:
+            break
+        results = []
+        by_slot = {}
+        for data in chunk:
+            row_number += 1
+            try:
+                booking, error = parse_booking(data) if isinstance(data, dict) else (None, "Invalid row")
+            except Exception as e:
+                # Whatever a row holds, it gets a result and the rest of the file is still imported
+                booking, error = None, f"Invalid row: {e}"
+            result = {"row": row_number}
+            results.append(result)
+            if error:
+                result["error"] = error
+            else:
+                by_slot.setdefault(booking["slot_time"], []).append((result, booking))
+
+        for slot_time in sorted(by_slot):
+            group = by_slot[slot_time]
+            for start in range(0, len(group), SLOT_BATCH):
+                batch = group[start:start + SLOT_BATCH]
+                errors = _admit_batch([booking for _, booking in batch])
+                for (result, booking), error in zip(batch, errors):
+                    if error:
+                        result["error"] = error
+                    else:
+                        result["booking_id"] = booking["booking_id"]
+        yield from results
+
+
+def detect_format(path):
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import bookings from a CSV or NDJSON file")
+    parser.add_argument("path", help="CSV with a header row, or one JSON booking per line")
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="default: from the file extension")
+    parser.add_argument("--results", help="per-row results file (NDJSON); default <path>.results.ndjson")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    results_path = args.results or args.path + ".results.ndjson"
+    booked = rejected = 0
+    with open(args.path, "rb") as source, open(results_path, "w", encoding="utf-8") as out:
+        for result in import_bookings(read_rows(open_lines(source), fmt)):
+            if "booking_id" in result:
+                booked += 1
+            else:
+                rejected += 1
+            out.write(json.dumps(result) + "\n")
+    print(f"Import finished: {booked} booked, {rejected} rejected (see {results_path})")
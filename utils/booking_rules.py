@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+MAX_BOOKING_DAYS = 60  # 2 months
+BOOKING_START_HOUR = 7  # 7 AM
+BOOKING_END_HOUR = 21  # 9 PM
+
+
+def is_bookable(date_time, now=None):
+    """True if date_time falls inside the booking window and booking hours."""
+    now = now or datetime.now()
+    max_date = now + timedelta(days=MAX_BOOKING_DAYS)
+    return now <= date_time <= max_date and BOOKING_START_HOUR <= date_time.hour < BOOKING_END_HOUR
+
+
+def bookable_slots(start=None, end=None, now=None):
+    """Yield every bookable hourly slot between start and end (inclusive), clipped to the booking window."""
+    now = now or datetime.now()
+    first = max(start or now, now)
+    last = min(end or now + timedelta(days=MAX_BOOKING_DAYS), now + timedelta(days=MAX_BOOKING_DAYS))
+    slot = first.replace(minute=0, second=0, microsecond=0)
+    if slot < first:
+        slot += timedelta(hours=1)
+    while slot <= last:
+        if BOOKING_START_HOUR <= slot.hour < BOOKING_END_HOUR:
+            yield slot
+            slot += timedelta(hours=1)
+        elif slot.hour < BOOKING_START_HOUR:
+            slot = slot.replace(hour=BOOKING_START_HOUR)
+        else:
+            slot = (slot + timedelta(days=1)).replace(hour=BOOKING_START_HOUR)
@@ -0,0 +1,73 @@
+import argparse
+import os
+from datetime import datetime
+from multiprocessing import Pool
+
+RENDER_WORKERS = os.cpu_count() or 2
+CHUNK_SIZE = 16  # tickets handed to a worker per round trip
+
+
+def _init_worker():
+    # Load reportlab, the stylesheet and the logo once per worker process
+    import utils.ticket_pdf  # noqa: F401
+
+
+def _render(ticket):
+    from utils.ticket_pdf import render_ticket_pdf
+
+    booking_id, date_time, ticket_count, username, title = ticket
+    return booking_id, render_ticket_pdf(booking_id, date_time, ticket_count, username, title=title)
+
+
+def render_tickets(tickets, workers=RENDER_WORKERS, chunksize=CHUNK_SIZE, title=None):
+    """Render (booking_id, date_time, ticket_count, username) tickets across a process pool.
+
+    Yields (booking_id, pdf_bytes) in completion order as chunks finish.
+    workers=1 renders in the calling process, which is the baseline the
+    benchmark compares against.
+    """
+    from utils.ticket_pdf import CONFIRMATION_TITLE
+
+    title = title or CONFIRMATION_TITLE
+    jobs = ((booking_id, date_time, ticket_count, username, title)
+            for booking_id, date_time, ticket_count, username in tickets)
+    if workers == 1:
+        for job in jobs:
+            yield _render(job)
+        return
+    with Pool(workers, initializer=_init_worker) as pool:
+        yield from pool.imap_unordered(_render, jobs, chunksize)
+
+
+def slot_tickets(slot_time):
+    """Load the ticket fields of every booking in one slot."""
+    from utils.db_pool import get_db_connection
+
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT booking_id, slot_time, ticket_count, username FROM bookings WHERE slot_time = %s ORDER BY booking_id",
+            (slot_time,))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-render every ticket of a slot, e.g. after a venue change")
+    parser.add_argument("--slot", required=True, help="slot as 'YYYY-MM-DD HH'")
+    parser.add_argument("--out", required=True, help="directory for Ticket_<id>.pdf files")
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    tickets = slot_tickets(datetime.strptime(args.slot, "%Y-%m-%d %H"))
+    for done, (booking_id, pdf_bytes) in enumerate(render_tickets(tickets, args.workers, args.chunksize), 1):
+        with open(os.path.join(args.out, f"Ticket_{booking_id}.pdf"), "wb") as f:
+            f.write(pdf_bytes)
+        if done % 100 == 0 or done == len(tickets):
+            print(f"Rendered {done}/{len(tickets)} tickets")
@@ -0,0 +1,183 @@
+import os
+import queue
+import threading
+import time
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+# Connection settings, overridable per environment (e.g. a local benchmark database)
+DB_CONFIG = {
+    "host": os.environ.get("DB_HOST", "localhost"),
+    "user": os.environ.get("DB_USER", "root"),
+    "password": os.environ.get("DB_PASSWORD", "Devang@1224"),
+    "database": os.environ.get("DB_NAME", "TicketBooking"),
+}
+
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+CHECKOUT_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 5))  # seconds to wait for a free connection
+HEALTH_CHECK_AFTER = 30  # ping connections that sat idle longer than this many seconds
+
+
+class PoolTimeout(PoolError):
+    """Raised when no connection becomes free within the checkout timeout."""
+
+
+class PooledConnection:
+    """Wraps a MySQL connection; close() hands it back to the pool instead of disconnecting."""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise PoolError("Connection was already returned to the pool")
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    def __init__(self, size=POOL_SIZE, timeout=CHECKOUT_TIMEOUT, connect=None, **config):
+        self.size = size
+        self.timeout = timeout
+        self._connect = connect or (lambda: mysql.connector.connect(**(config or DB_CONFIG)))
+        self._idle = queue.LifoQueue()  # most recently used first, so cold connections age out
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "reconnects": 0,
+            "discarded": 0,
+            "wait_seconds": 0.0,
+            "peak_in_use": 0,
+        }
+
+    def get_connection(self, timeout=None):
+        """Check out a healthy connection, waiting up to timeout seconds for one to free up."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        try:
+            conn, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn, last_used = self._connect(), time.monotonic()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                with self._lock:
+                    self._stats["waits"] += 1
+                try:
+                    conn, last_used = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"No database connection available within {timeout}s")
+
+        conn = self._check_health(conn, last_used)
+        with self._lock:
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds"] += time.monotonic() - started
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._in_use)
+        return PooledConnection(self, conn)
+
+    def _check_health(self, conn, last_used):
+        if time.monotonic() - last_used < HEALTH_CHECK_AFTER:
+            return conn
+        try:
+            conn.ping()
+            return conn
+        except Exception:
+            pass
+        # Server dropped the idle connection (wait_timeout, restart); open a fresh one in its place
+        with self._lock:
+            self._stats["reconnects"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def release(self, conn):
+        """Return a checked-out connection, discarding it if it cannot be reset."""
+        with self._lock:
+            self._in_use -= 1
+        try:
+            if conn.unread_result:
+                conn.consume_results()
+            if conn.in_transaction:
+                conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    def _discard(self, conn):
+        with self._lock:
+            self._created -= 1
+            self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(size=self.size, open=self._created, in_use=self._in_use, idle=self._created - self._in_use)
+        return stats
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool shared by the booking API and the webhook."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def get_db_connection(timeout=None):
+    return get_pool().get_connection(timeout)
+
+
+def pool_stats():
+    return get_pool().stats()
@@ -0,0 +1,193 @@
+import argparse
+import sys
+import threading
+import time
+from datetime import datetime
+
+from utils.db_pool import get_db_connection
+
+FLUSH_INTERVAL = 2  # seconds between check-in writes
+FLUSH_BATCH = 500  # check-ins per INSERT
+REFRESH_INTERVAL = 60  # seconds between reloads of the loaded slots (late bookings, cancellations)
+
+ADMITTED = "admitted"
+ALREADY_CHECKED_IN = "already_checked_in"
+UNKNOWN = "unknown"
+WRONG_SLOT = "wrong_slot"
+
+
+def normalize_code(code):
+    """Scanners send what they read, sometimes with whitespace or in lower case."""
+    return code.strip().upper()
+
+
+class GateIndex:
+    """In-memory booking index for the gates of one venue.
+
+    load() pulls every booking of a slot into a dict before the doors open,
+    so scan() is a dictionary lookup under a lock and never touches MySQL.
+    Each booking checks in once; check-ins are queued and written to the
+    checkins table in batches by the flusher thread. Run one index per venue
+    and point every scanner at it: the once-only guarantee is per process
+    (the checkins primary key catches a second process at flush time).
+    """
+
+    def __init__(self, gate_name=None):
+        self.gate_name = gate_name
+        self._lock = threading.Lock()
+        self._tickets = {}  # booking_id -> [slot_time, ticket_count, checked_in_at or None]
+        self._slots = set()
+        self._pending = []  # (booking_id, slot_time, ticket_count, gate, checked_in_at) not yet written
+        self._stats = {"scans": 0, "admitted": 0, "duplicates": 0, "unknown": 0, "wrong_slot": 0,
+                       "flushed": 0, "flush_errors": 0}
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def load(self, slot_time):
+        """(Re)load a slot's bookings and its existing check-ins. Returns the number of bookings."""
+        db = get_db_connection()
+        try:
+            cursor = db.cursor()
+            cursor.execute("SELECT booking_id, ticket_count FROM bookings WHERE slot_time = %s", (slot_time,))
+            bookings = cursor.fetchall()
+            cursor.execute("SELECT booking_id, checked_in_at FROM checkins WHERE slot_time = %s", (slot_time,))
+            checked_in = dict(cursor.fetchall())
+            cursor.close()
+        finally:
+            db.close()
+
+        with self._lock:
+            current = {booking_id for booking_id, entry in self._tickets.items() if entry[0] == slot_time}
+            for booking_id, ticket_count in bookings:
+                entry = self._tickets.get(booking_id)
+                if entry is None:
+                    self._tickets[booking_id] = [slot_time, ticket_count, checked_in.get(booking_id)]
+                else:
+                    entry[1] = ticket_count
+                    entry[2] = entry[2] or checked_in.get(booking_id)
+                current.discard(booking_id)
+            for booking_id in current:
+                if self._tickets[booking_id][2] is None:
+                    del self._tickets[booking_id]  # cancelled since the last load
+            self._slots.add(slot_time)
+        return len(bookings)
+
+    def scan(self, code, slot_time=None):
+        """Check in a scanned booking id. Returns (result, ticket_count or None).
+
+        With slot_time, a booking for a different slot is refused as WRONG_SLOT.
+        """
+        booking_id = normalize_code(code)
+        now = datetime.now()
+        with self._lock:
+            self._stats["scans"] += 1
+            entry = self._tickets.get(booking_id)
+            if entry is None:
+                self._stats["unknown"] += 1
+                return UNKNOWN, None
+            if slot_time is not None and entry[0] != slot_time:
+                self._stats["wrong_slot"] += 1
+                return WRONG_SLOT, entry[1]
+            if entry[2] is not None:
+                self._stats["duplicates"] += 1
+                return ALREADY_CHECKED_IN, entry[1]
+            entry[2] = now
+            self._pending.append((booking_id, entry[0], entry[1], self.gate_name, now))
+            self._stats["admitted"] += 1
+            return ADMITTED, entry[1]
+
+    def flush(self):
+        """Write queued check-ins; on failure they are put back for the next attempt."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            db = get_db_connection()
+            try:
+                cursor = db.cursor()
+                for start in range(0, len(pending), FLUSH_BATCH):
+                    # IGNORE: a row already written (by a retried flush or another gate process) wins
+                    cursor.executemany(
+                        "INSERT IGNORE INTO checkins (booking_id, slot_time, ticket_count, gate, checked_in_at) "
+                        "VALUES (%s, %s, %s, %s, %s)",
+                        pending[start:start + FLUSH_BATCH])
+                db.commit()
+                cursor.close()
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"Writing {len(pending)} check-ins failed, will retry: {e}")
+            with self._lock:
+                self._pending[:0] = pending
+                self._stats["flush_errors"] += 1
+            return 0
+        with self._lock:
+            self._stats["flushed"] += len(pending)
+        return len(pending)
+
+    def _run(self):
+        last_refresh = time.monotonic()
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self.flush()
+            if time.monotonic() - last_refresh >= REFRESH_INTERVAL:
+                last_refresh = time.monotonic()
+                with self._lock:
+                    slots = sorted(self._slots)
+                for slot_time in slots:
+                    try:
+                        self.load(slot_time)
+                    except Exception as e:
+                        print(f"Refreshing slot {slot_time} failed: {e}")
+
+    def start(self):
+        """Start the background flusher; stop() flushes whatever is still queued."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._run, name="gate-flush", daemon=True)
+            self._flusher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["bookings"] = len(self._tickets)
+            stats["slots"] = len(self._slots)
+            stats["pending"] = len(self._pending)
+        return stats
+
+
+if __name__ == "__main__":
+    # Barcode scanners type the code followed by Enter, so stdin works as a gate terminal
+    parser = argparse.ArgumentParser(description="Check in scanned tickets for a slot")
+    parser.add_argument("--slot", required=True, help="slot as 'YYYY-MM-DD HH'")
+    parser.add_argument("--gate", help="name recorded with each check-in")
+    args = parser.parse_args()
+
+    slot_time = datetime.strptime(args.slot, "%Y-%m-%d %H")
+    index = GateIndex(args.gate)
+    print(f"Loaded {index.load(slot_time)} bookings for {slot_time:%d %B %Y, %I:%M %p}; scan tickets (Ctrl+D to stop)")
+    index.start()
+    try:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            result, ticket_count = index.scan(line, slot_time)
+            if result == ADMITTED:
+                print(f"✅ ADMIT {ticket_count}")
+            elif result == ALREADY_CHECKED_IN:
+                print("❌ Already checked in")
+            elif result == WRONG_SLOT:
+                print("❌ Ticket is for a different slot")
+            else:
+                print("❌ Unknown ticket")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        index.stop()
+        print(index.stats())
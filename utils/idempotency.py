@@ -0,0 +1,151 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError
+
+from utils.db_pool import get_db_connection
+
+KEY_TTL = 24 * 3600  # seconds a stored result is replayed for
+MAX_KEY_LENGTH = 128
+MAX_CACHED = 10000  # results also kept in-process so most replays skip the database
+PURGE_EVERY = 500  # stored keys between sweeps of expired rows
+PURGE_BATCH = 1000
+
+MISMATCH_ERROR = "Idempotency key was already used with a different request"
+
+_lock = threading.Lock()
+_cache = OrderedDict()  # key -> (fingerprint, payload, status, expires_at)
+_stores_since_purge = 0
+
+
+def fingerprint(data):
+    """Hash of the request body, ignoring the key itself, so a retry matches its original."""
+    body = {k: v for k, v in (data or {}).items() if k != "idempotency_key"}
+    return hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def session_key(session_id, data):
+    """Key for a chat confirmation: the same session confirming the same details is one booking."""
+    return "session-" + hashlib.sha256(f"{session_id}|{fingerprint(data)}".encode("utf-8")).hexdigest()
+
+
+def replay(stored, request_fingerprint):
+    """Turn a stored (fingerprint, payload, status) into the response for a duplicate request."""
+    stored_fingerprint, payload, status = stored[:3]
+    if stored_fingerprint != request_fingerprint:
+        return {"error": MISMATCH_ERROR}, 422
+    return payload, status
+
+
+def _remember(key, stored_fingerprint, payload, status, expires_at):
+    with _lock:
+        _cache[key] = (stored_fingerprint, payload, status, expires_at)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+
+
+def lookup(key):
+    """Return the stored (fingerprint, payload, status) for a key, or None if unused or expired."""
+    with _lock:
+        cached = _cache.get(key)
+    if cached and cached[3] > time.time():
+        return cached
+
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT fingerprint, response, status_code, UNIX_TIMESTAMP(expires_at) FROM idempotency_keys "
+            "WHERE idem_key = %s AND expires_at > NOW()",
+            (key,))
+        row = cursor.fetchone()
+        cursor.close()
+    finally:
+        db.close()
+    if row is None:
+        return None
+    stored = (row[0], json.loads(row[1]), row[2], float(row[3]))
+    _remember(key, *stored)
+    return stored
+
+
+def claim(cursor, key, request_fingerprint, payload, status):
+    """Store the key with its result as the first write of the caller's booking transaction.
+
+    The result is committed or rolled back together with the booking. A
+    concurrent duplicate blocks on the key's primary key until the first
+    request finishes, then gets the stored result back instead of None; the
+    caller must roll back and replay it.
+    """
+    for _ in range(2):
+        try:
+            cursor.execute(
+                "INSERT INTO idempotency_keys (idem_key, fingerprint, response, status_code, booking_id, expires_at) "
+                "VALUES (%s, %s, %s, %s, %s, NOW() + INTERVAL %s SECOND)",
+                (key, request_fingerprint, json.dumps(payload), status, payload.get("booking_id"), KEY_TTL))
+            return None
+        except IntegrityError as e:
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+        cursor.execute(
+            "SELECT fingerprint, response, status_code, UNIX_TIMESTAMP(expires_at), expires_at <= NOW() "
+            "FROM idempotency_keys WHERE idem_key = %s FOR UPDATE",
+            (key,))
+        row = cursor.fetchone()
+        if row is not None and not row[4]:
+            return row[0], json.loads(row[1]), row[2], float(row[3])
+        # Expired (or already swept): reuse the key
+        cursor.execute("DELETE FROM idempotency_keys WHERE idem_key = %s", (key,))
+    raise RuntimeError(f"Could not store idempotency key {key}")
+
+
+def committed(key, request_fingerprint, payload, status):
+    """Cache a result after its transaction commits, and now and then sweep expired keys."""
+    global _stores_since_purge
+    _remember(key, request_fingerprint, payload, status, time.time() + KEY_TTL)
+    with _lock:
+        _stores_since_purge += 1
+        purge = _stores_since_purge >= PURGE_EVERY
+        if purge:
+            _stores_since_purge = 0
+    if purge:
+        try:
+            purge_expired()
+        except Exception as e:
+            print(f"Purging expired idempotency keys failed: {e}")
+
+
+def forget(cursor, booking_id):
+    """Delete the keys that replay a booking, inside the caller's cancellation transaction.
+
+    A retry of the original request then books again instead of replaying a
+    booking id that no longer exists.
+    """
+    cursor.execute("DELETE FROM idempotency_keys WHERE booking_id = %s", (booking_id,))
+
+
+def forgotten(booking_id):
+    """Drop a cancelled booking's cached results after the cancellation commits."""
+    with _lock:
+        for key in [k for k, v in _cache.items() if v[1].get("booking_id") == booking_id]:
+            del _cache[key]
+
+
+def purge_expired():
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute("DELETE FROM idempotency_keys WHERE expires_at <= NOW() LIMIT %s", (PURGE_BATCH,))
+        db.commit()
+        cursor.close()
+    finally:
+        db.close()
+    now = time.time()
+    with _lock:
+        for key in [k for k, v in _cache.items() if v[3] <= now]:
+            del _cache[key]
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+
+from utils.db_pool import get_db_connection
+
+# Served by idx_bookings_aadhaar_email_slot (migrations/004): an index range on
+# (aadhaar_number, email) read backwards on slot_time, stopping at the first row.
+LATEST_BOOKING_QUERY = (
+    "SELECT booking_id, slot_time, ticket_count, username FROM bookings "
+    "WHERE aadhaar_number = %s AND email = %s ORDER BY slot_time DESC LIMIT 1"
+)
+
+MAX_ENTRIES = 50000
+POSITIVE_TTL = 300  # seconds; bookings made by another process become visible after this
+NEGATIVE_TTL = 30  # "no booking" answers expire quickly for the same reason
+RESEND_DEDUP = 120  # seconds during which a repeated download request does not queue another email
+
+
+class LatestBookingCache:
+    """LRU of each (Aadhaar, email) pair's latest booking, kept current by the booking path."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> [row or None, expires_at, last_resend_at]
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "updates": 0, "resends_deduped": 0}
+
+    def get(self, aadhaar_number, email):
+        """Return (found, row); row is None for a cached "no booking" answer."""
+        key = (aadhaar_number, email)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return True, entry[0]
+
+    def put(self, aadhaar_number, email, row):
+        key = (aadhaar_number, email)
+        ttl = POSITIVE_TTL if row else NEGATIVE_TTL
+        with self._lock:
+            entry = self._entries.get(key)
+            last_resend = entry[2] if entry else 0.0
+            self._entries[key] = [row, time.monotonic() + ttl, last_resend]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def offer(self, aadhaar_number, email, row):
+        """Called after a booking commits. Only a pair already cached is updated, and only
+        if the new booking is at least as late: an uncached pair may have later bookings."""
+        key = (aadhaar_number, email)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            if entry[0] is None or row[1] >= entry[0][1]:
+                entry[0] = row
+                entry[1] = time.monotonic() + POSITIVE_TTL
+                self._stats["updates"] += 1
+
+    def forget(self, aadhaar_number, email):
+        """Drop a pair whose cached latest booking may no longer exist (a cancellation)."""
+        with self._lock:
+            self._entries.pop((aadhaar_number, email), None)
+
+    def claim_resend(self, aadhaar_number, email):
+        """True if a resend should be queued now; False if one was queued within RESEND_DEDUP."""
+        key = (aadhaar_number, email)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return True
+            if now - entry[2] < RESEND_DEDUP:
+                self._stats["resends_deduped"] += 1
+                return False
+            entry[2] = now
+            return True
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+
+latest_booking_cache = LatestBookingCache()
+
+
+def record_booking(booking):
+    """Offer a committed booking (a parsed booking dict with its booking_id) to the cache."""
+    latest_booking_cache.offer(booking["aadhaar_number"], booking["email"], (
+        booking["booking_id"], booking["slot_time"], booking["ticket_count"], booking["username"]))
+
+_timing_lock = threading.Lock()
+_timing = {"queries": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+
+
+def find_latest_booking(aadhaar_number, email):
+    """Return (booking_id, slot_time, ticket_count, username) of the latest booking, or None."""
+    found, row = latest_booking_cache.get(aadhaar_number, email)
+    if found:
+        return row
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        cursor.execute(LATEST_BOOKING_QUERY, (aadhaar_number, email))
+        row = cursor.fetchone()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        cursor.close()
+    finally:
+        conn.close()
+
+    with _timing_lock:
+        _timing["queries"] += 1
+        _timing["total_ms"] += elapsed_ms
+        _timing["max_ms"] = max(_timing["max_ms"], elapsed_ms)
+        _timing["last_ms"] = elapsed_ms
+    latest_booking_cache.put(aadhaar_number, email, tuple(row) if row else None)
+    return row
+
+
+def query_stats():
+    with _timing_lock:
+        stats = dict(_timing)
+    stats["avg_ms"] = round(stats["total_ms"] / stats["queries"], 3) if stats["queries"] else 0.0
+    return stats
+
+
+def explain_latest_booking(aadhaar_number="000000000000", email="nobody@example.com"):
+    """Run EXPLAIN on the lookup so the chosen index can be checked (key should be idx_bookings_aadhaar_email_slot)."""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("EXPLAIN " + LATEST_BOOKING_QUERY, (aadhaar_number, email))
+        plan = cursor.fetchall()
+        cursor.close()
+        return plan
+    finally:
+        conn.close()
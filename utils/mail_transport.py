@@ -0,0 +1,179 @@
+import os
+import queue
+import smtplib
+import threading
+import time
+from utils import metrics
+
+# Gmail by default; point these at a local stand-in for tests, e.g.
+#   python -m aiosmtpd -n -l localhost:1025
+#   SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=0 SMTP_USER= python -m utils.outbox
+SMTP_HOST = os.environ.get("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", 587))
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "1") == "1"
+SMTP_USER = os.environ.get("SMTP_USER", "myac1224567@gmail.com")
+SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "uqtcjgjxtcihwbqh")  # Use App Password
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", 2))
+SMTP_TIMEOUT = 30
+MAX_MESSAGES_PER_SESSION = 100  # start a fresh session before the server starts throttling this one
+IDLE_CHECK_AFTER = 30  # seconds; NOOP a session that sat idle longer than this before reusing it
+
+# The server refused one message (smtplib resets the transaction); the session stays usable.
+# Checked first: every SMTPException is also an OSError.
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+# Errors after which the session itself is unusable and should be replaced
+SESSION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, OSError)
+
+
+class SMTPTransport:
+    """Keeps up to pool_size authenticated SMTP sessions open and reuses them across sends."""
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, user=SMTP_USER, password=SMTP_PASSWORD,
+                 starttls=SMTP_STARTTLS, pool_size=SMTP_POOL_SIZE, max_per_session=MAX_MESSAGES_PER_SESSION):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.max_per_session = max_per_session
+        self.sender = user or "noreply@localhost"
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle = queue.LifoQueue()  # (server, messages sent on it, last used)
+        self._lock = threading.Lock()
+        self._stats = {"sessions_opened": 0, "reconnects": 0, "sent": 0, "failed": 0}
+
+    def _open(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        if self.starttls:
+            server.starttls()
+        if self.user:
+            server.login(self.user, self.password)
+        with self._lock:
+            self._stats["sessions_opened"] += 1
+        return server
+
+    def _checkout(self):
+        self._slots.acquire()
+        try:
+            server, sent, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            return self._open(), 0
+        if time.monotonic() - last_used > IDLE_CHECK_AFTER:
+            try:
+                if server.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP failed")
+            except Exception:
+                self._close(server)
+                return self._open(), 0
+        return server, sent
+
+    def _checkin(self, server, sent):
+        if server is not None:
+            if sent >= self.max_per_session:
+                self._close(server)
+            else:
+                self._idle.put((server, sent, time.monotonic()))
+        self._slots.release()
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _sendmail(server, message):
+        with metrics.timed("smtp_send_seconds"):
+            server.sendmail(message["From"], [message["To"]], message.as_string())
+
+    def send(self, message):
+        """Send one MIME message; returns True if the server accepted it."""
+        return self.send_many([message])[0]
+
+    def send_many(self, messages):
+        """Send messages back to back over one session, reconnecting once per message on failure."""
+        results = []
+        try:
+            server, sent = self._checkout()
+        except Exception as e:
+            self._slots.release()
+            print(f"❌ Failed to connect to SMTP server: {e}")
+            with self._lock:
+                self._stats["failed"] += len(messages)
+            return [False] * len(messages)
+
+        try:
+            for message in messages:
+                if sent >= self.max_per_session:
+                    self._close(server)
+                    server, sent = self._open(), 0
+                try:
+                    self._sendmail(server, message)
+                    sent += 1
+                    results.append(True)
+                    continue
+                except MESSAGE_ERRORS as e:
+                    print(f"❌ Failed to send email to {message['To']}: {e}")
+                    sent += 1
+                    results.append(False)
+                    continue
+                except SESSION_ERRORS as e:
+                    print(f"SMTP session dropped ({e}); reconnecting")
+                    self._close(server)
+                    with self._lock:
+                        self._stats["reconnects"] += 1
+                    server, sent = self._open(), 0
+                try:
+                    self._sendmail(server, message)
+                    sent += 1
+                    results.append(True)
+                except Exception as e:
+                    print(f"❌ Failed to send email to {message['To']}: {e}")
+                    results.append(False)
+        except Exception as e:
+            # Could not reopen a session; everything not yet attempted fails
+            print(f"❌ SMTP transport error: {e}")
+            results.extend([False] * (len(messages) - len(results)))
+            server = None
+        finally:
+            self._checkin(server, sent)
+
+        with self._lock:
+            self._stats["sent"] += results.count(True)
+            self._stats["failed"] += results.count(False)
+        metrics.inc("smtp_messages_total", results.count(True), outcome="sent")
+        metrics.inc("smtp_messages_total", results.count(False), outcome="failed")
+        return results
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["idle_sessions"] = self._idle.qsize()
+        return stats
+
+    def close(self):
+        while True:
+            try:
+                server, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(server)
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Return the process-wide transport shared by every email module."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = SMTPTransport()
+                metrics.expose_stats("smtp_transport", _transport.stats)
+    return _transport
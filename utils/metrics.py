@@ -0,0 +1,164 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; spans a cached rejection (sub-millisecond) up to an SMTP send on a slow link
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Registry:
+    """Process-wide counters and histograms, rendered in the Prometheus text format.
+
+    Metrics are created on first use. Label values should come from a small
+    fixed set (phases, intents, rejection reasons), never from user input.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}  # name -> {labels: value}
+        self._histograms = {}  # name -> {labels: [bucket counts..., sum, count]}
+        self._buckets = {}
+        self._stats_sources = {}  # prefix -> callable returning a stats dict
+
+    def describe(self, name, kind, help_text, buckets=DEFAULT_BUCKETS):
+        with self._lock:
+            self._help[name] = help_text
+            if kind == "histogram":
+                self._buckets[name] = tuple(buckets)
+
+    def inc(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            buckets = self._buckets.setdefault(name, DEFAULT_BUCKETS)
+            series = self._histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0] * (len(buckets) + 2)
+            index = bisect.bisect_left(buckets, seconds)
+            if index < len(buckets):
+                values[index] += 1
+            values[-2] += seconds
+            values[-1] += 1
+
+    def expose_stats(self, prefix, stats_fn):
+        """Publish every numeric value of stats_fn() as a <prefix>_<key> gauge at render time."""
+        with self._lock:
+            self._stats_sources[prefix] = stats_fn
+
+    def render(self):
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: list(values) for key, values in series.items()}
+                          for name, series in self._histograms.items()}
+            buckets = dict(self._buckets)
+            help_texts = dict(self._help)
+            sources = dict(self._stats_sources)
+
+        lines = []
+        for name in sorted(counters):
+            lines += _header(name, "counter", help_texts)
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_labels(key)} {value}")
+        for name in sorted(histograms):
+            lines += _header(name, "histogram", help_texts)
+            for key, values in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(buckets[name], values):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(key + (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(key + (('le', '+Inf'),))} {values[-1]}")
+                lines.append(f"{name}_sum{_labels(key)} {values[-2]}")
+                lines.append(f"{name}_count{_labels(key)} {values[-1]}")
+        for prefix in sorted(sources):
+            try:
+                stats = sources[prefix]()
+            except Exception as e:
+                print(f"Metrics source {prefix} failed: {e}")
+                continue
+            for key in sorted(stats):
+                value = stats[key]
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = f"{prefix}_{key}"
+                    lines += _header(name, "gauge", help_texts)
+                    lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _header(name, kind, help_texts):
+    header = [f"# TYPE {name} {kind}"]
+    if name in help_texts:
+        header.insert(0, f"# HELP {name} {help_texts[name]}")
+    return header
+
+
+def _number(value):
+    return repr(float(value)) if not float(value).is_integer() else f"{float(value):.1f}"
+
+
+def _labels(key):
+    if not key:
+        return ""
+    parts = []
+    for label, value in key:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{label}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+describe = registry.describe
+expose_stats = registry.expose_stats
+render = registry.render
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@contextmanager
+def timed(name, **labels):
+    """Observe the time spent in the block into histogram name, including when it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scraped every few seconds; keep worker logs readable
+
+
+def serve(port):
+    """Serve /metrics from a daemon thread, for processes without a Flask app (e.g. the outbox workers)."""
+    server = ThreadingHTTPServer(("", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+describe("booking_phase_seconds", "histogram", "Time spent in each phase of a booking request")
+describe("booking_requests_total", "counter", "Booking requests by endpoint and HTTP status")
+describe("booking_rejections_total", "counter", "Rejected bookings by reason")
+describe("booking_idempotent_replays_total", "counter", "Duplicate booking requests answered from a stored result")
+describe("webhook_request_seconds", "histogram", "Dialogflow webhook latency by intent")
+describe("ticket_render_seconds", "histogram", "Time to render one ticket PDF")
+describe("smtp_send_seconds", "histogram", "Time to hand one message to the SMTP server")
+describe("smtp_messages_total", "counter", "Messages handed to the SMTP transport by outcome")
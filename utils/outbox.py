@@ -0,0 +1,201 @@
+import argparse
+import json
+import threading
+import time
+from utils.db_pool import get_db_connection
+
+MAX_ATTEMPTS = 6
+BASE_BACKOFF = 30  # seconds before the first retry; doubles on every failed attempt
+MAX_BACKOFF = 3600
+CLAIM_BATCH = 10  # rows a worker claims per round trip
+CLAIM_LEASE = 600  # seconds before a row stuck in 'sending' (crashed worker) is claimed again
+POLL_INTERVAL = 2  # seconds an idle worker sleeps between polls
+
+
+def enqueue(cursor, booking_id, kind, payload):
+    """Queue an email inside the caller's transaction, so it exists only if the booking commits."""
+    cursor.execute(
+        "INSERT INTO email_outbox (booking_id, kind, payload) VALUES (%s, %s, %s)",
+        (booking_id, kind, json.dumps(payload, default=str)))
+
+
+def enqueue_many(cursor, entries):
+    """Queue (booking_id, kind, payload) entries with one batched insert."""
+    if entries:
+        cursor.executemany(
+            "INSERT INTO email_outbox (booking_id, kind, payload) VALUES (%s, %s, %s)",
+            [(booking_id, kind, json.dumps(payload, default=str)) for booking_id, kind, payload in entries])
+
+
+def cancel(cursor, booking_id):
+    """Stop a booking's queued emails inside the caller's transaction (the booking is being cancelled).
+
+    A row a worker is sending right now may still go out, but it is not retried.
+    """
+    cursor.execute(
+        "UPDATE email_outbox SET status = 'cancelled' WHERE booking_id = %s AND status IN ('pending', 'sending')",
+        (booking_id,))
+
+
+def get_delivery_status(booking_id):
+    """Return every outbox record for a booking, oldest first."""
+    db = get_db_connection()
+    try:
+        cursor = db.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT id, kind, status, attempts, last_error, created_at, sent_at, next_attempt_at "
+            "FROM email_outbox WHERE booking_id = %s ORDER BY id",
+            (booking_id,))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        db.close()
+
+
+def _builders():
+    # Imported lazily so the booking API never loads reportlab or smtplib
+    from utils import email_sender, reemail
+    return {
+        "confirmation": email_sender.build_message,
+        "resend": reemail.build_message,
+    }
+
+
+def _backoff(attempts):
+    return min(BASE_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF)
+
+
+def claim(db, limit=CLAIM_BATCH):
+    """Lease up to limit due rows to this worker. SKIP LOCKED lets workers claim in parallel."""
+    cursor = db.cursor()
+    try:
+        db.start_transaction()
+        cursor.execute(
+            "SELECT id, booking_id, kind, payload, attempts FROM email_outbox "
+            "WHERE status IN ('pending', 'sending') AND next_attempt_at <= NOW() "
+            "ORDER BY next_attempt_at LIMIT %s FOR UPDATE SKIP LOCKED",
+            (limit,))
+        rows = cursor.fetchall()
+        if rows:
+            placeholders = ", ".join(["%s"] * len(rows))
+            cursor.execute(
+                "UPDATE email_outbox SET status = 'sending', attempts = attempts + 1, "
+                f"next_attempt_at = NOW() + INTERVAL %s SECOND WHERE id IN ({placeholders})",
+                (CLAIM_LEASE, *[row[0] for row in rows]))
+        db.commit()
+        return [(row_id, booking_id, kind, json.loads(payload), attempts + 1)
+                for row_id, booking_id, kind, payload, attempts in rows]
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def deliver(rows, builders):
+    """Render every claimed email and send them back to back over one SMTP session.
+
+    Returns None per delivered row, otherwise the error text.
+    """
+    from utils.mail_transport import get_transport
+
+    errors = [None] * len(rows)
+    messages, sent_rows = [], []
+    for index, (row_id, booking_id, kind, payload, attempts) in enumerate(rows):
+        build = builders.get(kind)
+        if build is None:
+            errors[index] = f"Unknown email kind: {kind}"
+            continue
+        try:
+            messages.append(build(payload["email"], booking_id, payload["date_time"], payload["ticket_count"], payload["username"]))
+            sent_rows.append(index)
+        except Exception as e:
+            errors[index] = str(e)
+    if messages:
+        for index, sent in zip(sent_rows, get_transport().send_many(messages)):
+            if not sent:
+                errors[index] = "SMTP send failed"
+    return errors
+
+
+def mark(db, row, error):
+    row_id, booking_id, kind, payload, attempts = row
+    cursor = db.cursor()
+    if error is None:
+        cursor.execute(
+            "UPDATE email_outbox SET status = 'sent', sent_at = NOW(), last_error = NULL WHERE id = %s",
+            (row_id,))
+    elif attempts >= MAX_ATTEMPTS:
+        cursor.execute(
+            "UPDATE email_outbox SET status = 'failed', last_error = %s WHERE id = %s AND status = 'sending'",
+            (error[:500], row_id))
+    else:
+        # status = 'sending': a row cancelled while it was being sent is not put back in the queue
+        cursor.execute(
+            "UPDATE email_outbox SET status = 'pending', last_error = %s, "
+            "next_attempt_at = NOW() + INTERVAL %s SECOND WHERE id = %s AND status = 'sending'",
+            (error[:500], _backoff(attempts), row_id))
+    db.commit()
+    cursor.close()
+
+
+def drain_once(builders=None, limit=CLAIM_BATCH):
+    """Claim and deliver one batch. Returns the number of rows processed."""
+    builders = builders or _builders()
+    db = get_db_connection()
+    try:
+        rows = claim(db, limit)
+    finally:
+        db.close()
+    if not rows:
+        return 0
+    errors = deliver(rows, builders)
+    db = get_db_connection()
+    try:
+        for row, error in zip(rows, errors):
+            if error:
+                print(f"Email for {row[1]} failed (attempt {row[4]}): {error}")
+            mark(db, row, error)
+    finally:
+        db.close()
+    return len(rows)
+
+
+def _worker_loop(stop_event, builders):
+    while not stop_event.is_set():
+        try:
+            processed = drain_once(builders)
+        except Exception as e:
+            print(f"Outbox worker error: {e}")
+            processed = 0
+        if not processed:
+            stop_event.wait(POLL_INTERVAL)
+
+
+def start_workers(count=2):
+    """Start count daemon threads draining the outbox; set the returned event to stop them."""
+    stop_event = threading.Event()
+    builders = _builders()
+    for i in range(count):
+        threading.Thread(target=_worker_loop, args=(stop_event, builders), name=f"outbox-{i}", daemon=True).start()
+    return stop_event
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deliver queued ticket emails")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--metrics-port", type=int, help="serve render/SMTP timings for Prometheus on this port")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        from utils import metrics
+        metrics.serve(args.metrics_port)
+
+    stop = start_workers(args.workers)
+    print(f"Outbox running with {args.workers} workers")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        stop.set()
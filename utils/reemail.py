@@ -1,108 +1,19 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-import barcode
-from barcode.writer import ImageWriter
-import os
-from datetime import datetime
-
-def format_datetime(date_time):
-    """Convert 'YYYY-MM-DD HH' string to 'DD Month YYYY, HH:MM AM/PM' format."""
-    if isinstance(date_time, str):
-        dt_obj = datetime.strptime(date_time, "%Y-%m-%d %H")  # Convert string to datetime
-    else:
-        dt_obj = date_time  # Already a datetime object
-
-    formatted_date = dt_obj.strftime("%d %B %Y, %I:%M %p")  # Example: "02 April 2025, 09:00 AM"
-    return formatted_date
+from utils.mail_transport import get_transport
+from utils.ticket_pdf import RESEND_TITLE, format_datetime, render_ticket_pdf, ticket_attachment
 
 def generate_ticket_pdf(booking_id, date_time, ticket_count, username):
-    pdf_filename = f"Ticket_{booking_id}.pdf"
-
-    # Generate Barcode
-    barcode_filename = f"barcode_{booking_id}.png"
-    code128 = barcode.get_barcode_class('code128')
-    barcode_obj = code128(booking_id, writer=ImageWriter())
-    barcode_path = barcode_obj.save(barcode_filename)
-
-    # Format Date & Time
-    formatted_date_time = format_datetime(date_time)
-
-    # PDF Setup
-    doc = SimpleDocTemplate(pdf_filename, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # Add Logo (Replace with your logo file path)
-    logo_path = "C:/Users/SANDEEP/OneDrive/Desktop/Chatbot/logo.png"  # Ensure you have a logo image
-    if os.path.exists(logo_path):
-        logo = Image(logo_path, width=140, height=140)
-        elements.append(logo)
-
-    # Title
-    elements.append(Spacer(1, 20))
-    title = Paragraph("<b><font size=18 color='#2E86C1'>🎫 Prasthana - Ticket Resend</font></b>", styles["Title"])
-    elements.append(title)
-    elements.append(Spacer(1, 10))
-
-    # User Greeting
-    greeting = Paragraph(f"<font size=14>Dear <b>{username}</b>,</font>", styles["Normal"])
-    elements.append(greeting)
-    elements.append(Spacer(1, 8))
-
-    # Booking Details
-    details = f"""
-    <font size=12>
-    🆔 <b>Booking ID:</b> {booking_id} <br/>
-    📅 <b>Date & Time:</b> {formatted_date_time} <br/>
-    🎟️ <b>Number of Tickets:</b> {ticket_count} <br/>
-    </font>
-    """
-    elements.append(Paragraph(details, styles["Normal"]))
-    elements.append(Spacer(1, 10))
+    """Render the ticket in memory; returns the PDF bytes."""
+    return render_ticket_pdf(booking_id, date_time, ticket_count, username, title=RESEND_TITLE)
 
-    # Barcode Image
-    barcode_img = Image(barcode_path, width=250, height=70)
-    elements.append(barcode_img)
-    elements.append(Spacer(1, 15))
-
-    # Instructions
-    instructions = Paragraph("""
-    <font size=11 color='gray'>
-    Please present this ticket at the venue for verification. <br/>
-    Thank you for choosing our service! 🎉
-    </font>
-    """, styles["Italic"])
-    elements.append(instructions)
-
-    # Footer
-    elements.append(Spacer(1, 30))
-    footer = Paragraph("<b>📞 Customer Support: 7385877592</b>", styles["Normal"])
-    elements.append(footer)
-
-    # Build PDF
-    doc.build(elements)
-
-    # Clean up barcode image
-    os.remove(barcode_path)
-
-    return pdf_filename
-
-def send_email(user_email, booking_id, date_time, ticket_count, username):
-    sender_email = "myac1224567@gmail.com"
-    app_password = "uqtcjgjxtcihwbqh"  # Use App Password
+def build_message(user_email, booking_id, date_time, ticket_count, username):
+    """Render the ticket and assemble the complete email, ready for the transport."""
+    sender_email = get_transport().sender
     subject = "Your Ticket Booking Confirmation"
 
     # Generate PDF ticket
-    pdf_filename = generate_ticket_pdf(booking_id, date_time, ticket_count, username)
+    pdf_bytes = generate_ticket_pdf(booking_id, date_time, ticket_count, username)
 
     # Email Content
     message = MIMEMultipart()
@@ -129,31 +40,21 @@ def send_email(user_email, booking_id, date_time, ticket_count, username):
     message.attach(MIMEText(body, "plain"))
 
     # Attach PDF
-    with open(pdf_filename, "rb") as attachment:
-        part = MIMEBase("application", "octet-stream")
-        part.set_payload(attachment.read())
+    message.attach(ticket_attachment(pdf_bytes, booking_id))
 
-    encoders.encode_base64(part)
-    part.add_header(
-        "Content-Disposition",
-        f"attachment; filename={pdf_filename}",
-    )
-    message.attach(part)
+    return message
 
-    try:
-        # Connect to Gmail SMTP server
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(sender_email, app_password)
-        server.sendmail(sender_email, user_email, message.as_string())
-        server.quit()
+def send_email(user_email, booking_id, date_time, ticket_count, username):
+    # Sent over a pooled, already-authenticated SMTP session (utils.mail_transport)
+    message = build_message(user_email, booking_id, date_time, ticket_count, username)
+    sent = get_transport().send(message)
+    if sent:
         print("✅ Email sent successfully!")
+    return sent
 
-    except Exception as e:
-        print(f"❌ Failed to send email: {e}")
-
-    # Clean up the PDF file
-    os.remove(pdf_filename)
+def send_emails(tickets):
+    """Send many (user_email, booking_id, date_time, ticket_count, username) tickets over one session."""
+    return get_transport().send_many([build_message(*ticket) for ticket in tickets])
 
 # # Example Usage
 # send_email("user@example.com", "ABC123", "10-03-2025 17:00", 2, "John Doe")
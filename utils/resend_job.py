@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+from utils.db_pool import DB_CONFIG
+
+FETCH_SIZE = 500  # rows pulled from the server-side cursor at a time
+SEND_BATCH = 20  # emails sent back to back over one SMTP session
+SEND_WORKERS = 4
+QUEUE_BATCHES = 8  # batches waiting for a worker; the reader blocks beyond this
+PUT_CHECK_INTERVAL = 1  # seconds between checks that some worker is still alive while the queue is full
+CHECKPOINT_EVERY = 50  # completed rows between checkpoint writes
+
+
+def stream_bookings(start, end, after=None, fetch_size=FETCH_SIZE):
+    """Yield bookings with start <= slot_time <= end in (slot_time, booking_id) order.
+
+    Uses an unbuffered cursor, so rows arrive from the server in chunks rather
+    than as one result set in memory. after=(slot_time, booking_id) resumes
+    just past that row. The stream holds its own connection rather than a
+    pooled one: it stays open for the whole job and changes session settings.
+    """
+    query = ("SELECT booking_id, email, slot_time, ticket_count, username FROM bookings "
+             "WHERE slot_time BETWEEN %s AND %s")
+    params = [start, end]
+    if after:
+        query += " AND (slot_time > %s OR (slot_time = %s AND booking_id > %s))"
+        params += [after[0], after[0], after[1]]
+    query += " ORDER BY slot_time, booking_id"
+
+    db = mysql.connector.connect(**DB_CONFIG)
+    cursor = db.cursor(buffered=False)
+    try:
+        # The reader pauses while senders catch up; keep the server from dropping the stream meanwhile
+        cursor.execute("SET SESSION net_write_timeout = 600")
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass  # unread rows after an early stop
+        db.close()
+
+
+class Checkpoint:
+    """Remembers the last row of the contiguous completed prefix, so a restart skips finished work.
+
+    Rows complete out of order across workers; only once every earlier row is
+    done does the saved position move past it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {"after": None, "sent": 0, "failed": 0}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        self._lock = threading.Lock()
+        self._keys = {}  # seq -> (slot_time, booking_id) for rows in flight
+        self._done = set()
+        self._next_seq = 0  # lowest seq not yet known to be done
+        self._since_save = 0
+
+    @property
+    def after(self):
+        after = self.state["after"]
+        return (datetime.strptime(after[0], "%Y-%m-%d %H:%M:%S"), after[1]) if after else None
+
+    def track(self, seq, slot_time, booking_id):
+        with self._lock:
+            self._keys[seq] = (slot_time, booking_id)
+
+    def complete(self, seq, sent):
+        with self._lock:
+            self.state["sent" if sent else "failed"] += 1
+            self._done.add(seq)
+            last = None
+            while self._next_seq in self._done:
+                self._done.remove(self._next_seq)
+                last = self._keys.pop(self._next_seq)
+                self._next_seq += 1
+            if last:
+                self.state["after"] = [last[0].strftime("%Y-%m-%d %H:%M:%S"), last[1]]
+            self._since_save += 1
+            if self._since_save >= CHECKPOINT_EVERY:
+                self._save()
+
+    def _save(self):
+        # Caller holds _lock; write-then-rename so a crash never leaves a torn file
+        self._since_save = 0
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+
+def _send_worker(batches, checkpoint, failures, failures_lock, worker_errors):
+    try:
+        _send_batches(batches, checkpoint, failures, failures_lock)
+    except Exception as e:
+        # Rows of the failed batch stay incomplete, so the checkpoint does not move past them
+        print(f"Send worker stopped: {e}")
+        worker_errors.append(e)
+
+
+def _send_batches(batches, checkpoint, failures, failures_lock):
+    from utils import reemail
+    from utils.mail_transport import get_transport
+
+    while True:
+        batch = batches.get()
+        if batch is None:
+            break
+        messages, sent_rows = [], []
+        for seq, row in batch:
+            booking_id, email, slot_time, ticket_count, username = row
+            try:
+                messages.append(reemail.build_message(email, booking_id, slot_time, ticket_count, username))
+                sent_rows.append((seq, row))
+            except Exception as e:
+                print(f"Could not render ticket {booking_id}: {e}")
+                with failures_lock:
+                    failures.write(json.dumps({"booking_id": booking_id, "error": str(e)}) + "\n")
+                checkpoint.complete(seq, False)
+        results = get_transport().send_many(messages) if messages else []
+        for (seq, row), sent in zip(sent_rows, results):
+            if not sent:
+                with failures_lock:
+                    failures.write(json.dumps({"booking_id": row[0], "error": "SMTP send failed"}) + "\n")
+            checkpoint.complete(seq, sent)
+
+
+def _put(batches, item, threads):
+    # A plain put() would wait forever once every worker has died
+    while True:
+        try:
+            batches.put(item, timeout=PUT_CHECK_INTERVAL)
+            return
+        except queue.Full:
+            if not any(thread.is_alive() for thread in threads):
+                raise RuntimeError("every send worker has stopped")
+
+
+def run(start, end, checkpoint_path, workers=SEND_WORKERS, batch_size=SEND_BATCH):
+    """Resend every ticket with a slot in [start, end]; resumes from checkpoint_path if it exists.
+
+    Raises RuntimeError if a send worker failed; the checkpoint is saved first,
+    so rerunning picks up from the first unfinished row.
+    """
+    checkpoint = Checkpoint(checkpoint_path)
+    batches = queue.Queue(maxsize=QUEUE_BATCHES)  # bounded: the reader waits for slow senders
+    failures_lock = threading.Lock()
+    worker_errors = []
+    with open(checkpoint_path + ".failures.ndjson", "a", encoding="utf-8") as failures:
+        threads = [threading.Thread(target=_send_worker, args=(batches, checkpoint, failures, failures_lock, worker_errors),
+                                    daemon=True)
+                   for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            batch = []
+            for seq, row in enumerate(stream_bookings(start, end, checkpoint.after)):
+                checkpoint.track(seq, row[2], row[0])
+                batch.append((seq, row))
+                if len(batch) >= batch_size:
+                    _put(batches, batch, threads)
+                    batch = []
+            if batch:
+                _put(batches, batch, threads)
+        finally:
+            try:
+                for _ in threads:
+                    _put(batches, None, threads)
+            except RuntimeError:
+                pass  # nobody left to stop
+            for thread in threads:
+                thread.join()
+            checkpoint.save()
+    if worker_errors:
+        raise RuntimeError(f"{len(worker_errors)} send worker(s) failed: {worker_errors[0]}")
+    return checkpoint.state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resend tickets for a slot or a date range")
+    parser.add_argument("--slot", help="single slot as 'YYYY-MM-DD HH'")
+    parser.add_argument("--from", dest="start", help="first date 'YYYY-MM-DD'")
+    parser.add_argument("--to", dest="end", help="last date 'YYYY-MM-DD' (inclusive)")
+    parser.add_argument("--checkpoint", help="progress file; rerun with the same path to resume")
+    parser.add_argument("--workers", type=int, default=SEND_WORKERS)
+    parser.add_argument("--batch", type=int, default=SEND_BATCH)
+    args = parser.parse_args()
+
+    if args.slot:
+        start = end = datetime.strptime(args.slot, "%Y-%m-%d %H")
+    elif args.start and args.end:
+        start = datetime.strptime(args.start, "%Y-%m-%d")
+        end = datetime.strptime(args.end, "%Y-%m-%d") + timedelta(hours=23)
+    else:
+        parser.error("give --slot or both --from and --to")
+    checkpoint_path = args.checkpoint or f"resend_{start:%Y%m%d%H}_{end:%Y%m%d%H}.json"
+
+    try:
+        state = run(start, end, checkpoint_path, args.workers, args.batch)
+    except RuntimeError as e:
+        print(f"Resend stopped: {e}; rerun with --checkpoint {checkpoint_path} to resume")
+        sys.exit(1)
+    print(f"Resend finished: {state['sent']} sent, {state['failed']} failed (see {checkpoint_path}.failures.ndjson)")
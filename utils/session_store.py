@@ -0,0 +1,150 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_TTL = int(os.environ.get("SESSION_TTL", 1800))  # seconds of inactivity before a chat session is dropped
+MAX_SESSIONS = int(os.environ.get("SESSION_MAX", 10000))
+
+
+class SessionRecord:
+    """Booking details collected over one Dialogflow conversation."""
+
+    __slots__ = ("username", "email", "aadhaar_number", "date_time", "ticket_count", "passenger_names", "last_seen")
+    FIELDS = ("username", "email", "aadhaar_number", "date_time", "ticket_count", "passenger_names")
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name))
+        self.last_seen = time.time()
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __repr__(self):
+        return f"SessionRecord({self.to_dict()})"
+
+
+class MemorySessionStore:
+    """Per-process store: least recently used sessions are evicted past max_sessions or after ttl seconds."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()  # oldest activity first
+        self._lock = threading.Lock()
+        self._evicted = 0
+
+    def get(self, session_id):
+        """Return the session's record, starting a fresh one if it is unknown or expired."""
+        now = time.time()
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None or now - record.last_seen > self.ttl:
+                record = SessionRecord()
+                self._sessions[session_id] = record
+            record.last_seen = now
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+        return record
+
+    def save(self, session_id, record):
+        with self._lock:
+            record.last_seen = time.time()
+            self._sessions[session_id] = record
+            self._sessions.move_to_end(session_id)
+
+    def pop(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def _evict(self, now):
+        # Caller holds _lock; entries are ordered by last activity, so expired ones sit at the front
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - oldest.last_seen <= self.ttl:
+                break
+            del self._sessions[oldest_id]
+            self._evicted += 1
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "sessions": len(self._sessions), "evicted": self._evicted}
+
+
+class SQLiteSessionStore:
+    """Store shared by every webhook worker on the host through one SQLite file."""
+
+    PURGE_EVERY = 200  # saves between sweeps for expired and over-cap sessions
+
+    def __init__(self, path, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._local = threading.local()
+        self._saves = 0
+        self._evicted = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, last_seen REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_seen ON sessions (last_seen)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")  # readers in other workers do not block writers
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id):
+        row = self._conn().execute(
+            "SELECT data FROM sessions WHERE session_id = ? AND last_seen >= ?",
+            (session_id, time.time() - self.ttl)).fetchone()
+        return SessionRecord.from_dict(json.loads(row[0])) if row else SessionRecord()
+
+    def save(self, session_id, record):
+        record.last_seen = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, data, last_seen) VALUES (?, ?, ?)",
+            (session_id, json.dumps(record.to_dict()), record.last_seen))
+        self._saves += 1
+        if self._saves % self.PURGE_EVERY == 0:
+            self._purge(conn)
+
+    def pop(self, session_id):
+        record = self.get(session_id)
+        self._conn().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return record
+
+    def _purge(self, conn):
+        cursor = conn.execute("DELETE FROM sessions WHERE last_seen < ?", (time.time() - self.ttl,))
+        evicted = cursor.rowcount
+        cursor = conn.execute(
+            "DELETE FROM sessions WHERE session_id IN ("
+            "SELECT session_id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,))
+        self._evicted += evicted + cursor.rowcount
+
+    def stats(self):
+        count = self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "sessions": count, "evicted": self._evicted}
+
+
+def create_session_store(url=None):
+    """Build the store named by SESSION_STORE: "memory" (default) or "sqlite:///path/to/sessions.db"."""
+    url = url or os.environ.get("SESSION_STORE", "memory")
+    if url == "memory":
+        return MemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unknown SESSION_STORE: {url}")
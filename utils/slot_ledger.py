@@ -0,0 +1,281 @@
+import threading
+import time
+from datetime import datetime
+
+SLOT_CAPACITY = 500  # Max tickets per hourly slot
+MAX_TICKETS_PER_AADHAAR = 4  # Max tickets per Aadhaar per slot
+
+SLOT_FULL_ERROR = "Slot is full"
+AADHAAR_LIMIT_ERROR = f"You can book only {MAX_TICKETS_PER_AADHAAR} tickets per slot"
+COUNTERS_UNAVAILABLE_ERROR = "Booking is temporarily unavailable, please try again"  # retryable, not a limit
+
+# In-process mirror of the slot_counters / aadhaar_slot_counters tables.
+# The database rows stay authoritative: the mirror is refreshed every time a
+# counter row is read under lock and bumped after every commit, so a slot that
+# is already full can be rejected without a round trip. Entries are
+# [booked, read_at]. Cancellations in another process lower the database
+# counters without touching this mirror, so an entry is only trusted for
+# MIRROR_TTL seconds after it was last read from the database.
+_lock = threading.Lock()
+_slot_booked = {}
+_aadhaar_booked = {}
+_commits_since_prune = 0
+PRUNE_EVERY = 1000  # Drop mirror entries for past slots every N commits
+MIRROR_TTL = 5  # seconds
+
+
+def _fresh(entry, now):
+    return entry[0] if entry is not None and now - entry[1] < MIRROR_TTL else None
+
+
+def cached_slot_booked(slot_time):
+    """Return the mirrored ticket count for a slot, or None if it was not read from the database recently."""
+    with _lock:
+        return _fresh(_slot_booked.get(slot_time), time.monotonic())
+
+
+def cached_aadhaar_booked(aadhaar_number, slot_time):
+    with _lock:
+        return _fresh(_aadhaar_booked.get((aadhaar_number, slot_time)), time.monotonic())
+
+
+def check_cached(slot_time, aadhaar_number, ticket_count):
+    """Reject from the mirror alone when a limit is already known to be exceeded; None means "ask the database"."""
+    now = time.monotonic()
+    with _lock:
+        cached_slot = _fresh(_slot_booked.get(slot_time), now)
+        cached_user = _fresh(_aadhaar_booked.get((aadhaar_number, slot_time)), now)
+    if cached_slot is not None and cached_slot + ticket_count > SLOT_CAPACITY:
+        return SLOT_FULL_ERROR
+    if cached_user is not None and cached_user + ticket_count > MAX_TICKETS_PER_AADHAAR:
+        return AADHAAR_LIMIT_ERROR
+    return None
+
+
+# Admission is this one statement: both counters move together only if both
+# limits still hold, so a booking commits or is rejected without any prior
+# locking read, and the slot's hot row is locked only from here to COMMIT.
+ADMIT_SQL = (
+    "UPDATE slot_counters s JOIN aadhaar_slot_counters a "
+    "ON a.slot_time = s.slot_time AND a.aadhaar_number = %s "
+    "SET s.booked = s.booked + %s, a.booked = a.booked + %s "
+    "WHERE s.slot_time = %s AND s.booked + %s <= %s AND a.booked + %s <= %s"
+)
+
+
+def _ensure_rows(cursor, slot_time, aadhaar_number, slot_known):
+    # ON DUPLICATE KEY (not INSERT IGNORE) so an existing row is locked exclusively
+    # rather than shared, which would deadlock against the UPDATE that follows.
+    cursor.execute(
+        "INSERT INTO aadhaar_slot_counters (aadhaar_number, slot_time, booked) VALUES (%s, %s, 0) "
+        "ON DUPLICATE KEY UPDATE booked = booked",
+        (aadhaar_number, slot_time))
+    if not slot_known:
+        cursor.execute(
+            "INSERT INTO slot_counters (slot_time, booked) VALUES (%s, 0) "
+            "ON DUPLICATE KEY UPDATE booked = booked",
+            (slot_time,))
+
+
+def _remember(slots, users):
+    # slots: {slot_time: booked}, users: {(aadhaar_number, slot_time): booked}, as just read from the database
+    now = time.monotonic()
+    with _lock:
+        for slot_time, booked in slots.items():
+            _slot_booked[slot_time] = [booked, now]
+        for key, booked in users.items():
+            _aadhaar_booked[key] = [booked, now]
+
+
+def _read_counters(cursor, slot_time, aadhaar_number):
+    cursor.execute(
+        "SELECT s.booked, a.booked FROM slot_counters s JOIN aadhaar_slot_counters a "
+        "ON a.slot_time = s.slot_time AND a.aadhaar_number = %s WHERE s.slot_time = %s",
+        (aadhaar_number, slot_time))
+    return cursor.fetchone()
+
+
+def reserve(cursor, slot_time, aadhaar_number, ticket_count, use_mirror=True):
+    """Claim ticket_count tickets inside the caller's open transaction.
+
+    Runs ADMIT_SQL, a single conditional update of one slot_counters row and
+    one aadhaar_slot_counters row, so the cost does not grow with the number
+    of bookings in the slot. Call it as late as possible in the transaction
+    to keep the slot row's lock short. Returns None on success, otherwise the
+    rejection message. The caller must commit and then call record().
+    With use_mirror=False a rejection always comes from the database.
+    """
+    error = check_cached(slot_time, aadhaar_number, ticket_count) if use_mirror else None
+    if error:
+        return error
+    with _lock:
+        slot_known = slot_time in _slot_booked
+
+    # The Aadhaar row is private to this user, and a slot seen before already has its row
+    _ensure_rows(cursor, slot_time, aadhaar_number, slot_known)
+    params = (aadhaar_number, ticket_count, ticket_count, slot_time,
+              ticket_count, SLOT_CAPACITY, ticket_count, MAX_TICKETS_PER_AADHAAR)
+    cursor.execute(ADMIT_SQL, params)
+    if cursor.rowcount > 0:
+        return None
+
+    row = _read_counters(cursor, slot_time, aadhaar_number)
+    if row is None:
+        # The slot row vanished under us (counters being rebuilt); create it and retry once
+        _ensure_rows(cursor, slot_time, aadhaar_number, slot_known=False)
+        cursor.execute(ADMIT_SQL, params)
+        if cursor.rowcount > 0:
+            return None
+        row = _read_counters(cursor, slot_time, aadhaar_number)
+        if row is None:
+            return COUNTERS_UNAVAILABLE_ERROR
+
+    booked_tickets, user_tickets = row
+    _remember({slot_time: booked_tickets}, {(aadhaar_number, slot_time): user_tickets})
+    if booked_tickets + ticket_count > SLOT_CAPACITY:
+        return SLOT_FULL_ERROR
+    return AADHAAR_LIMIT_ERROR
+
+
+def reserve_many(cursor, requests):
+    """Claim tickets for several (slot_time, aadhaar_number, ticket_count) requests at once.
+
+    Locks every counter row involved with one statement per table (in key
+    order, so concurrent batches cannot deadlock on each other), admits the
+    requests in order and writes the new totals back with one batched upsert
+    per table. Returns a rejection message or None per request.
+    """
+    if not requests:
+        return []
+    slots = sorted({slot_time for slot_time, _, _ in requests})
+    pairs = sorted({(aadhaar, slot_time) for slot_time, aadhaar, _ in requests}, key=lambda p: (p[1], p[0]))
+
+    # Aadhaar rows first, then slot rows: the same order reserve() locks them in
+    cursor.executemany(
+        "INSERT INTO aadhaar_slot_counters (aadhaar_number, slot_time, booked) VALUES (%s, %s, 0) "
+        "ON DUPLICATE KEY UPDATE booked = booked",
+        pairs)
+    cursor.execute(
+        "SELECT aadhaar_number, slot_time, booked FROM aadhaar_slot_counters "
+        f"WHERE (aadhaar_number, slot_time) IN ({', '.join(['(%s, %s)'] * len(pairs))}) FOR UPDATE",
+        [value for pair in pairs for value in pair])
+    aadhaar_booked = {(aadhaar, slot_time): booked for aadhaar, slot_time, booked in cursor.fetchall()}
+
+    cursor.executemany(
+        "INSERT INTO slot_counters (slot_time, booked) VALUES (%s, 0) ON DUPLICATE KEY UPDATE booked = booked",
+        [(slot_time,) for slot_time in slots])
+    cursor.execute(
+        f"SELECT slot_time, booked FROM slot_counters WHERE slot_time IN ({', '.join(['%s'] * len(slots))}) FOR UPDATE",
+        slots)
+    slot_booked = dict(cursor.fetchall())
+
+    _remember(slot_booked, aadhaar_booked)
+
+    errors = []
+    for slot_time, aadhaar_number, ticket_count in requests:
+        key = (aadhaar_number, slot_time)
+        if slot_booked[slot_time] + ticket_count > SLOT_CAPACITY:
+            errors.append(SLOT_FULL_ERROR)
+        elif aadhaar_booked[key] + ticket_count > MAX_TICKETS_PER_AADHAAR:
+            errors.append(AADHAAR_LIMIT_ERROR)
+        else:
+            slot_booked[slot_time] += ticket_count
+            aadhaar_booked[key] += ticket_count
+            errors.append(None)
+
+    cursor.executemany(
+        "INSERT INTO slot_counters (slot_time, booked) VALUES (%s, %s) ON DUPLICATE KEY UPDATE booked = VALUES(booked)",
+        list(slot_booked.items()))
+    cursor.executemany(
+        "INSERT INTO aadhaar_slot_counters (aadhaar_number, slot_time, booked) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE booked = VALUES(booked)",
+        [(aadhaar, slot_time, booked) for (aadhaar, slot_time), booked in aadhaar_booked.items()])
+    return errors
+
+
+def release(cursor, slot_time, aadhaar_number, ticket_count):
+    """Give ticket_count tickets back inside the caller's transaction (a cancellation).
+
+    Locks the Aadhaar row before the slot row, like reserve(). After the
+    commit, call record() with a negative count.
+    """
+    cursor.execute(
+        "UPDATE aadhaar_slot_counters SET booked = GREATEST(booked - %s, 0) "
+        "WHERE aadhaar_number = %s AND slot_time = %s",
+        (ticket_count, aadhaar_number, slot_time))
+    cursor.execute(
+        "UPDATE slot_counters SET booked = GREATEST(booked - %s, 0) WHERE slot_time = %s",
+        (ticket_count, slot_time))
+
+
+def record(slot_time, aadhaar_number, ticket_count):
+    """Apply a committed reservation (or, with a negative count, a release) to the in-process mirror."""
+    global _commits_since_prune
+    with _lock:
+        if slot_time in _slot_booked:
+            _slot_booked[slot_time][0] += ticket_count
+        key = (aadhaar_number, slot_time)
+        if key in _aadhaar_booked:
+            _aadhaar_booked[key][0] += ticket_count
+        _commits_since_prune += 1
+        if _commits_since_prune >= PRUNE_EVERY:
+            _commits_since_prune = 0
+            _prune(datetime.now())
+
+
+def _prune(now):
+    # Caller holds _lock
+    for slot_time in [s for s in _slot_booked if s < now]:
+        del _slot_booked[slot_time]
+    for key in [k for k in _aadhaar_booked if k[1] < now]:
+        del _aadhaar_booked[key]
+
+
+def load_mirror(cursor):
+    """Replace the in-process mirror with the current counter tables."""
+    cursor.execute("SELECT slot_time, booked FROM slot_counters")
+    slots = dict(cursor.fetchall())
+    cursor.execute("SELECT aadhaar_number, slot_time, booked FROM aadhaar_slot_counters")
+    users = {(aadhaar, slot): booked for aadhaar, slot, booked in cursor.fetchall()}
+    with _lock:
+        _slot_booked.clear()
+        _aadhaar_booked.clear()
+    _remember(slots, users)
+
+
+def rebuild_from_bookings(db):
+    """Recompute both counter tables from bookings and reload the mirror.
+
+    Recovery routine: run it while booking traffic is stopped, e.g. after a
+    manual edit of the bookings table or a restore from backup.
+    """
+    cursor = db.cursor()
+    try:
+        db.start_transaction()
+        cursor.execute("DELETE FROM slot_counters")
+        cursor.execute(
+            "INSERT INTO slot_counters (slot_time, booked) "
+            "SELECT slot_time, SUM(ticket_count) FROM bookings GROUP BY slot_time")
+        cursor.execute("DELETE FROM aadhaar_slot_counters")
+        cursor.execute(
+            "INSERT INTO aadhaar_slot_counters (aadhaar_number, slot_time, booked) "
+            "SELECT aadhaar_number, slot_time, SUM(ticket_count) FROM bookings "
+            "GROUP BY aadhaar_number, slot_time")
+        db.commit()
+        load_mirror(cursor)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+if __name__ == "__main__":
+    from utils.db_pool import get_db_connection
+
+    db = get_db_connection()
+    try:
+        rebuild_from_bookings(db)
+        print(f"Rebuilt counters for {len(_slot_booked)} slots")
+    finally:
+        db.close()
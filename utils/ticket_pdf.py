@@ -0,0 +1,128 @@
+import io
+import os
+import threading
+import time
+from datetime import datetime
+from email import encoders
+from email.mime.base import MIMEBase
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+import barcode
+from barcode.writer import ImageWriter
+from utils import metrics
+
+CONFIRMATION_TITLE = "🎫 Prasthana - Ticket Confirmation"
+RESEND_TITLE = "🎫 Prasthana - Ticket Resend"
+
+# Everything below is loaded once at import; a render only fills in the booking fields
+LOGO_PATH = os.environ.get("TICKET_LOGO", "C:/Users/SANDEEP/OneDrive/Desktop/Chatbot/logo.png")
+STYLES = getSampleStyleSheet()
+CODE128 = barcode.get_barcode_class('code128')
+
+
+def _load_logo():
+    if os.path.exists(LOGO_PATH):
+        with open(LOGO_PATH, "rb") as f:
+            return f.read()
+    return None
+
+
+LOGO_BYTES = _load_logo()
+
+INSTRUCTIONS_MARKUP = """
+    <font size=11 color='gray'>
+    Please present this ticket at the venue for verification. <br/>
+    Thank you for choosing our service! 🎉
+    </font>
+    """
+FOOTER_MARKUP = "<b>📞 Customer Support: 7385877592</b>"
+
+# Static paragraphs are parsed once per thread: platypus keeps layout state on
+# a flowable while a document is built, so they must not be shared across threads.
+_static = threading.local()
+
+
+def _static_flowables(title):
+    cache = getattr(_static, "flowables", None)
+    if cache is None:
+        cache = _static.flowables = {}
+    if title not in cache:
+        cache[title] = (
+            Paragraph(f"<b><font size=18 color='#2E86C1'>{title}</font></b>", STYLES["Title"]),
+            Paragraph(INSTRUCTIONS_MARKUP, STYLES["Italic"]),
+            Paragraph(FOOTER_MARKUP, STYLES["Normal"]),
+        )
+    return cache[title]
+
+
+def format_datetime(date_time):
+    """Convert 'YYYY-MM-DD HH' string to 'DD Month YYYY, HH:MM AM/PM' format."""
+    if isinstance(date_time, str):
+        dt_obj = datetime.strptime(date_time, "%Y-%m-%d %H")  # Convert string to datetime
+    else:
+        dt_obj = date_time  # Already a datetime object
+
+    formatted_date = dt_obj.strftime("%d %B %Y, %I:%M %p")  # Example: "02 April 2025, 09:00 AM"
+    return formatted_date
+
+
+def barcode_png(booking_id):
+    """Render the booking id as a Code128 PNG in memory."""
+    buffer = io.BytesIO()
+    CODE128(booking_id, writer=ImageWriter()).write(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def render_ticket_pdf(booking_id, date_time, ticket_count, username, title=CONFIRMATION_TITLE):
+    """Build the ticket PDF entirely in memory and return its bytes."""
+    started = time.perf_counter()
+    title_para, instructions, footer = _static_flowables(title)
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+
+    if LOGO_BYTES:
+        elements.append(Image(io.BytesIO(LOGO_BYTES), width=140, height=140))
+
+    elements.append(Spacer(1, 20))
+    elements.append(title_para)
+    elements.append(Spacer(1, 10))
+
+    # User Greeting
+    elements.append(Paragraph(f"<font size=14>Dear <b>{username}</b>,</font>", STYLES["Normal"]))
+    elements.append(Spacer(1, 8))
+
+    # Booking Details
+    details = f"""
+    <font size=12>
+    🆔 <b>Booking ID:</b> {booking_id} <br/>
+    📅 <b>Date & Time:</b> {format_datetime(date_time)} <br/>
+    🎟️ <b>Number of Tickets:</b> {ticket_count} <br/>
+    </font>
+    """
+    elements.append(Paragraph(details, STYLES["Normal"]))
+    elements.append(Spacer(1, 10))
+
+    elements.append(Image(barcode_png(booking_id), width=250, height=70))
+    elements.append(Spacer(1, 15))
+    elements.append(instructions)
+    elements.append(Spacer(1, 30))
+    elements.append(footer)
+
+    doc.build(elements)
+    metrics.observe("ticket_render_seconds", time.perf_counter() - started)
+    return buffer.getvalue()
+
+
+def ticket_attachment(pdf_bytes, booking_id):
+    """Wrap rendered PDF bytes as the MIME attachment the ticket emails carry."""
+    part = MIMEBase("application", "octet-stream")
+    part.set_payload(pdf_bytes)
+    encoders.encode_base64(part)
+    part.add_header(
+        "Content-Disposition",
+        f"attachment; filename=Ticket_{booking_id}.pdf",
+    )
+    return part
@@ -0,0 +1,31 @@
+import re
+
+from utils.booking_rules import is_bookable
+
+# Compiled once at import; the booking API, the chatbot and bulk imports all validate through these
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+AADHAAR_PATTERN = re.compile(r'\d{12}')
+
+
+def is_valid_email(email):
+    return isinstance(email, str) and EMAIL_PATTERN.match(email) is not None
+
+
+def is_valid_aadhaar(aadhaar_number):
+    return AADHAAR_PATTERN.fullmatch(str(normalize_aadhaar(aadhaar_number))) is not None
+
+
+def normalize_aadhaar(aadhaar_number):
+    """Aadhaar number as a string; JSON clients, NDJSON imports and Dialogflow often send it as a number."""
+    if isinstance(aadhaar_number, bool):
+        return aadhaar_number
+    if isinstance(aadhaar_number, float) and aadhaar_number.is_integer():
+        aadhaar_number = int(aadhaar_number)
+    if isinstance(aadhaar_number, int):
+        return str(aadhaar_number)
+    return aadhaar_number
+
+
+def is_valid_date(date_time):
+    # 60-day window, 7 AM to 9 PM
+    return is_bookable(date_time)
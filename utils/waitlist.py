@@ -0,0 +1,185 @@
+import json
+
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError
+
+from utils import slot_ledger
+from utils.availability_cache import availability_cache
+from utils.db_pool import get_db_connection
+from utils.latest_booking import record_booking
+from utils.validators import is_valid_date
+
+PROMOTE_BATCH = 50  # waiting entries admitted per transaction
+SLOT_STARTED_ERROR = "Slot has already started"
+
+
+def join(booking):
+    """Put a parsed booking on its slot's waitlist. Returns (waitlist_id, position).
+
+    An Aadhaar already waiting for the slot keeps its original place instead
+    of queueing twice (enforced by the uq_waitlist_waiting key).
+    """
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        db.start_transaction()
+        for attempt in range(2):
+            # The retry is a locking read: a plain read would not see the concurrent entry past our snapshot
+            cursor.execute(
+                "SELECT id FROM waitlist WHERE slot_time = %s AND aadhaar_number = %s AND status = 'waiting' "
+                "ORDER BY id LIMIT 1" + (" LOCK IN SHARE MODE" if attempt else ""),
+                (booking["slot_time"], booking["aadhaar_number"]))
+            row = cursor.fetchone()
+            if row:
+                waitlist_id = row[0]
+                break
+            try:
+                cursor.execute(
+                    "INSERT INTO waitlist (slot_time, username, email, aadhaar_number, ticket_count, passenger_names) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    (booking["slot_time"], booking["username"], booking["email"], booking["aadhaar_number"],
+                     booking["ticket_count"], json.dumps(booking["passenger_names"])))
+                waitlist_id = cursor.lastrowid
+                break
+            except IntegrityError as e:
+                # A concurrent join for the same Aadhaar got in first; the next pass finds its entry
+                if e.errno != errorcode.ER_DUP_ENTRY:
+                    raise
+        else:
+            raise RuntimeError("Could not join the waitlist, please try again")
+        cursor.execute(
+            "SELECT COUNT(*) FROM waitlist WHERE slot_time = %s AND status = 'waiting' AND id <= %s",
+            (booking["slot_time"], waitlist_id))
+        position = cursor.fetchone()[0]
+        db.commit()
+        return waitlist_id, position
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_entry(waitlist_id):
+    """Return a waitlist entry with its current place in the queue, or None."""
+    db = get_db_connection()
+    try:
+        cursor = db.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT id, slot_time, status, booking_id, last_error, created_at, promoted_at "
+            "FROM waitlist WHERE id = %s",
+            (waitlist_id,))
+        entry = cursor.fetchone()
+        if entry and entry["status"] == "waiting":
+            cursor.execute(
+                "SELECT COUNT(*) AS position FROM waitlist WHERE slot_time = %s AND status = 'waiting' AND id <= %s",
+                (entry["slot_time"], waitlist_id))
+            entry["position"] = cursor.fetchone()["position"]
+        cursor.close()
+        return entry
+    finally:
+        db.close()
+
+
+def _promote_batch(slot_time, limit):
+    """Admit up to limit waiting entries, oldest first, in one transaction.
+
+    Returns (promoted bookings, whether promotion should stop). Entries that no
+    longer fit the per-Aadhaar limit are rejected; entries that do not fit
+    the remaining seats stay queued, though a smaller party behind them may
+    still be admitted.
+    """
+    from flask_api import admit_bookings
+
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        db.start_transaction()
+        # Plain FOR UPDATE (not SKIP LOCKED): concurrent promoters for a slot take turns, keeping FIFO order
+        cursor.execute(
+            "SELECT id, username, email, aadhaar_number, ticket_count, passenger_names FROM waitlist "
+            "WHERE slot_time = %s AND status = 'waiting' ORDER BY id LIMIT %s FOR UPDATE",
+            (slot_time, limit))
+        rows = cursor.fetchall()
+        if not rows:
+            db.commit()
+            return [], True
+        bookings = [{
+            "username": username,
+            "email": email,
+            "aadhaar_number": aadhaar_number,
+            "slot_time": slot_time,
+            "ticket_count": ticket_count,
+            "passenger_names": json.loads(passenger_names) if passenger_names else [],
+        } for _, username, email, aadhaar_number, ticket_count, passenger_names in rows]
+
+        # Admitted bookings get their confirmation email queued like any other booking
+        errors = admit_bookings(cursor, bookings)
+
+        promoted, rejected = [], []
+        for row, booking, error in zip(rows, bookings, errors):
+            if error is None:
+                promoted.append((booking["booking_id"], row[0]))
+            elif error != slot_ledger.SLOT_FULL_ERROR:
+                rejected.append((error, row[0]))
+        if promoted:
+            cursor.executemany(
+                "UPDATE waitlist SET status = 'promoted', booking_id = %s, promoted_at = NOW() WHERE id = %s",
+                promoted)
+        if rejected:
+            cursor.executemany(
+                "UPDATE waitlist SET status = 'rejected', last_error = %s WHERE id = %s",
+                rejected)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    admitted = [booking for booking, error in zip(bookings, errors) if error is None]
+    for booking in admitted:
+        slot_ledger.record(slot_time, booking["aadhaar_number"], booking["ticket_count"])
+        record_booking(booking)
+    if admitted:
+        availability_cache.invalidate(slot_time)
+    slot_full = slot_ledger.SLOT_FULL_ERROR in errors
+    return admitted, slot_full or len(rows) < limit
+
+
+def expire_waitlist(slot_time):
+    """Close every waiting entry for a slot that can no longer be booked. Returns how many were expired."""
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute(
+            "UPDATE waitlist SET status = 'expired', last_error = %s WHERE slot_time = %s AND status = 'waiting'",
+            (SLOT_STARTED_ERROR, slot_time))
+        expired = cursor.rowcount
+        db.commit()
+        return expired
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def promote_waitlist(slot_time, batch_size=PROMOTE_BATCH):
+    """Promote waiting entries for a slot in batches until it is full or the queue is empty.
+
+    Call after seats free up (a cancellation) or the capacity changes.
+    Returns the promoted bookings. A slot that has started (or is otherwise
+    no longer bookable) promotes nobody; its waiting entries are expired.
+    """
+    promoted = []
+    while True:
+        if not is_valid_date(slot_time):
+            expired = expire_waitlist(slot_time)
+            if expired:
+                print(f"Expired {expired} waitlist entries for {slot_time}: {SLOT_STARTED_ERROR}")
+            return promoted
+        admitted, done = _promote_batch(slot_time, batch_size)
+        promoted.extend(admitted)
+        if done:
+            return promoted
@@ -1,116 +1,150 @@
-from flask import Flask, request, jsonify
-import mysql.connector
+from flask import Flask, request, jsonify, Response
+from utils.db_pool import get_db_connection, pool_stats
+from utils.availability_cache import availability_cache
+from utils.slot_ledger import SLOT_CAPACITY
+from utils.validators import is_valid_email, is_valid_aadhaar, is_valid_date, normalize_aadhaar
+from utils.session_store import create_session_store
+from utils.booking_executor import BookingExecutor
+from utils.latest_booking import find_latest_booking, latest_booking_cache, query_stats, explain_latest_booking
+from flask_api import create_booking
 import uuid
-import re
-from utils.reemail import send_email
-from datetime import datetime, timedelta
-import requests
-import threading
+from utils import outbox, metrics, idempotency
+from datetime import datetime
 
 app = Flask(__name__)
 
-# Store user session data
-user_sessions = {}
+# Store user session data (in-process LRU/TTL by default, SESSION_STORE=sqlite:///... to share between workers)
+user_sessions = create_session_store()
 
-# Database connection
-def get_db_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="Devang@1224",
-        database="TicketBooking"
-    )
+# Confirmed bookings run in-process on a bounded pool instead of an HTTP call per thread
+booking_executor = BookingExecutor(create_booking)
+CONFIRM_WAIT = 3  # seconds to wait for the outcome, within Dialogflow's 5 second webhook timeout
 
-def is_valid_email(email):
-    pattern = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-    return re.match(pattern, email) is not None
+# Intents handle_intent knows; anything else is timed under "other" so callers cannot mint new metric series
+KNOWN_INTENTS = frozenset({
+    "ask_for_username", "ask_for_email", "down_aad_email", "ask_for_aadhaar", "ask_for_date_time",
+    "ask_for_ticket_count", "ask_for_passenger_names", "yes_confirm_booking", "check_booking_status",
+    "no_confirm_booking",
+})
 
-def background_booking(booking_data, session_id):
-    try:
-        api_url = "http://127.0.0.1:5000/book_ticket"
-        response = requests.post(api_url, json=booking_data)
-        response.raise_for_status()
-        booking_response = response.json()
-        print(f"Booking response: {booking_response}")
-        
-    except Exception as e:
-        print(f"Background booking failed for session {session_id}: {str(e)}")
-
-def is_valid_aadhaar(aadhaar_number):
-    print(f"Aadhaar Type: {type(aadhaar_number)}, Value: {aadhaar_number}")
-    aadhaar_number = str(aadhaar_number)  # Convert to string
-    return aadhaar_number.isdigit() and len(aadhaar_number) == 12
-
-def is_valid_date(date_time):
-    max_booking_days = 60  # 2 months
-    booking_start_time = 7  # 7 AM
-    booking_end_time = 21  # 9 PM
-    max_date = datetime.now() + timedelta(days=max_booking_days)
-    return datetime.now() <= date_time <= max_date and booking_start_time <= date_time.hour < booking_end_time
+metrics.expose_stats("db_pool", pool_stats)
+metrics.expose_stats("availability_cache", availability_cache.stats)
+metrics.expose_stats("latest_booking_cache", latest_booking_cache.stats)
+metrics.expose_stats("sessions", user_sessions.stats)
+metrics.expose_stats("booking_executor", booking_executor.stats)
 
 def send_latest_booking_email(aadhaar_number, email):
+    # Served from the latest-booking cache when possible; misses use the
+    # (aadhaar_number, email, slot_time) index from migrations/004
+    result = find_latest_booking(aadhaar_number, email)
+    if not result:
+        return 1
+    if not latest_booking_cache.claim_resend(aadhaar_number, email):
+        return 0  # the same ticket was queued moments ago; don't queue it again
+    booking_id, slot_time, ticket_count, username = result
     conn = get_db_connection()
-    print(aadhaar_number)
-    print(email)
     try:
         with conn.cursor() as cursor:
-            query = """
-                SELECT booking_id, slot_time, ticket_count, username
-                FROM bookings
-                WHERE aadhaar_number = %s AND email = %s
-                ORDER BY slot_time DESC
-                LIMIT 1;
-
-            """
-            cursor.execute(query, (aadhaar_number, email))
-            result = cursor.fetchone()
-
-            if result:
-                booking_id, slot_time, ticket_count, username = result
-                booking_thread = threading.Thread(target=send_email, args=(email, booking_id, slot_time, ticket_count, username))
-                booking_thread.start()
-                # send_email(email, booking_id, slot_time, ticket_count, username)
-                return 0
-            else:
-                return 1
+            # Hand the resend to the outbox workers instead of a thread per request
+            outbox.enqueue(cursor, booking_id, "resend", {
+                "email": email,
+                "username": username,
+                "date_time": slot_time.strftime("%Y-%m-%d %H"),
+                "ticket_count": ticket_count,
+            })
+            conn.commit()
+            return 0
     finally:
         conn.close()
 
-def check_availability(slot_time):
+def load_availability(slot_time):
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT COALESCE(SUM(ticket_count), 0) FROM bookings WHERE slot_time = %s", (slot_time,))
-    booked_tickets = cursor.fetchone()[0] or 0
-    conn.close()
-    return 500 - booked_tickets  # Max 500 per slot
+    try:
+        cursor = conn.cursor()
+        # Primary-key lookup on the counter maintained by the booking path
+        cursor.execute("SELECT booked FROM slot_counters WHERE slot_time = %s", (slot_time,))
+        row = cursor.fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+    booked_tickets = row[0] if row else 0
+    return SLOT_CAPACITY - booked_tickets
+
+def check_availability(slot_time):
+    # Bookings are stored per hour, so cache and query by the start of the hour
+    slot_time = slot_time.replace(minute=0, second=0, microsecond=0)
+    return availability_cache.get(slot_time, load_availability)
+
+@app.route('/availability_stats', methods=['GET'])
+def availability_stats():
+    return jsonify(availability_cache.stats())
+
+@app.route('/latest_booking_stats', methods=['GET'])
+def latest_booking_stats():
+    stats = {"cache": latest_booking_cache.stats(), "queries": query_stats()}
+    if request.args.get("explain"):
+        # "key" should read idx_bookings_aadhaar_email_slot; anything else means a scan
+        stats["explain"] = explain_latest_booking()
+    return jsonify(stats)
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), content_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+@app.route('/session_stats', methods=['GET'])
+def session_stats():
+    return jsonify(user_sessions.stats())
+
+def booking_outcome_reply(session_id, outcome):
+    response = outcome["response"]
+    if outcome["status"] == 200:
+        user_sessions.pop(session_id)
+        return jsonify({"fulfillmentText": f"Congratulations! Your ticket has been booked. Booking ID: {response['booking_id']}. You will receive a confirmation email shortly."})
+    if outcome["status"] == 202:
+        user_sessions.pop(session_id)
+        return jsonify({"fulfillmentText": f"This slot is full, so you are number {response['position']} on the waitlist. If seats free up your ticket will be booked and emailed to you automatically."})
+    if outcome["status"] == 400:
+        return jsonify({"fulfillmentText": f"Booking failed: {response.get('error')}."})
+    return jsonify({"fulfillmentText": "Booking failed due to a server error. Please try again later."})
+
+@app.route('/booking_executor_stats', methods=['GET'])
+def booking_executor_stats():
+    return jsonify(booking_executor.stats())
 
 @app.route('/dialogflow-webhook', methods=['POST'])
 def dialogflow_webhook():
     req = request.get_json()
     intent_name = req['queryResult']['intent']['displayName']
+    intent_label = intent_name if intent_name in KNOWN_INTENTS else "other"
+    with metrics.timed("webhook_request_seconds", intent=intent_label):
+        return handle_intent(req, intent_name)
+
+def handle_intent(req, intent_name):
     parameters = req['queryResult']['parameters']
     session_id = req['session']  # Unique user session
     print(f"Session ID: {session_id}")
 
-    # Initialize session storage if not exists
-    if session_id not in user_sessions:
-        user_sessions[session_id] = {}
+    # Load this conversation's record (a fresh one if it is new or has expired)
+    user_session = user_sessions.get(session_id)
 
     # Store user inputs in session storage
     if intent_name == "ask_for_username":
-        user_sessions[session_id]['username'] = parameters.get("username")
+        user_session.username = parameters.get("username")
+        user_sessions.save(session_id, user_session)
         return jsonify({"fulfillmentText": "Please provide your email address.eg: my email id is xyz@abc.com"})
 
     elif intent_name == "ask_for_email":
         email = parameters.get("email")
         if not is_valid_email(email):
             return jsonify({"fulfillmentText": "Invalid email format! Please enter a valid email."})
-        user_sessions[session_id]['email'] = email
+        user_session.email = email
+        user_sessions.save(session_id, user_session)
         return jsonify({"fulfillmentText": "What would you like to do?\n1. Book a ticket\n2. Download a previous ticket\n3. Contact help"})
 
     elif intent_name == "down_aad_email":
         print("Raw parameters:", parameters)
-        aadhaarr = parameters.get("aadharr")
+        # As in ask_for_aadhaar: Dialogflow may send a number, but the lookup and its cache key want the string
+        aadhaarr = normalize_aadhaar(parameters.get("aadharr"))
         print(f"input aadhaarr:{aadhaarr}")
         emaill= parameters.get("emaill")
         if not is_valid_aadhaar(aadhaarr):
@@ -131,7 +165,8 @@ def dialogflow_webhook():
         aadhaar = parameters.get("aadhaar")
         if not is_valid_aadhaar(aadhaar):
             return jsonify({"fulfillmentText": "Invalid Aadhaar! Enter a 12-digit number."})
-        user_sessions[session_id]['aadhaar_number'] = aadhaar
+        user_session.aadhaar_number = normalize_aadhaar(aadhaar)
+        user_sessions.save(session_id, user_session)
         return jsonify({"fulfillmentText": "Enter your preferred booking date and time. eg: i want to book for 1 may at 3 pm"})
 
     elif intent_name == "ask_for_date_time":
@@ -143,7 +178,8 @@ def dialogflow_webhook():
             date_time = datetime.strptime(date_time_str[:19], "%Y-%m-%dT%H:%M:%S")
             if not is_valid_date(date_time):
                 return jsonify({"fulfillmentText": "Invalid date or time! Enter a valid date within booking hours."})
-            user_sessions[session_id]['date_time'] = date_time.strftime("%Y-%m-%d %H")
+            user_session.date_time = date_time.strftime("%Y-%m-%d %H")
+            user_sessions.save(session_id, user_session)
             available_tickets = check_availability(date_time)
             return jsonify({"fulfillmentText": f"Available tickets: {available_tickets}. Enter the number of tickets you want to book. eg: i want 1 ticket"})
         except ValueError:
@@ -153,65 +189,48 @@ def dialogflow_webhook():
         ticket_count = int(parameters.get("number"))
         if ticket_count > 4:
             return jsonify({"fulfillmentText": "You can book a maximum of 4 tickets per Aadhaar."})
-        user_sessions[session_id]['ticket_count'] = ticket_count
+        user_session.ticket_count = ticket_count
         if ticket_count== 1:
-         user_sessions[session_id]['passenger_names'] = user_sessions[session_id]['username']
+         user_session.passenger_names = [user_session.username] if user_session.username else []
+         user_sessions.save(session_id, user_session)
          return jsonify({"fulfillmentText": "Confirm your booking? (yes/no)"})
         else:   
+         user_sessions.save(session_id, user_session)
          return jsonify({"fulfillmentText": "Please provide passenger names. eg: one is Rugved other is Sandeep"})
 
     elif intent_name == "ask_for_passenger_names":
         passenger_names = parameters.get("passenger_names", [])
         if not isinstance(passenger_names, list):
             return jsonify({"fulfillmentText": "Invalid input! Please provide passenger names, eg: one is Rugved other is Sandeep."})
-        user_sessions[session_id]['passenger_names'] = passenger_names
+        user_session.passenger_names = passenger_names
+        user_sessions.save(session_id, user_session)
         return jsonify({"fulfillmentText": "Confirm your booking? (yes/no)"})
 
     elif intent_name == "yes_confirm_booking":
-        print(f"Current session data: {user_sessions}")
+        print(f"Current session data: {user_session}")
         # Prepare the booking request
-        booking_data = {
-                "username": user_sessions[session_id]['username'],
-                "email": user_sessions[session_id]['email'],
-                "aadhaar_number": user_sessions[session_id]['aadhaar_number'],
-                "date_time": user_sessions[session_id]['date_time'],
-                "ticket_count": user_sessions[session_id]['ticket_count'],
-                "passenger_names": user_sessions[session_id]['passenger_names']
-            }
+        booking_data = user_session.to_dict()
+        booking_data["join_waitlist"] = True  # a full slot queues the user rather than inviting retries
+        # A retried confirmation of the same details replays the first booking instead of booking twice
+        booking_data["idempotency_key"] = idempotency.session_key(session_id, booking_data)
         
-        # Launch booking in background thread
-        booking_thread = threading.Thread(target=background_booking, args=(booking_data, session_id))
-        booking_thread.start()
-
-        # api_url = "http://127.0.0.1:5000/book_ticket"
-        # try:
-        #         response = requests.post(api_url, json=booking_data)
-        #         response.raise_for_status()  # Raises an error for HTTP errors
-        #         booking_response = response.json()
-        #         print(f"Booking response: {booking_response}")  # Debugging
-
-        #         message_value = booking_response.get("message")
-        #         print(f"Message value: '{message_value}'")
-        #         book_id = booking_response.get("booking_id")
-                
-        #         if message_value and message_value.strip() == "Booking successful":
-        #            user_sessions.pop(session_id, None)
-        #            print(f"Booking fun response: {booking_response}")  # Debugging
-        #            final_message = f"Congratulations! Your ticket has been booked. Booking ID: {book_id}."
-        #            print(f"Final response to Dialogflow: {final_message}")
-        #            return jsonify({
-        #                "fulfillmentText": final_message
-        #            })
-        #         else:
-        #            print("Booking not successful or message mismatch.")
-                
-        # except requests.exceptions.RequestException as e:
-        #         return jsonify({"fulfillmentText": f"Booking failed due to an error: {str(e)}. Please try again later."})
-
-        return jsonify({"fulfillmentText": f"Your booking is being processed! You will receive a confirmation email shortly."})
+        if not booking_executor.submit(session_id, booking_data):
+            return jsonify({"fulfillmentText": "We are handling a lot of bookings right now. Please confirm again in a minute."})
+        outcome = booking_executor.wait(session_id, CONFIRM_WAIT)
+        if outcome is None or outcome["state"] != "done":
+            return jsonify({"fulfillmentText": "Your booking is being processed! Ask me for your booking status in a moment."})
+        return booking_outcome_reply(session_id, outcome)
+
+    elif intent_name == "check_booking_status":
+        outcome = booking_executor.result(session_id)
+        if outcome is None:
+            return jsonify({"fulfillmentText": "I could not find a recent booking in this conversation."})
+        if outcome["state"] != "done":
+            return jsonify({"fulfillmentText": "Your booking is still being processed. Please check again shortly."})
+        return booking_outcome_reply(session_id, outcome)
 
     elif intent_name == "no_confirm_booking":
-        user_sessions.pop(session_id, None)
+        user_sessions.pop(session_id)
         return jsonify({"fulfillmentText": "Booking cancelled."})
         
 